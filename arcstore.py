@@ -0,0 +1,169 @@
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+
+class Adjacency:
+    """Liste d'adjacence d'un nœud : voisins (ids entiers) et poids des arcs"""
+
+    __slots__ = ('nodes', 'weights')
+
+    def __init__(self):
+        self.nodes = array('i')
+        self.weights = array('l')
+
+    def set(self, node: int, weight: int):
+        """Ajoute l'arc ou remplace son poids (coût O(degré))"""
+        try:
+            i = self.nodes.index(node)
+        except ValueError:
+            self.nodes.append(node)
+            self.weights.append(weight)
+        else:
+            self.weights[i] = weight
+
+    def items(self):
+        return zip(self.nodes, self.weights)
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class ArcStore:
+    """Stockage des arcs d'un réseau de Petri indexé par des entiers.
+
+    Chaque place et chaque transition reçoit un id entier dans l'ordre d'ajout
+    et possède ses listes d'adjacence d'entrée et de sortie : les requêtes de
+    l'exo1 ne coûtent que le degré du nœud interrogé. `version` augmente à
+    chaque modification des arcs (invalidation des vues mises en cache).
+    """
+
+    __slots__ = ('place_ids', 'transition_ids', 'place_index', 'transition_index',
+                 'place_in', 'place_out', 'trans_in', 'trans_out', 'version')
+
+    def __init__(self):
+        self.place_ids: List[str] = []
+        self.transition_ids: List[str] = []
+        self.place_index = {}
+        self.transition_index = {}
+        self.place_in: List[Adjacency] = []    # transitions qui alimentent la place
+        self.place_out: List[Adjacency] = []   # transitions qui consomment la place
+        self.trans_in: List[Adjacency] = []    # places d'entrée de la transition
+        self.trans_out: List[Adjacency] = []   # places de sortie de la transition
+        self.version = 0
+
+    def add_place(self, place_id: str) -> int:
+        idx = self.place_index.get(place_id)
+        if idx is None:
+            idx = len(self.place_ids)
+            self.place_index[place_id] = idx
+            self.place_ids.append(place_id)
+            self.place_in.append(Adjacency())
+            self.place_out.append(Adjacency())
+        return idx
+
+    def add_transition(self, transition_id: str) -> int:
+        idx = self.transition_index.get(transition_id)
+        if idx is None:
+            idx = len(self.transition_ids)
+            self.transition_index[transition_id] = idx
+            self.transition_ids.append(transition_id)
+            self.trans_in.append(Adjacency())
+            self.trans_out.append(Adjacency())
+        return idx
+
+    def add_input_arc(self, place_id: str, transition_id: str, weight: int = 1):
+        p = self.add_place(place_id)
+        t = self.add_transition(transition_id)
+        self.trans_in[t].set(p, weight)
+        self.place_out[p].set(t, weight)
+        self.version += 1
+
+    def add_output_arc(self, transition_id: str, place_id: str, weight: int = 1):
+        p = self.add_place(place_id)
+        t = self.add_transition(transition_id)
+        self.trans_out[t].set(p, weight)
+        self.place_in[p].set(t, weight)
+        self.version += 1
+
+    def load_input_arcs(self, places: Iterable[int], transitions: Iterable[int],
+                        weights: Optional[Iterable[int]] = None):
+        """Chargement en masse d'arcs place -> transition donnés par ids entiers.
+
+        Un arc en double (dans le paquet ou déjà présent) lève ValueError
+        avant toute modification ; la vérification ne coûte que le degré des
+        transitions concernées, sans dictionnaire de tous les arcs.
+        """
+        self._load(places, transitions, weights, self.place_out, self.trans_in, "{p} -> {t}")
+
+    def load_output_arcs(self, transitions: Iterable[int], places: Iterable[int],
+                         weights: Optional[Iterable[int]] = None):
+        """Chargement en masse d'arcs transition -> place donnés par ids entiers"""
+        self._load(places, transitions, weights, self.place_in, self.trans_out, "{t} -> {p}")
+
+    def _load(self, places, transitions, weights, place_adj, trans_adj, arc: str):
+        places, transitions = list(places), list(transitions)
+        # Doublons : par transition, voisins existants puis nouveaux arcs du paquet
+        seen = {}
+        for p, t in zip(places, transitions):
+            nodes = seen.get(t)
+            if nodes is None:
+                nodes = seen[t] = set(trans_adj[t].nodes)
+            if p in nodes:
+                raise ValueError("arc " + arc.format(p=self.place_ids[p], t=self.transition_ids[t])
+                                 + " en double")
+            nodes.add(p)
+        if weights is None:
+            for p, t in zip(places, transitions):
+                place_adj[p].nodes.append(t)
+                place_adj[p].weights.append(1)
+                trans_adj[t].nodes.append(p)
+                trans_adj[t].weights.append(1)
+        else:
+            for p, t, w in zip(places, transitions, weights):
+                place_adj[p].nodes.append(t)
+                place_adj[p].weights.append(w)
+                trans_adj[t].nodes.append(p)
+                trans_adj[t].weights.append(w)
+        self.version += 1
+
+    # Requêtes de l'exo1 (coût O(degré))
+    def output_transitions(self, place_id: str) -> List[str]:
+        ids = self.transition_ids
+        return [ids[t] for t in self.place_out[self.place_index[place_id]].nodes]
+
+    def input_transitions(self, place_id: str) -> List[str]:
+        ids = self.transition_ids
+        return [ids[t] for t in self.place_in[self.place_index[place_id]].nodes]
+
+    def output_places(self, transition_id: str) -> List[str]:
+        ids = self.place_ids
+        return [ids[p] for p in self.trans_out[self.transition_index[transition_id]].nodes]
+
+    def input_places(self, transition_id: str) -> List[str]:
+        ids = self.place_ids
+        return [ids[p] for p in self.trans_in[self.transition_index[transition_id]].nodes]
+
+    def input_weights(self, transition_id: str) -> List[Tuple[str, int]]:
+        ids = self.place_ids
+        return [(ids[p], w) for p, w in self.trans_in[self.transition_index[transition_id]].items()]
+
+    def output_weights(self, transition_id: str) -> List[Tuple[str, int]]:
+        ids = self.place_ids
+        return [(ids[p], w) for p, w in self.trans_out[self.transition_index[transition_id]].items()]
+
+    def input_arcs(self):
+        """Itère sur ((place, transition), poids) comme l'ancien dictionnaire input_arcs"""
+        for t, adj in enumerate(self.trans_in):
+            trans = self.transition_ids[t]
+            for p, w in adj.items():
+                yield (self.place_ids[p], trans), w
+
+    def output_arcs(self):
+        """Itère sur ((transition, place), poids) comme l'ancien dictionnaire output_arcs"""
+        for t, adj in enumerate(self.trans_out):
+            trans = self.transition_ids[t]
+            for p, w in adj.items():
+                yield (trans, self.place_ids[p]), w
+
+    def arc_count(self) -> int:
+        return sum(len(a) for a in self.trans_in) + sum(len(a) for a in self.trans_out)
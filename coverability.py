@@ -0,0 +1,294 @@
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import ExplorationStats
+from reachability import PackedNet
+
+OMEGA = float('inf')
+
+Marking = Tuple[float, ...]
+
+
+def omega_marking(net: PackedNet, marking: Dict[str, float]) -> Marking:
+    """Marquage sous forme de tuple dans l'ordre des places (ω = OMEGA)"""
+    return tuple(marking.get(p, 0) for p in net.places)
+
+
+def omega_str(net: PackedNet, m: Marking) -> str:
+    return "(" + ", ".join(f"{p}:{'ω' if v == OMEGA else v}" for p, v in zip(net.places, m)) + ")"
+
+
+def omega_enabled(net: PackedNet, m: Marking) -> List[int]:
+    """Transitions franchissables (ω couvre tout poids)"""
+    return [t for t, inputs in enumerate(net.inputs) if all(m[p] >= w for p, w in inputs)]
+
+
+def omega_fire(net: PackedNet, m: Marking, t: int) -> List[float]:
+    n = list(m)
+    for p, d in net.deltas[t]:
+        n[p] += d
+    return n
+
+
+def _accelerate(n: np.ndarray, ancestors: np.ndarray) -> np.ndarray:
+    """Passe à ω les places où n dépasse un ancêtre qu'il couvre, jusqu'au point fixe"""
+    while True:
+        covered = (ancestors <= n).all(axis=1)
+        if not covered.any():
+            return n
+        grow = (n > ancestors[covered].min(axis=0)) & (n != OMEGA)
+        if not grow.any():
+            return n
+        n[grow] = OMEGA
+
+
+def _key(n: np.ndarray) -> Marking:
+    return tuple(v if v == OMEGA else int(v) for v in n.tolist())
+
+
+def _covers(m1: Marking, m2: Marking) -> bool:
+    """m1 ≥ m2 composante par composante"""
+    for x, y in zip(m1, m2):
+        if x < y:
+            return False
+    return True
+
+
+class CoverabilityGraph:
+    """Résultat d'une construction de couverture : marquages ω numérotés et arcs (src, dst, t)"""
+
+    def __init__(self, net: PackedNet, markings: List[Marking], edges: List[Tuple[int, int, int]]):
+        self.net = net
+        self.markings = markings
+        self.edge_list = edges
+
+    def __len__(self):
+        return len(self.markings)
+
+    def unbounded_places(self) -> List[str]:
+        return [p for i, p in enumerate(self.net.places) if any(m[i] == OMEGA for m in self.markings)]
+
+    def is_bounded(self) -> bool:
+        return not self.unbounded_places()
+
+    def nodes(self) -> List[Tuple[int, str]]:
+        """Nœuds (id, libellé avec ω) au format de dessin de l'exo2"""
+        return [(i, omega_str(self.net, m)) for i, m in enumerate(self.markings)]
+
+    def edges(self) -> List[Tuple[int, int, str]]:
+        names = self.net.transitions
+        return [(s, d, names[t]) for s, d, t in self.edge_list]
+
+
+def karp_miller(net: PackedNet, initial: Marking, monitor=None) -> CoverabilityGraph:
+    """Graphe de couverture de Karp–Miller.
+
+    L'accélération (passage à ω) ne compare le nouveau marquage qu'à ses
+    ancêtres dans l'arbre de découverte (pointeurs parents), en une seule
+    comparaison vectorisée ; les marquages déjà rencontrés sont retrouvés
+    par table de hachage et fusionnés. `monitor` (instrumentation.Monitor)
+    reçoit les compteurs après chaque nœud développé.
+    """
+    initial = tuple(initial)
+    index = {initial: 0}
+    markings: List[Marking] = [initial]
+    parent = [-1]
+    edges = []
+    queue = deque([0])
+    stats = None
+    if monitor is not None:
+        stats = ExplorationStats('karp_miller')
+        stats.states = stats.frontier = 1
+        monitor.start(stats)
+    while queue:
+        i = queue.popleft()
+        if stats is not None:
+            stats.states, stats.edges, stats.expanded, stats.frontier = len(markings), len(edges), i, len(queue) + 1
+            stats.duplicates = stats.edges - (stats.states - 1)
+            stats.batches += 1
+            monitor.tick(stats)
+        m = markings[i]
+        enabled = omega_enabled(net, m)
+        if not enabled:
+            continue
+        # Marquages des ancêtres (chemin jusqu'à la racine), une ligne par ancêtre
+        path, a = [], i
+        while a >= 0:
+            path.append(markings[a])
+            a = parent[a]
+        ancestors = np.array(path, dtype=float)
+        for t in enabled:
+            key = _key(_accelerate(np.array(omega_fire(net, m, t), dtype=float), ancestors))
+            j = index.get(key)
+            if j is None:
+                j = index[key] = len(markings)
+                markings.append(key)
+                parent.append(i)
+                queue.append(j)
+            edges.append((i, j, t))
+    if stats is not None:
+        stats.states, stats.edges, stats.expanded, stats.frontier = len(markings), len(edges), len(markings), 0
+        stats.duplicates = stats.edges - (stats.states - 1)
+        monitor.finish(stats)
+    return CoverabilityGraph(net, markings, edges)
+
+
+def minimal_coverability_set(net: PackedNet, initial: Marking, monitor=None) -> CoverabilityGraph:
+    """Ensemble de couverture minimal (algorithme MP de Reynier et Servais).
+
+    Arbre de Karp–Miller avec élagage : un nœud couvert par un nœud actif
+    n'est pas développé, et un nœud qui en couvre strictement d'autres
+    désactive ceux-ci avec leurs sous-arbres. Quand un nœud accélère par
+    rapport à un ancêtre, c'est l'ancêtre qui reçoit le marquage accéléré
+    et son sous-arbre est abandonné. Le résultat contient les marquages
+    des nœuds actifs et les arcs de l'arbre entre nœuds actifs. Pour
+    `monitor`, les états sont les nœuds actifs et les doublons les nœuds
+    couverts non développés.
+    """
+    labels: List[Marking] = [tuple(initial)]
+    parent, via = [-1], [-1]
+    children: List[List[int]] = [[]]
+    active = set()
+    waiting = deque([0])
+    queued = {0}
+    stats = None
+    if monitor is not None:
+        stats = ExplorationStats('minimal_coverability_set')
+        stats.frontier = 1
+        monitor.start(stats)
+
+    def deactivate_subtree(root: int, keep_root: bool = False):
+        stack = [root]
+        while stack:
+            x = stack.pop()
+            if x != root or not keep_root:
+                active.discard(x)
+                queued.discard(x)
+            stack.extend(children[x])
+        if keep_root:
+            children[root] = []
+
+    while waiting:
+        n = waiting.popleft()
+        if n not in queued:
+            continue
+        queued.discard(n)
+        if stats is not None:
+            stats.states, stats.edges, stats.frontier = len(active), len(labels) - 1, len(queued)
+            stats.batches += 1
+            monitor.tick(stats)
+        m = labels[n]
+        if any(_covers(labels[x], m) for x in active):
+            if stats is not None:
+                stats.duplicates += 1
+            continue
+
+        # Ancêtre actif le plus haut strictement couvert : il est accéléré
+        path, a = [], parent[n]
+        while a >= 0:
+            path.append(a)
+            a = parent[a]
+        accelerated = None
+        for a in reversed(path):
+            if a in active and _covers(m, labels[a]) and m != labels[a]:
+                accelerated = a
+                break
+        if accelerated is not None:
+            acc = list(labels[accelerated])
+            for p, (x, y) in enumerate(zip(m, labels[accelerated])):
+                if x > y:
+                    acc[p] = OMEGA
+            deactivate_subtree(accelerated, keep_root=True)
+            active.discard(accelerated)
+            labels[accelerated] = tuple(acc)
+            waiting.append(accelerated)
+            queued.add(accelerated)
+            continue
+
+        for x in [x for x in active if _covers(m, labels[x])]:
+            deactivate_subtree(x)
+        active.add(n)
+        if stats is not None:
+            stats.expanded += 1
+        for t in omega_enabled(net, m):
+            child = len(labels)
+            labels.append(tuple(omega_fire(net, m, t)))
+            parent.append(n)
+            via.append(t)
+            children.append([])
+            children[n].append(child)
+            waiting.append(child)
+            queued.add(child)
+
+    ids = {x: i for i, x in enumerate(sorted(active))}
+    markings = [labels[x] for x in sorted(active)]
+    edges = [(ids[parent[x]], ids[x], via[x]) for x in sorted(active) if parent[x] in ids]
+    if stats is not None:
+        stats.states, stats.edges, stats.frontier = len(active), len(labels) - 1, 0
+        monitor.finish(stats)
+    return CoverabilityGraph(net, markings, edges)
+
+
+
+def backward_coverability(net: PackedNet, initial: Marking, target: Marking) -> Optional[List[str]]:
+    """Le marquage `target` est-il couvrable depuis `initial` ? (analyse en arrière)
+
+    L'ensemble clos vers le haut des marquages qui couvrent `target` est
+    représenté par ses éléments minimaux (antichaîne). On calcule les
+    prédécesseurs pre(t) + max(b - post(t), 0) de chaque nouvel élément ;
+    un candidat couvert par un élément existant est écarté, et ceux qu'il
+    couvre sont retirés de la base. Renvoie une séquence de franchissement
+    témoin (liste vide si `initial` couvre déjà `target`), ou None si
+    `target` n'est pas couvrable. Fonctionne aussi sur les réseaux non bornés.
+    """
+    target = tuple(target)
+    posts = []
+    for inputs, delta in zip(net.inputs, net.deltas):
+        post = dict(inputs)
+        for p, d in delta:
+            post[p] = post.get(p, 0) + d
+        posts.append(tuple((p, w) for p, w in post.items() if w > 0))
+
+    # Élément i de la base : marquage minimal, transition à franchir, élément suivant
+    elements: List[Marking] = [target]
+    step: List[Tuple[int, int]] = [(-1, -1)]
+    basis = {0}
+    frontier = [0]
+    found = 0 if _covers(initial, target) else None
+    while frontier and found is None:
+        new_frontier = []
+        for b in frontier:
+            if b not in basis:
+                continue
+            for t, inputs in enumerate(net.inputs):
+                n = list(elements[b])
+                for p, w in posts[t]:
+                    n[p] = max(n[p] - w, 0)
+                for p, w in inputs:
+                    n[p] += w
+                candidate = tuple(n)
+                if any(_covers(candidate, elements[x]) for x in basis):
+                    continue
+                basis.difference_update([x for x in basis if _covers(elements[x], candidate)])
+                i = len(elements)
+                elements.append(candidate)
+                step.append((t, b))
+                basis.add(i)
+                new_frontier.append(i)
+                if _covers(initial, candidate):
+                    found = i
+                    break
+            if found is not None:
+                break
+        frontier = new_frontier
+
+    if found is None:
+        return None
+    witness = []
+    t, nxt = step[found]
+    while t >= 0:
+        witness.append(net.transitions[t])
+        t, nxt = step[nxt]
+    return witness
@@ -1,5 +1,8 @@
-import matplotlib.pyplot as plt
-from collections import deque
+from reachability import PackedNet, StubbornSets, explore, visible_transitions
+from properties import places_of
+from symmetry import SymmetryGroup
+from reachgraph import ReachabilityGraph
+from rendering import draw_graph, export_graph, layered_positions
  
 class PetriNet:
     def __init__(self, places, transitions, pre, post, initial_marking):
@@ -9,105 +12,63 @@ class PetriNet:
         self.post = post
         self.initial_marking = initial_marking
  
-    def is_enabled(self, marking, transition):
-        for place in self.pre.get(transition, {}):
-            if marking.get(place, 0) < self.pre[transition][place]:
-                return False
-        return True
- 
-    def fire(self, marking, transition):
-        new_marking = marking.copy()
-        for place in self.places:
-            pre_val = self.pre.get(transition, {}).get(place, 0)
-            post_val = self.post.get(transition, {}).get(place, 0)
-            new_val = marking.get(place, 0) - pre_val + post_val
-            new_marking[place] = max(new_val, 0)
-        return new_marking
- 
-    def marking_to_tuple(self, marking):
-        return tuple(marking.get(p, 0) for p in self.places)
- 
     def marking_str(self, marking):
         return "(" + ", ".join(f"{p}:{marking.get(p,0)}" for p in self.places) + ")"
  
     def generate_positions(self, nodes, edges):
-        from collections import defaultdict
-        levels = defaultdict(list)
-        root = nodes[0][0]
-        dist = {root:0}
-        queue = deque([root])
-        while queue:
-            u = queue.popleft()
-            for (src, dst, _) in edges:
-                if src == u and dst not in dist:
-                    dist[dst] = dist[u] + 1
-                    queue.append(dst)
- 
-        max_level = max(dist.values())
-        level_nodes = defaultdict(list)
-        for nid, label in nodes:
-            lvl = dist.get(nid, max_level)
-            level_nodes[lvl].append((nid, label))
- 
-        positions = {}
-        for lvl in range(max_level+1):
-            n = len(level_nodes[lvl])
-            for i, (nid, _) in enumerate(level_nodes[lvl]):
-                x = i - n/2
-                y = -lvl
-                positions[nid] = (x, y)
-        return positions
+        # Niveaux BFS sur listes d'adjacence (O(V + E))
+        return layered_positions(nodes, edges)
  
     def draw_graph(self, nodes, edges, positions):
-        fig, ax = plt.subplots(figsize=(12,8))
- 
-        # Dessiner les arêtes (flèches)
-        for (src, dst, label) in edges:
-            x1, y1 = positions[src]
-            x2, y2 = positions[dst]
-            ax.annotate("",
-                        xy=(x2, y2), xycoords='data',
-                        xytext=(x1, y1), textcoords='data',
-                        arrowprops=dict(arrowstyle="->", color='blue'))
-            mx, my = (x1 + x2) / 2, (y1 + y2) / 2
-            ax.text(mx, my, label, color='red', fontsize=9)
- 
-        # Dessiner les nœuds
-        for (nid, label) in nodes:
-            x, y = positions[nid]
-            ax.plot(x, y, 'o', color='orange', markersize=15)
-            ax.text(x, y, label, fontsize=10, ha='center', va='center', color='black')
- 
-        ax.axis('off')
-        plt.title("Arborescence des états atteignables - Réseau borné")
-        plt.show()
- 
-    def reachable_states_borne(self):
-        visited = set()
-        to_visit = deque()
-        to_visit.append(self.initial_marking)
- 
-        nodes = []
-        edges = []
- 
-        while to_visit:
-            current = to_visit.popleft()
-            current_id = self.marking_to_tuple(current)
-            if current_id in visited:
-                continue
-            visited.add(current_id)
-            nodes.append((current_id, self.marking_str(current)))
- 
-            for t in self.transitions:
-                if self.is_enabled(current, t):
-                    next_marking = self.fire(current, t)
-                    next_id = self.marking_to_tuple(next_marking)
-                    edges.append((current_id, next_id, t))
-                    if next_id not in visited:
-                        to_visit.append(next_marking)
+        # Arcs et nœuds dessinés par lots, libellés décimés sur les grands graphes
+        draw_graph(nodes, edges, positions, "Arborescence des états atteignables - Réseau borné")
+ 
+    def reachable_states_borne(self, typecode='H', store=None, stubborn=False, observed=None,
+                               symmetry=None, properties=(), export=None, checkpoint=None, monitor=None):
+        # Marquages empaquetés (entiers de largeur fixe) et deltas creux par transition ;
+        # store=statestore.DiskStateStore(dossier) pour explorer au-delà de la RAM ;
+        # stubborn=True : réduction par ensembles têtus (blocages préservés), observed =
+        # places d'une propriété de sûreté à préserver aussi (par défaut : places lues par
+        # `properties`, à déclarer pour un Invariant) ;
+        # symmetry='auto' ou liste de composants interchangeables (listes de places) :
+        # seuls les représentants des orbites sont explorés (les places des `properties`
+        # doivent rester fixes, sinon ValueError) ;
+        # properties (properties.Invariant, Deadlock, PlaceBound) : arrêt au premier
+        # contre-exemple, renvoyé (plus courte trace) au lieu de dessiner le graphe ;
+        # export='graphe.dot' / '.graphml' : écriture du graphe au lieu du dessin (grands graphes) ;
+        # checkpoint='exploration.ckpt' : point de reprise écrit périodiquement ; relancer le même
+        # appel après une interruption reprend l'exploration là où elle s'était arrêtée
+        # (le fichier est supprimé une fois l'exploration terminée) ;
+        # monitor=instrumentation.JsonLinesReporter('exploration.jsonl') : progression (états,
+        # états/s, frontière, taux de doublons, mémoire) en lignes JSON, ou CallbackMonitor ;
+        # renvoie le graphe (reachgraph.ReachabilityGraph : composantes, vivacité, réversibilité)
+        packed = PackedNet(self.places, self.transitions, self.pre, self.post, typecode)
+        reduction = None
+        if stubborn:
+            if observed is None and properties:
+                observed = places_of(properties)
+            visible = visible_transitions(packed, observed) if observed is not None else None
+            reduction = StubbornSets(packed, visible)
+        if symmetry == 'auto':
+            symmetry = SymmetryGroup.detect(packed)
+        elif symmetry is not None:
+            symmetry = SymmetryGroup.from_components(packed, symmetry)
+        space = explore(packed, packed.pack(self.initial_marking), store=store, reduction=reduction,
+                        symmetry=symmetry, properties=properties, checkpoint=checkpoint,
+                        monitor=monitor)
+        if space.violation is not None:
+            return space.violation
+ 
+        graph = ReachabilityGraph.from_state_space(space)
+        nodes = graph.nodes()
+        edges = graph.edges()
+        if export is not None:
+            export_graph(nodes, edges, export)
+            return graph
  
         positions = self.generate_positions(nodes, edges)
         self.draw_graph(nodes, edges, positions)
+        return graph
  
 # Exemple d'utilisation
 if __name__ == "__main__":
@@ -128,11 +89,14 @@ if __name__ == "__main__":
 
 
 
-    import matplotlib.pyplot as plt
+from coverability import OMEGA, backward_coverability, karp_miller, minimal_coverability_set, omega_marking
+
+from reachgraph import ReachabilityGraph
 
-from collections import deque
+from structural import StructuralAnalysis
+
+from rendering import draw_graph, export_graph, layered_positions
  
-OMEGA = float('inf')
  
 class PetriNet:
 
@@ -162,120 +126,6 @@ class PetriNet:
 
         return True
  
-    def fire(self, marking, transition):
-
-        new_marking = marking.copy()
-
-        for place in self.places:
-
-            pre_val = self.pre.get(transition, {}).get(place, 0)
-
-            post_val = self.post.get(transition, {}).get(place, 0)
-
-            val = marking.get(place, 0)
-
-            if val == OMEGA:
-
-                new_marking[place] = OMEGA
-
-            else:
-
-                new_val = val - pre_val + post_val
-
-                new_marking[place] = max(new_val, 0)
-
-        return new_marking
- 
-    def less_or_equal(self, m1, m2):
-
-        """Test m1 ≤ m2 avec OMEGA : ω ≥ n pour tout n."""
-
-        for p in self.places:
-
-            v1 = m1.get(p, 0)
-
-            v2 = m2.get(p, 0)
-
-            if v1 == OMEGA:
-
-                if v2 != OMEGA:
-
-                    return False
-
-            else:
-
-                if v2 != OMEGA and v1 > v2:
-
-                    return False
-
-        return True
- 
-    def greater_than(self, m1, m2):
-
-        """Test strict m1 > m2."""
-
-        geq = True
-
-        strict = False
-
-        for p in self.places:
-
-            v1 = m1.get(p, 0)
-
-            v2 = m2.get(p, 0)
-
-            if v1 == OMEGA:
-
-                if v2 != OMEGA:
-
-                    strict = True
-
-            else:
-
-                if v2 == OMEGA:
-
-                    return False
-
-                elif v1 < v2:
-
-                    return False
-
-                elif v1 > v2:
-
-                    strict = True
-
-        return geq and strict
- 
-    def omega_covering(self, new_marking, visited_markings):
-
-       
-
-        updated = False
-
-        for old in visited_markings:
-
-            if self.less_or_equal(old, new_marking) and self.greater_than(new_marking, old):
-
-                # on remplace dans new_marking les places où new_marking > old par ω
-
-                for p in self.places:
-
-                    v_new = new_marking.get(p,0)
-
-                    v_old = old.get(p,0)
-
-                    if v_new != OMEGA and (v_old == OMEGA or v_new > v_old):
-
-                        new_marking[p] = OMEGA
-
-                        updated = True
-
-        return new_marking, updated
- 
-    def marking_to_tuple(self, marking):
-
-        return tuple(OMEGA if marking.get(p,0) == OMEGA else marking.get(p,0) for p in self.places)
- 
     def marking_str(self, marking):
 
         def val_str(v):
@@ -286,148 +136,83 @@ class PetriNet:
  
     def generate_positions(self, nodes, edges):
 
-        from collections import defaultdict
-
-        levels = defaultdict(list)
-
-        root = nodes[0][0]
-
-        dist = {root:0}
-
-        queue = deque([root])
-
-        while queue:
-
-            u = queue.popleft()
-
-            for (src, dst, _) in edges:
-
-                if src == u and dst not in dist:
-
-                    dist[dst] = dist[u] + 1
-
-                    queue.append(dst)
- 
-        max_level = max(dist.values()) if dist else 0
-
-        level_nodes = defaultdict(list)
-
-        for nid, label in nodes:
-
-            lvl = dist.get(nid, max_level)
-
-            level_nodes[lvl].append((nid, label))
- 
-        positions = {}
-
-        for lvl in range(max_level+1):
-
-            n = len(level_nodes[lvl])
-
-            for i, (nid, _) in enumerate(level_nodes[lvl]):
-
-                x = i - n/2
-
-                y = -lvl
-
-                positions[nid] = (x, y)
-
-        return positions
+        return layered_positions(nodes, edges)
  
     def draw_graph(self, nodes, edges, positions):
 
-        fig, ax = plt.subplots(figsize=(12,8))
+        draw_graph(nodes, edges, positions, "Arborescence des états atteignables - Réseau non borné")
  
-        for (src, dst, label) in edges:
+    def reachable_states_non_borne(self, minimal=False, export=None, monitor=None):
 
-            x1, y1 = positions[src]
+        # Karp–Miller : accélération par rapport aux seuls ancêtres, marquages hachés ;
 
-            x2, y2 = positions[dst]
+        # minimal=True donne l'ensemble de couverture minimal (sous-arbres couverts élagués) ;
 
-            ax.annotate("",
+        # renvoie le graphe de couverture au format reachgraph.ReachabilityGraph ;
 
-                        xy=(x2, y2), xycoords='data',
+        # monitor (instrumentation.Monitor) : progression de la construction
 
-                        xytext=(x1, y1), textcoords='data',
+        packed = PackedNet(self.places, self.transitions, self.pre, self.post)
 
-                        arrowprops=dict(arrowstyle="->", color='blue'))
+        initial = omega_marking(packed, self.initial_marking)
 
-            mx, my = (x1 + x2) / 2, (y1 + y2) / 2
-
-            ax.text(mx, my, label, color='red', fontsize=9)
- 
-        for (nid, label) in nodes:
+        build = minimal_coverability_set if minimal else karp_miller
 
-            x, y = positions[nid]
+        coverability = build(packed, initial, monitor)
 
-            ax.plot(x, y, 'o', color='orange', markersize=15)
-
-            ax.text(x, y, label, fontsize=10, ha='center', va='center', color='black')
+        graph = ReachabilityGraph.from_coverability(coverability)
  
-        ax.axis('off')
-
-        plt.title("Arborescence des états atteignables - Réseau non borné")
+        nodes = graph.nodes()
 
-        plt.show()
- 
-    def reachable_states_non_borne(self):
+        edges = graph.edges()
 
-        visited = []
+        if export is not None:
 
-        to_visit = deque()
+            export_graph(nodes, edges, export)
 
-        to_visit.append(self.initial_marking)
+            return graph
  
-        nodes = []
-
-        edges = []
- 
-        while to_visit:
-
-            current = to_visit.popleft()
-
-           
-
-            for i, v in enumerate(visited):
-
-                new_marking, updated = self.omega_covering(current.copy(), [v])
-
-                if updated:
+        positions = self.generate_positions(nodes, edges)
 
-                    current = new_marking
+        self.draw_graph(nodes, edges, positions)
 
-            current_id = self.marking_to_tuple(current)
+        return graph
+ 
+    def is_coverable(self, target):
 
-            if current_id in [self.marking_to_tuple(m) for m in visited]:
+        # Analyse en arrière (coverability.backward_coverability) : un marquage couvrant
+        # `target` ({place: jetons}) est-il accessible ? Sans arbre de couverture, termine
+        # aussi sur les réseaux non bornés ; renvoie une séquence témoin (liste de
+        # transitions, vide si le marquage initial couvre déjà `target`) ou None
 
-                continue
+        packed = PackedNet(self.places, self.transitions, self.pre, self.post)
 
-            visited.append(current)
+        return backward_coverability(packed, omega_marking(packed, self.initial_marking),
 
-            nodes.append((current_id, self.marking_str(current)))
+                                     omega_marking(packed, target))
  
-            for t in self.transitions:
+    def structural_analysis(self):
 
-                if self.is_enabled(current, t):
+        # Bornage sans arbre de couverture : bornes des places par programmation linéaire
+        # (None : place non structurellement bornée) et lois de conservation (P-semiflots,
+        # algorithme de Farkas) ; renvoie {'bounds', 'conservation_laws', 'conservative',
+        # 'consistent'} sans rien afficher
 
-                    next_marking = self.fire(current, t)
+        packed = PackedNet(self.places, self.transitions, self.pre, self.post)
 
+        structure = StructuralAnalysis(packed)
 
-                    for v in visited:
+        return {
 
-                        next_marking, _ = self.omega_covering(next_marking, [v])
+            'bounds': structure.bounds(self.initial_marking),
 
-                    next_id = self.marking_to_tuple(next_marking)
+            'conservation_laws': structure.conservation_laws(self.initial_marking),
 
-                    edges.append((current_id, next_id, t))
+            'conservative': structure.is_conservative(),
 
-                    if next_id not in [self.marking_to_tuple(m) for m in visited]:
+            'consistent': structure.is_consistent(),
 
-                        to_visit.append(next_marking)
- 
-        positions = self.generate_positions(nodes, edges)
-
-        self.draw_graph(nodes, edges, positions)
+        }
  
 
 
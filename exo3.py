@@ -1,37 +1,26 @@
+import os
 import networkx as nx
 import matplotlib.pyplot as plt
-from typing import List, Dict, Set, Tuple
+from typing import Dict, Tuple
 from enum import Enum
+from simulation import PetriNet
+from recorder import FrameRecorder
+from scheduler import IncrementalScheduler
+from reachability import PackedNet, explore
+from properties import PlaceBound
+from reachgraph import ReachabilityGraph
+from fairness import starvation
+from structural import StructuralAnalysis
+from exo2 import PetriNet as UnboundedPetriNet
 
 class LightColor(Enum):
     RED = "Rouge"
     GREEN = "Vert"
     YELLOW = "Jaune"
 
-class TrafficLightSystem:
-    def __init__(self):
-        self.places = {}
-        self.transitions = set()
-        self.input_arcs = {}
-        self.output_arcs = {}
-        self.graph = nx.DiGraph()
-        
-    def add_place(self, place_id: str, marking: int = 0):
-        self.places[place_id] = marking
-        self.graph.add_node(place_id, type='place', marking=marking)
-    
-    def add_transition(self, transition_id: str):
-        self.transitions.add(transition_id)
-        self.graph.add_node(transition_id, type='transition')
-    
-    def add_input_arc(self, place_id: str, transition_id: str, weight: int = 1):
-        self.input_arcs[(place_id, transition_id)] = weight
-        self.graph.add_edge(place_id, transition_id, weight=weight, type='input')
-    
-    def add_output_arc(self, transition_id: str, place_id: str, weight: int = 1):
-        self.output_arcs[(transition_id, place_id)] = weight
-        self.graph.add_edge(transition_id, place_id, weight=weight, type='output')
-    
+class TrafficLightSystem(PetriNet):
+    """Réseau de Petri des feux de circulation (structure partagée avec simulation.PetriNet)"""
+
     def build_traffic_light_model(self):
         """Construit le modèle de feux de circulation pour un carrefour à 2 tronçons"""
         
@@ -91,62 +80,31 @@ class TrafficLightSystem:
         self.add_input_arc("Timer_Yellow", "T_EW_Yellow_End", 1)
         self.add_output_arc("T_EW_Yellow_End", "EW_Red", 1)
     
-    def get_light_states(self) -> Dict[str, str]:
-        """Retourne l'état actuel des feux"""
+    def get_light_states(self, marking: Dict[str, int] = None) -> Dict[str, str]:
+        """Retourne l'état des feux (marquage courant, ou `marking` s'il est donné)"""
+        places = self.places if marking is None else marking
         states = {}
         
        
-        if self.places["NS_Red"] > 0:
+        if places["NS_Red"] > 0:
             states["Nord-Sud"] = "Rouge"
-        elif self.places["NS_Green"] > 0:
+        elif places["NS_Green"] > 0:
             states["Nord-Sud"] = "Vert"
-        elif self.places["NS_Yellow"] > 0:
+        elif places["NS_Yellow"] > 0:
             states["Nord-Sud"] = "Jaune"
         
 
-        if self.places["EW_Red"] > 0:
+        if places["EW_Red"] > 0:
             states["Est-Ouest"] = "Rouge"
-        elif self.places["EW_Green"] > 0:
+        elif places["EW_Green"] > 0:
             states["Est-Ouest"] = "Vert"
-        elif self.places["EW_Yellow"] > 0:
+        elif places["EW_Yellow"] > 0:
             states["Est-Ouest"] = "Jaune"
             
         return states
     
-    def is_transition_enabled(self, transition_id: str) -> bool:
-        """Vérifie si une transition est franchissable"""
-        for (place, trans) in self.input_arcs:
-            if trans == transition_id:
-                weight = self.input_arcs[(place, trans)]
-                if self.places[place] < weight:
-                    return False
-        return True
-    
-    def fire_transition(self, transition_id: str) -> bool:
-        """Franchit une transition si elle est enabled"""
-        if not self.is_transition_enabled(transition_id):
-            return False
-        
-        # Retirer les jetons des places d'entrée
-        for (place, trans) in self.input_arcs:
-            if trans == transition_id:
-                weight = self.input_arcs[(place, trans)]
-                self.places[place] -= weight
-                self.graph.nodes[place]['marking'] = self.places[place]
-        
-        # Ajouter les jetons aux places de sortie
-        for (trans, place) in self.output_arcs:
-            if trans == transition_id:
-                weight = self.output_arcs[(trans, place)]
-                self.places[place] += weight
-                self.graph.nodes[place]['marking'] = self.places[place]
-        
-        return True
-    
-    def visualize(self, title="Système de Feux de Circulation"):
-        """Visualise le réseau de Petri avec les états des feux"""
-        plt.figure(figsize=(16, 10))
-        
+    def layout(self) -> Dict[str, Tuple[float, float]]:
+        """Positions fixes des nœuds du carrefour"""
         # Positionnement complet de tous les nœuds
         pos = {
             # Places Nord-Sud
@@ -164,7 +122,8 @@ class TrafficLightSystem:
         }
         
         # Vérifier que tous les nœuds ont une position
-        missing_positions = [node for node in self.graph.nodes() if node not in pos]
+        nodes = list(self.places) + self.arcs.transition_ids
+        missing_positions = [node for node in nodes if node not in pos]
         if missing_positions:
             print(f"ATTENTION: Nœuds sans position: {missing_positions}")
             # Ajouter des positions par défaut pour les nœuds manquants
@@ -172,24 +131,43 @@ class TrafficLightSystem:
             for node in missing_positions:
                 pos[node] = (2, base_y)
                 base_y -= 1
+        return pos
+
+    def place_colors(self) -> Dict[str, str]:
+        """Couleur de chaque place selon le feu qu'elle représente et son marquage"""
+        colors = {}
+        for place, tokens in self.places.items():
+            if "Red" in place and tokens > 0:
+                colors[place] = 'red'
+            elif "Green" in place and tokens > 0:
+                colors[place] = 'green'
+            elif "Yellow" in place and tokens > 0:
+                colors[place] = 'yellow'
+            elif "Timer" in place:
+                colors[place] = 'orange'
+            else:
+                colors[place] = 'lightgray'
+        return colors
+
+    def status_text(self) -> str:
+        light_states = self.get_light_states()
+        return f"ÉTAT DES FEUX:\nNord-Sud: {light_states.get('Nord-Sud', '?')}\nEst-Ouest: {light_states.get('Est-Ouest', '?')}"
+
+    def visualize(self, title="Système de Feux de Circulation"):
+        """Visualise le réseau de Petri avec les états des feux"""
+        if self.headless:
+            return
+        plt.figure(figsize=(16, 10))
+        
+        pos = self.layout()
         
         # Séparer les places et transitions pour un affichage différent
         place_nodes = [node for node in self.graph.nodes() if node in self.places]
         transition_nodes = [node for node in self.graph.nodes() if node in self.transitions]
         
         # Dessiner les places (cercles)
-        place_colors = []
-        for place in place_nodes:
-            if "Red" in place and self.places[place] > 0:
-                place_colors.append('red')
-            elif "Green" in place and self.places[place] > 0:
-                place_colors.append('green')
-            elif "Yellow" in place and self.places[place] > 0:
-                place_colors.append('yellow')
-            elif "Timer" in place:
-                place_colors.append('orange')
-            else:
-                place_colors.append('lightgray')
+        colors = self.place_colors()
+        place_colors = [colors[place] for place in place_nodes]
         
         nx.draw_networkx_nodes(self.graph, pos, nodelist=place_nodes,
                               node_shape='o', node_size=1500,
@@ -224,8 +202,7 @@ class TrafficLightSystem:
         nx.draw_networkx_edge_labels(self.graph, pos, edge_labels, font_size=7)
         
         # État des feux
-        light_states = self.get_light_states()
-        plt.text(2, 4.5, f"ÉTAT DES FEUX:\nNord-Sud: {light_states.get('Nord-Sud', '?')}\nEst-Ouest: {light_states.get('Est-Ouest', '?')}",
+        plt.text(2, 4.5, self.status_text(),
                 fontsize=12, ha='center', bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
         
         plt.title(title, fontsize=14, fontweight='bold')
@@ -233,28 +210,44 @@ class TrafficLightSystem:
         plt.tight_layout()
         plt.show()
     
-    def print_current_state(self):
+    def print_current_state(self, scheduler=None):
         """Affiche l'état courant du système"""
         states = self.get_light_states()
         print(f"État actuel: NS={states['Nord-Sud']}, EW={states['Est-Ouest']}")
         print(f"Marquage: {self.places}")
         
-        enabled = [t for t in self.transitions if self.is_transition_enabled(t)]
+        if scheduler is None:
+            scheduler = IncrementalScheduler(self)
+        enabled = scheduler.enabled_transitions()
         print(f"Transitions enabled: {enabled}")
         print()
 
-def simulate_complete_cycle():
-    """Simule un cycle complet des feux de circulation"""
+def simulate_complete_cycle(recorder_dir=None):
+    """Simule un cycle complet des feux de circulation
+
+    Avec recorder_dir, les états sont enregistrés en images (et en GIF) au lieu d'être affichés.
+    """
     print("=== SIMULATION COMPLÈTE DU SYSTÈME DE FEUX ===")
     
     # Créer le système
     system = TrafficLightSystem()
     system.build_traffic_light_model()
-    
+    scheduler = IncrementalScheduler(system)
+    if recorder_dir is None:
+        _run_cycle(system, scheduler, system.visualize)
+        return system
+    # Le recorder est fermé (pool de rendu arrêté) même si la simulation échoue
+    with FrameRecorder(system, recorder_dir,
+                       animation=os.path.join(recorder_dir, "cycle.gif")) as recorder:
+        _run_cycle(system, scheduler, recorder.record)
+    return system
+
+def _run_cycle(system, scheduler, show):
+    """Franchit la séquence de phases du cycle en affichant chaque état avec show(titre)"""
     # État initial
     print("État initial:")
-    system.print_current_state()
-    system.visualize("État Initial")
+    system.print_current_state(scheduler)
+    show("État Initial")
     
     # Séquence de simulation
     simulation_steps = [
@@ -272,66 +265,110 @@ def simulate_complete_cycle():
     for transition, description in simulation_steps:
         print(f"\n--- Étape {step_count}: {description} ---")
         
-        if system.is_transition_enabled(transition):
-            system.fire_transition(transition)
-            system.print_current_state()
-            system.visualize(f"Étape {step_count}: {description}")
+        if scheduler.is_enabled(transition):
+            scheduler.fire(transition)
+            system.print_current_state(scheduler)
+            show(f"Étape {step_count}: {description}")
         else:
             print(f"❌ Transition {transition} non enabled!")
             # Afficher pourquoi elle n'est pas enabled
-            for (place, trans) in system.input_arcs:
-                if trans == transition:
-                    weight = system.input_arcs[(place, trans)]
-                    available = system.places[place]
-                    print(f"   Place {place}: disponible={available}, requis={weight}")
+            for place, weight in system.arcs.input_weights(transition):
+                available = system.places[place]
+                print(f"   Place {place}: disponible={available}, requis={weight}")
         
         step_count += 1
-    
-    return system
 
-def analyze_system_properties(system):
-    """Analyse les propriétés du système"""
+def _analysis_net(system):
+    """Réseau compilé et marquage courant du système, pour l'exploration"""
+    places, transitions, pre, post, marking = system.to_pre_post()
+    net = PackedNet(places, transitions, pre, post)
+    return net, net.pack(marking)
+
+def _print_trace(violation):
+    print(f"   Contre-exemple ({len(violation.transitions)} franchissements): "
+          f"{' -> '.join(violation.transitions) or 'marquage initial'}")
+
+def _print_lasso(lasso):
+    print(f"   Contre-exemple: {' -> '.join(lasso.stem) or 'marquage initial'}, "
+          f"puis en boucle: {' -> '.join(lasso.cycle)}")
+
+def analyze_system_properties(system, bound=2):
+    """Analyse les propriétés du système sur les marquages accessibles depuis l'état courant
+
+    La sécurité est une question de couverture, résolue en arrière ; les autres propriétés
+    sont vérifiées pendant l'exploration, qui s'arrête au premier contre-exemple.
+    """
     print("\n=== ANALYSE DES PROPRIÉTÉS ===")
+    net, initial = _analysis_net(system)
     
-    # Vérification de la sécurité (pas deux feux verts en même temps)
-    states = system.get_light_states()
-    safe = not (states['Nord-Sud'] == 'Vert' and states['Est-Ouest'] == 'Vert')
-    print(f"✅ Sécurité (pas deux verts simultanés): {'OUI' if safe else 'NON'}")
-    
-    # Vérification de la vivacité (pas de famine)
-    # Le système alterne naturellement entre les directions
-    print(f"✅ Vivacité (pas de famine): OUI")
+    # Vérification de la sécurité (pas deux feux verts en même temps) : le marquage
+    # NS_Green = EW_Green = 1 est-il couvrable ? Le témoin est une séquence qui y mène
+    witness = UnboundedPetriNet(*system.to_pre_post()).is_coverable({"NS_Green": 1, "EW_Green": 1})
+    print(f"✅ Sécurité (pas deux verts simultanés): {'OUI' if witness is None else 'NON'}")
+    if witness is not None:
+        print(f"   Contre-exemple ({len(witness)} franchissements): {' -> '.join(witness) or 'marquage initial'}")
     
+    # Vérification de la vivacité (pas de famine) : chaque transition reste franchissable
+    # depuis tout état accessible (elle étiquette un arc de chaque composante terminale)
+    graph = ReachabilityGraph.from_state_space(explore(net, initial))
+    live = graph.live_transitions()
+    print(f"✅ Vivacité (transitions vivantes): {'OUI' if graph.is_live() else 'NON'}")
+    if not graph.is_live():
+        print(f"   Transitions non vivantes: {', '.join(t for t in net.transitions if t not in live)}")
+    print(f"✅ Réversibilité (retour à l'état courant): {'OUI' if graph.is_reversible() else 'NON'}")
 
-    max_tokens = max(system.places.values())
-    bounded = max_tokens <= 2  # Le système est borné si aucun marquage > 2
-    print(f"✅ Bornage (marquage limité): {'OUI' if bounded else 'NON'} (max={max_tokens})")
+    # Famine : exécution infinie où une direction n'obtient plus jamais le vert, selon l'équité supposée
+    for green in ("T_NS_Green_Start", "T_EW_Green_Start"):
+        for fairness, label in ((None, "sans équité"), ('weak', "équité faible"), ('strong', "équité forte")):
+            lasso = starvation(graph, green, fairness)
+            print(f"✅ Absence de famine pour {green} ({label}): {'OUI' if lasso is None else 'NON'}")
+            if lasso is not None:
+                _print_lasso(lasso)
     
-  
-    print(f"✅ États valides: NS-Rouge/EW-Vert, NS-Vert/EW-Rouge, transitions par jaune")
+    # Bornage structurel : les P-sous-semiflots (y·M ≤ y·M0) bornent les places sans énumérer les marquages
+    structure = StructuralAnalysis(net)
+    marking = net.to_dict(initial)
+    bounds = structure.bounds(marking)
+    if structure.is_structurally_bounded() and max(bounds.values(), default=0) <= bound:
+        print(f"✅ Bornage (marquage limité): OUI (structurel, max={max(bounds.values(), default=0)})")
+        for law in structure.conservation_laws(marking):
+            print(f"   Conservation: {law}")
+    else:
+        if not structure.is_structurally_bounded():
+            print(f"   Places non structurellement bornées: {', '.join(structure.unbounded_places())}")
+        # Sinon : aucune place ne dépasse `bound` jetons (l'exploration s'arrête au premier dépassement)
+        space = explore(net, initial, properties=[PlaceBound(p, bound) for p in net.places])
+        violation = space.violation
+        if violation is None:
+            max_tokens = max(max(space.marking(i).values()) for i in range(len(space)))
+            print(f"✅ Bornage (marquage limité): OUI (max={max_tokens})")
+        else:
+            print(f"✅ Bornage (marquage limité): NON ({violation.property!r} violé)")
+            _print_trace(violation)
 
 def simple_reachability_analysis(system):
-    """Analyse simplifiée des états atteignables"""
+    """Analyse des états atteignables (exploration du graphe des marquages depuis l'état courant)"""
     print("\n=== ANALYSE DES ÉTATS ATTEIGNABLES ===")
+    net, initial = _analysis_net(system)
+    space = explore(net, initial)
     
- 
-    base_states = [
-        {"NS": "Rouge", "EW": "Vert", "Description": "État initial - EW prioritaire"},
-        {"NS": "Jaune", "EW": "Rouge", "Description": "Transition EW→NS"},
-        {"NS": "Vert", "EW": "Rouge", "Description": "NS prioritaire"},
-        {"NS": "Rouge", "EW": "Jaune", "Description": "Transition NS→EW"},
-    ]
-    
-    print("États atteignables identifiés:")
-    for i, state in enumerate(base_states, 1):
-        print(f"  État {i}: NS={state['NS']}, EW={state['EW']} - {state['Description']}")
+    print(f"États atteignables identifiés ({len(space)}):")
+    for i in range(len(space)):
+        marking = space.marking(i)
+        states = system.get_light_states(marking)
+        print(f"  État {i + 1}: NS={states.get('Nord-Sud', '-')}, EW={states.get('Est-Ouest', '-')} "
+              f"- {net.marking_str(space.states[i])}")
     
-    # Vérification d'interblocage
-    enabled_transitions = [t for t in system.transitions if system.is_transition_enabled(t)]
-    deadlock = len(enabled_transitions) == 0
-    print(f"\n🔍 Interblocage (deadlock): {'OUI ❌' if deadlock else 'NON ✅'}")
+    # Vérification d'interblocage : états accessibles sans successeur
+    has_successor = set(int(s) for s in space.edge_src)
+    deadlocks = [i for i in range(len(space)) if i not in has_successor]
+    print(f"\n🔍 Interblocage (deadlock): {'OUI ❌' if deadlocks else 'NON ✅'}")
     
-    if not deadlock:
+    if deadlocks:
+        trace = [net.transitions[t] for t in space.trace(deadlocks[0])]
+        print(f"   Plus court chemin vers un blocage: {' -> '.join(trace) or 'marquage initial'}")
+    else:
+        enabled_transitions = [t for t in system.transitions if system.is_transition_enabled(t)]
         print(f"   Transitions disponibles: {len(enabled_transitions)}")
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+from collections import deque
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from reachgraph import ReachabilityGraph
+
+
+class Lasso:
+    """Contre-exemple infini : un préfixe depuis le marquage initial puis un cycle répété indéfiniment"""
+
+    def __init__(self, transition: str, fairness: Optional[str], stem_states: List[int], stem: List[str],
+                 cycle_states: List[int], cycle: List[str], describe: Callable[[int], str]):
+        self.transition = transition
+        self.fairness = fairness
+        self.stem_states = stem_states
+        self.stem = stem
+        self.cycle_states = cycle_states
+        self.cycle = cycle
+        self.describe = describe
+
+    @property
+    def markings(self) -> List[str]:
+        """Marquages du préfixe (jusqu'à l'entrée du cycle) puis du cycle"""
+        return [self.describe(s) for s in self.stem_states + self.cycle_states]
+
+    def __repr__(self):
+        stem = " -> ".join(self.stem) or "(marquage initial)"
+        return f"Lasso(famine de {self.transition}, préfixe: {stem}, cycle: ({' -> '.join(self.cycle)})^ω)"
+
+
+def _fair_components(graph: ReachabilityGraph, t: int, fairness: Optional[str]):
+    """Composantes du graphe privé des arcs t qui contiennent un cycle équitable évitant t.
+
+    Renvoie (composante de chaque état, composantes retenues, clés des
+    couples (composante, transition) franchissables / franchis dans la
+    composante), ou None. Sans équité ou en équité faible, une seule passe
+    suffit : le cycle qui parcourt toute la composante est le plus favorable.
+    En équité forte, les états où une transition franchissable n'est jamais
+    franchie dans la composante sont retirés et l'on recommence (au plus une
+    passe par transition fautive, comme l'algorithme d'Emerson et Lei).
+    """
+    n, size = len(graph), len(graph.transitions)
+    src, dst, labels = graph.sources(), graph.indices, graph.labels
+    # u est franchissable en s ssi un arc étiqueté u sort de s (le graphe doit être complet)
+    pairs = np.unique(src * size + labels)
+    enabled_state, enabled_label = pairs // size, pairs % size
+    active = np.ones(n, dtype=bool)
+    while True:
+        keep = (labels != t) & active[src] & active[dst]
+        sub = ReachabilityGraph.from_edges(n, src[keep], dst[keep], labels[keep], graph.transitions)
+        comp, _ = sub.components()
+        sub_src = sub.sources()
+        internal = comp[sub_src] == comp[sub.indices]
+        nontrivial = np.unique(comp[sub_src[internal]])
+        if len(nontrivial) == 0:
+            return None
+        in_cycle = np.isin(comp, nontrivial) & active
+        fired = np.unique(comp[sub_src[internal]] * size + sub.labels[internal])
+        on = in_cycle[enabled_state]
+        keys, counts = np.unique(comp[enabled_state[on]] * size + enabled_label[on], return_counts=True)
+        if fairness is None:
+            bad = keys[:0]
+        elif fairness == 'weak':
+            # u franchissable dans tous les états de la composante mais jamais franchi dedans
+            sizes = np.bincount(comp[in_cycle], minlength=n)
+            everywhere = keys[counts == sizes[keys // size]]
+            bad = everywhere[~np.isin(everywhere, fired)]
+        else:
+            # u franchissable dans un état de la composante mais jamais franchi dedans
+            bad = keys[~np.isin(keys, fired)]
+        good = np.setdiff1d(nontrivial, bad // size)
+        if len(good):
+            return comp, good, keys, fired
+        if fairness != 'strong':
+            return None
+        culprit = on & np.isin(comp[enabled_state] * size + enabled_label, bad)
+        active = in_cycle
+        active[enabled_state[culprit]] = False
+
+
+def _shortest_path(indptr: List[int], indices: List[int], start: int, allowed: Callable[[int], bool],
+                   goal: Callable[[int], bool]) -> Optional[List[int]]:
+    """Arcs (indices CSR) du plus court chemin de start jusqu'à un arc but, arcs permis seulement"""
+    parent = {}
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        v = queue.popleft()
+        for i in range(indptr[v], indptr[v + 1]):
+            if not allowed(i):
+                continue
+            if goal(i):
+                path = [i]
+                while v != start:
+                    v, j = parent[v]
+                    path.append(j)
+                return path[::-1]
+            w = indices[i]
+            if w not in seen:
+                seen.add(w)
+                parent[w] = (v, i)
+                queue.append(w)
+    return None
+
+
+def starvation(graph: ReachabilityGraph, transition: str, fairness: Optional[str] = None) -> Optional[Lasso]:
+    """Exécution infinie qui ne franchit plus jamais `transition` (famine), ou None.
+
+    fairness : None (toutes les exécutions), 'weak' (toute transition
+    continûment franchissable finit par être franchie) ou 'strong' (toute
+    transition infiniment souvent franchissable est infiniment souvent
+    franchie). Le graphe doit être complet (exploration sans réduction) :
+    la franchissabilité est lue sur les arcs sortants. La recherche est
+    linéaire en la taille du graphe (une passe de Tarjan, une par
+    transition fautive en équité forte) ; le contre-exemple renvoyé est un
+    lasso : plus court préfixe jusqu'à une composante équitable, puis un
+    cycle qui y satisfait chaque obligation d'équité.
+    """
+    if fairness not in (None, 'weak', 'strong'):
+        raise ValueError(f"équité inconnue : {fairness!r} (None, 'weak' ou 'strong')")
+    t = graph.transitions.index(transition)
+    found = _fair_components(graph, t, fairness)
+    if found is None:
+        return None
+    comp, good, enabled, fired = found
+    size = len(graph.transitions)
+    indptr, indices, labels = graph.indptr.tolist(), graph.indices.tolist(), graph.labels.tolist()
+    comp = comp.tolist()
+    good = set(good.tolist())
+
+    stem = [] if comp[0] in good else _shortest_path(indptr, indices, 0, lambda i: True,
+                                                     lambda i: comp[indices[i]] in good)
+    entry = indices[stem[-1]] if stem else 0
+    c = comp[entry]
+    enabled_here = [k % size for k in enabled.tolist() if k // size == c]
+    fired_here = {k % size for k in fired.tolist() if k // size == c}
+
+    def inside(i: int) -> bool:
+        return labels[i] != t and comp[indices[i]] == c
+
+    def is_enabled(s: int, u: int) -> bool:
+        return u in labels[indptr[s]:indptr[s + 1]]
+
+    # Obligations du cycle : franchir u, ou traverser un état où u est bloquée (équité faible)
+    cycle: List[int] = []
+    current = entry
+    for u in enabled_here:
+        if fairness is None:
+            break
+        if u in fired_here:
+            if any(labels[i] == u for i in cycle):
+                continue
+            path = _shortest_path(indptr, indices, current, inside, lambda i: labels[i] == u)
+        else:
+            if not is_enabled(entry, u) or any(not is_enabled(indices[i], u) for i in cycle):
+                continue
+            path = _shortest_path(indptr, indices, current, inside, lambda i: not is_enabled(indices[i], u))
+        cycle += path
+        current = indices[path[-1]]
+    if current != entry or not cycle:
+        cycle += _shortest_path(indptr, indices, current, inside, lambda i: indices[i] == entry)
+
+    names = graph.transitions
+    return Lasso(transition, fairness, [0] + [indices[i] for i in stem], [names[labels[i]] for i in stem],
+                 [indices[i] for i in cycle], [names[labels[i]] for i in cycle], graph.describe)
@@ -0,0 +1,126 @@
+import json
+import time
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure de la mémoire résidente
+    resource = None
+
+
+class ExplorationStats:
+    """Compteurs d'une exploration, tenus à jour par le moteur à chaque paquet (ou nœud).
+
+    frontier : états découverts mais pas encore développés ; duplicates :
+    successeurs calculés qui étaient déjà connus (ou couverts).
+    """
+
+    def __init__(self, engine: str, key_size: int = 0):
+        self.engine = engine
+        self.key_size = key_size
+        self.states = 0
+        self.edges = 0
+        self.expanded = 0
+        self.frontier = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.started = time.monotonic()
+
+    def snapshot(self, event: str = "progress") -> dict:
+        elapsed = time.monotonic() - self.started
+        record = {
+            'event': event,
+            'engine': self.engine,
+            'elapsed': round(elapsed, 3),
+            'states': self.states,
+            'edges': self.edges,
+            'expanded': self.expanded,
+            'frontier': self.frontier,
+            'duplicates': self.duplicates,
+            # Part des successeurs calculés qui étaient déjà connus
+            'duplicate_ratio': round(self.duplicates / self.edges, 4) if self.edges else 0.0,
+            'states_per_second': round(self.states / elapsed, 1) if elapsed > 0 else 0.0,
+            'batches': self.batches,
+        }
+        if self.key_size:
+            record['state_bytes'] = self.states * self.key_size
+        if resource is not None:
+            # ru_maxrss : kilo-octets sous Linux
+            record['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        return record
+
+
+class Monitor:
+    """Crochets d'instrumentation des moteurs d'exploration.
+
+    Le moteur appelle start(stats), tick(stats) après chaque paquet (ou
+    nœud) puis finish(stats). tick ne transmet à progress qu'au plus une
+    fois toutes les `interval` secondes. Sans moniteur (monitor=None), les
+    moteurs ne font aucun de ces appels.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._next = 0.0
+
+    def tick(self, stats: ExplorationStats):
+        now = time.monotonic()
+        if now >= self._next:
+            self._next = now + self.interval
+            self.progress(stats)
+
+    def start(self, stats: ExplorationStats):
+        pass
+
+    def progress(self, stats: ExplorationStats):
+        pass
+
+    def finish(self, stats: ExplorationStats):
+        pass
+
+
+class CallbackMonitor(Monitor):
+    """Moniteur qui transmet les compteurs à des fonctions utilisateur"""
+
+    def __init__(self, on_progress: Optional[Callable[[ExplorationStats], None]] = None,
+                 on_finish: Optional[Callable[[ExplorationStats], None]] = None, interval: float = 1.0):
+        super().__init__(interval)
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+
+    def progress(self, stats: ExplorationStats):
+        if self.on_progress is not None:
+            self.on_progress(stats)
+
+    def finish(self, stats: ExplorationStats):
+        if self.on_finish is not None:
+            self.on_finish(stats)
+
+
+class JsonLinesReporter(Monitor):
+    """Écrit une photographie des compteurs par ligne JSON (début, périodiquement, fin).
+
+    `target` est un chemin (fichier ouvert en ajout, fermé à la fin) ou un
+    flux texte déjà ouvert. Chaque ligne est vidée aussitôt : `tail -f`
+    suit l'exploration en cours.
+    """
+
+    def __init__(self, target, interval: float = 1.0):
+        super().__init__(interval)
+        self._owned = isinstance(target, str)
+        self._out = open(target, 'a', encoding='utf-8') if self._owned else target
+
+    def _write(self, stats: ExplorationStats, event: str):
+        self._out.write(json.dumps(stats.snapshot(event)) + "\n")
+        self._out.flush()
+
+    def start(self, stats: ExplorationStats):
+        self._write(stats, "start")
+
+    def progress(self, stats: ExplorationStats):
+        self._write(stats, "progress")
+
+    def finish(self, stats: ExplorationStats):
+        self._write(stats, "finish")
+        if self._owned:
+            self._out.close()
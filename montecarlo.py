@@ -0,0 +1,143 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Union
+
+from simulation import CompiledPetriNet, PetriNet
+
+
+class BatchResult:
+    """Résultat d'un lot de K exécutions indépendantes du jeu de jetons"""
+
+    def __init__(self, place_ids, transition_ids, final_markings, steps_taken,
+                 deadlocked, hit_step=None, traces=None):
+        self.place_ids = place_ids
+        self.transition_ids = transition_ids
+        self.final_markings = final_markings   # K x |P|
+        self.steps_taken = steps_taken         # K
+        self.deadlocked = deadlocked           # K (booléens)
+        self.hit_step = hit_step               # K, -1 si la cible n'est jamais atteinte
+        self.traces = traces                   # K x N, -1 après l'arrêt de l'exécution
+
+    @property
+    def runs(self) -> int:
+        return len(self.steps_taken)
+
+    def hit_probability(self) -> float:
+        """Proportion des exécutions ayant atteint la cible"""
+        if self.hit_step is None:
+            raise ValueError("aucune cible n'a été fournie à la simulation")
+        return float(np.mean(self.hit_step >= 0))
+
+    def deadlock_probability(self) -> float:
+        return float(np.mean(self.deadlocked))
+
+    def mean_final_marking(self) -> Dict[str, float]:
+        return dict(zip(self.place_ids, self.final_markings.mean(axis=0).tolist()))
+
+    def trace(self, run: int) -> List[str]:
+        """Séquence de franchissement de l'exécution `run`"""
+        if self.traces is None:
+            raise ValueError("les traces n'ont pas été enregistrées (record_traces=False)")
+        return [self.transition_ids[t] for t in self.traces[run] if t >= 0]
+
+
+class BatchSimulator:
+    """Jeu de jetons aléatoire vectorisé sur K exécutions indépendantes.
+
+    Les marquages sont une matrice K x |P| ; à chaque pas, chaque exécution
+    franchit une transition tirée uniformément parmi ses transitions
+    franchissables (tirage vectorisé), jusqu'à N pas ou un blocage.
+    """
+
+    def __init__(self, net: Union[PetriNet, CompiledPetriNet], seed=None):
+        compiled = net if isinstance(net, CompiledPetriNet) else net.compile()
+        self.place_ids = compiled.place_ids
+        self.place_index = compiled.place_index
+        self.transition_ids = compiled.transition_ids
+        self.incidence = compiled.incidence
+        self.initial_marking = compiled.marking.copy()
+        self.rng = np.random.default_rng(seed)
+
+        # Arcs d'entrée triés par transition : test de sensibilisation par reduceat
+        arc_t, arc_p = np.nonzero(compiled.pre)
+        self._arc_p = arc_p
+        self._arc_w = compiled.pre[arc_t, arc_p]
+        self._with_input, self._starts = np.unique(arc_t, return_index=True)
+
+    def enabled(self, markings: np.ndarray) -> np.ndarray:
+        """Matrice K x |T| des transitions franchissables pour chaque exécution"""
+        enabled = np.ones((markings.shape[0], len(self.transition_ids)), dtype=bool)
+        if len(self._arc_p):
+            ok = markings[:, self._arc_p] >= self._arc_w
+            enabled[:, self._with_input] = np.logical_and.reduceat(ok, self._starts, axis=1)
+        return enabled
+
+    def _target_predicate(self, target) -> Callable[[np.ndarray], np.ndarray]:
+        if callable(target):
+            return target
+        cols = np.array([self.place_index[p] for p in target], dtype=np.intp)
+        values = np.array(list(target.values()), dtype=np.int64)
+        return lambda markings: np.all(markings[:, cols] == values, axis=1)
+
+    def run(self, runs: int, steps: int,
+            target: Optional[Union[Dict[str, int], Callable[[np.ndarray], np.ndarray]]] = None,
+            record_traces: bool = False, chunk_size: Optional[int] = None) -> BatchResult:
+        """Simule `runs` exécutions de `steps` pas au plus.
+
+        `target` est soit un marquage partiel {place: jetons}, soit un prédicat
+        vectorisé recevant la matrice K x |P| et renvoyant K booléens ; on
+        enregistre alors le premier pas où chaque exécution l'atteint. Les
+        exécutions sont traitées par paquets de `chunk_size` pour borner la
+        mémoire (K x |T| booléens par pas).
+        """
+        n_trans = len(self.transition_ids)
+        if chunk_size is None:
+            chunk_size = max(1, (1 << 22) // max(n_trans, 1))
+        predicate = self._target_predicate(target) if target is not None else None
+
+        finals = np.empty((runs, len(self.place_ids)), dtype=np.int64)
+        steps_taken = np.zeros(runs, dtype=np.int64)
+        deadlocked = np.zeros(runs, dtype=bool)
+        hit_step = np.full(runs, -1, dtype=np.int64) if predicate is not None else None
+        traces = np.full((runs, steps), -1, dtype=np.int32) if record_traces else None
+
+        for start in range(0, runs, chunk_size):
+            stop = min(start + chunk_size, runs)
+            k = stop - start
+            markings = np.tile(self.initial_marking, (k, 1))
+            alive = np.ones(k, dtype=bool)
+            hits = hit_step[start:stop] if hit_step is not None else None
+            if hits is not None:
+                hits[predicate(markings)] = 0
+
+            for step in range(steps):
+                rows = np.flatnonzero(alive)
+                if len(rows) == 0:
+                    break
+                enabled = self.enabled(markings[rows])
+                has_enabled = enabled.any(axis=1)
+                blocked = rows[~has_enabled]
+                deadlocked[start + blocked] = True
+                alive[blocked] = False
+                rows, enabled = rows[has_enabled], enabled[has_enabled]
+                if len(rows) == 0:
+                    break
+
+                # Tirage uniforme parmi les transitions franchissables
+                draws = self.rng.random(enabled.shape, dtype=np.float32)
+                draws[~enabled] = -1.0
+                choice = draws.argmax(axis=1)
+                markings[rows] += self.incidence[choice]
+                steps_taken[start + rows] += 1
+                if traces is not None:
+                    traces[start + rows, step] = choice
+                if hits is not None:
+                    new_hits = rows[(hits[rows] < 0) & predicate(markings[rows])]
+                    hits[new_hits] = step + 1
+
+            rows = np.flatnonzero(alive)
+            if len(rows):
+                deadlocked[start + rows[~self.enabled(markings[rows]).any(axis=1)]] = True
+            finals[start:stop] = markings
+
+        return BatchResult(self.place_ids, self.transition_ids, finals, steps_taken,
+                           deadlocked, hit_step, traces)
@@ -0,0 +1,178 @@
+import multiprocessing as mp
+import os
+import queue
+import traceback
+import zlib
+from array import array
+from typing import Optional
+
+import numpy as np
+
+from reachability import PackedNet, StateSpace
+
+
+def owner(key: bytes, workers: int) -> int:
+    """Processus propriétaire d'un état (hachage stable d'un processus à l'autre)"""
+    return zlib.crc32(key) % workers
+
+
+def _send(queue, header: array, keys: list):
+    queue.put(('batch', header.tobytes(), b''.join(keys)))
+
+
+def _worker(rank, workers, net: PackedNet, initial, key_size, inboxes, control, results, batch_size):
+    """Corps d'un processus : toute exception est renvoyée au coordinateur ('error', rang, trace)"""
+    try:
+        _expand(rank, workers, net, initial, key_size, inboxes, control, results, batch_size)
+    except BaseException:
+        results.put(('error', rank, traceback.format_exc()))
+
+
+def _expand(rank, workers, net: PackedNet, initial, key_size, inboxes, control, results, batch_size):
+    """Développe la frontière locale et reçoit les successeurs dont il est propriétaire.
+
+    Un message 'batch' contient des triplets (rang source, id local source,
+    transition) et les clés des successeurs ; chaque processus termine un
+    niveau en envoyant 'end' à tous les autres.
+    """
+    index, keys = {}, []
+    edge_src_rank, edge_src, edge_t, edge_dst = array('I'), array('I'), array('I'), array('I')
+    frontier = []
+    if owner(initial, workers) == rank:
+        index[initial] = 0
+        keys.append(initial)
+        frontier.append(0)
+    inbox = inboxes[rank]
+    successors = net.successors
+
+    while control.get() == 'expand':
+        headers = [array('I') for _ in range(workers)]
+        out_keys = [[] for _ in range(workers)]
+        for lid in frontier:
+            for t, succ in successors(keys[lid]):
+                dest = owner(succ, workers)
+                headers[dest].extend((rank, lid, t))
+                out_keys[dest].append(succ)
+                if len(out_keys[dest]) >= batch_size:
+                    _send(inboxes[dest], headers[dest], out_keys[dest])
+                    headers[dest], out_keys[dest] = array('I'), []
+        for dest in range(workers):
+            if out_keys[dest]:
+                _send(inboxes[dest], headers[dest], out_keys[dest])
+            inboxes[dest].put(('end', rank))
+
+        next_frontier = []
+        ends = 0
+        while ends < workers:
+            message = inbox.get()
+            if message[0] == 'end':
+                ends += 1
+                continue
+            header = array('I')
+            header.frombytes(message[1])
+            blob = message[2]
+            for j in range(len(header) // 3):
+                key = blob[j * key_size:(j + 1) * key_size]
+                lid = index.get(key)
+                if lid is None:
+                    lid = index[key] = len(keys)
+                    keys.append(key)
+                    next_frontier.append(lid)
+                edge_src_rank.append(header[3 * j])
+                edge_src.append(header[3 * j + 1])
+                edge_t.append(header[3 * j + 2])
+                edge_dst.append(lid)
+        frontier = next_frontier
+        results.put(('level', rank, len(frontier)))
+
+    results.put(('done', rank, b''.join(keys), len(keys), edge_src_rank.tobytes(),
+                 edge_src.tobytes(), edge_t.tobytes(), edge_dst.tobytes()))
+
+
+def _receive(results, procs, poll: float):
+    """Message suivant des processus ; lève RuntimeError si l'un d'eux a échoué ou disparu"""
+    while True:
+        try:
+            message = results.get(timeout=poll)
+        except queue.Empty:
+            for rank, p in enumerate(procs):
+                if p.exitcode not in (None, 0):
+                    raise RuntimeError(f"le processus {rank} s'est arrêté sans réponse "
+                                       f"(code de sortie {p.exitcode})") from None
+            continue
+        if message[0] == 'error':
+            raise RuntimeError(f"échec du processus {message[1]} :\n{message[2]}")
+        return message
+
+
+def explore_parallel(net: PackedNet, initial: bytes, workers: Optional[int] = None,
+                     batch_size: int = 1024, poll: float = 1.0) -> StateSpace:
+    """Exploration BFS parallèle avec partition des états par hachage.
+
+    Chaque état appartient au processus `crc32(clé) % workers` ; chaque
+    processus développe sa propre frontière et envoie les successeurs à
+    leur propriétaire par paquets. L'exploration avance niveau par niveau ;
+    elle s'arrête quand plus aucun processus n'a d'état nouveau (détection
+    globale par le coordinateur). Le résultat a le même nombre d'états et
+    les mêmes arcs que reachability.explore (numérotation différente,
+    l'état initial gardant le numéro 0). Une exception dans un processus
+    (ou sa disparition, vérifiée toutes les `poll` secondes) arrête tous les
+    processus et lève RuntimeError avec la trace d'origine.
+    """
+    workers = workers or os.cpu_count() or 1
+    ctx = mp.get_context()
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    controls = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(rank, workers, net, initial, len(initial),
+                                               inboxes, controls[rank], results, batch_size),
+                         daemon=True)
+             for rank in range(workers)]
+    for p in procs:
+        p.start()
+
+    try:
+        while True:
+            for control in controls:
+                control.put('expand')
+            new_states = 0
+            for _ in range(workers):
+                _, _, count = _receive(results, procs, poll)
+                new_states += count
+            if new_states == 0:
+                break
+        for control in controls:
+            control.put('stop')
+        parts = {}
+        for _ in range(workers):
+            message = _receive(results, procs, poll)
+            parts[message[1]] = message[2:]
+    finally:
+        # Après un échec, les autres processus attendent encore leurs messages
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+
+    # Numérotation globale : le propriétaire de l'état initial passe en premier
+    first = owner(initial, workers)
+    ranks = [first] + [r for r in range(workers) if r != first]
+    offsets = np.zeros(workers, dtype=np.int64)
+    states, total = [], 0
+    size = len(initial)
+    for r in ranks:
+        blob, count = parts[r][0], parts[r][1]
+        offsets[r] = total
+        states.extend(blob[i:i + size] for i in range(0, count * size, size))
+        total += count
+
+    src, dst, trans = [], [], []
+    for r in ranks:
+        src_rank, src_lid, t, dst_lid = (np.frombuffer(b, dtype=np.uint32) for b in parts[r][2:])
+        src.append(offsets[src_rank] + src_lid)
+        dst.append(offsets[r] + dst_lid)
+        trans.append(t)
+    edge_src = np.concatenate(src).astype(np.uint32) if src else np.zeros(0, np.uint32)
+    edge_dst = np.concatenate(dst).astype(np.uint32) if dst else np.zeros(0, np.uint32)
+    edge_t = np.concatenate(trans).astype(np.uint32) if trans else np.zeros(0, np.uint32)
+    return StateSpace(net, states, edge_src, edge_dst, edge_t)
@@ -0,0 +1,141 @@
+import xml.etree.ElementTree as ET
+from typing import Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from simulation import PetriNet
+
+PNML_NS = "http://www.pnml.org/version-2009/grammar/pnml"
+PTNET_TYPE = "http://www.pnml.org/version-2009/grammar/ptnet"
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _text_of(element, child: str) -> Optional[str]:
+    """Valeur de <child><text>...</text></child> (espaces de noms ignorés)"""
+    for sub in element:
+        if _local(sub.tag) == child:
+            for text in sub:
+                if _local(text.tag) == 'text':
+                    return (text.text or '').strip()
+    return None
+
+
+def read_pnml(path, net: Optional[PetriNet] = None, batch_size: int = 100000) -> PetriNet:
+    """Lit un réseau P/T au format PNML par lecture en flux (iterparse).
+
+    Chaque élément est vidé et détaché dès sa fin de lecture, qu'il soit
+    traité (place, transition, arc, avec leurs sous-éléments) ou ignoré
+    (graphics, toolspecific, name, page...), et les arcs sont injectés par
+    paquets dans le chargement en masse de PetriNet.load_arcs : la mémoire
+    ne dépend pas de la taille du document XML. Les identifiants PNML servent
+    d'identifiants de places et de transitions ; `net` permet de remplir une
+    instance existante (par ex. StochasticPetriNet). Un arc dont une extrémité
+    n'est pas encore lue est mis de côté et chargé à la fin du document ; un
+    arc en double lève ValueError.
+    """
+    if net is None:
+        net = PetriNet(headless=True)
+    kinds = {}
+    # Identifiants partagés : les arcs en attente ne copient pas les noms de leurs extrémités
+    names = {}
+    pending = []
+    # Arcs en avance sur leurs extrémités : réessayés une seule fois, à la fin
+    deferred = []
+
+    def flush(final=False):
+        inputs, outputs = [], []
+        for source, target, weight in (pending + deferred if final else pending):
+            src, dst = kinds.get(source), kinds.get(target)
+            if src == 'place' and dst == 'transition':
+                inputs.append((source, target, weight))
+            elif src == 'transition' and dst == 'place':
+                outputs.append((source, target, weight))
+            elif src is None or dst is None:
+                if final:
+                    raise ValueError(f"arc {source} -> {target} : extrémité inconnue")
+                deferred.append((source, target, weight))
+            else:
+                raise ValueError(f"arc {source} -> {target} : un arc relie une place et une transition")
+        net.load_arcs(inputs, outputs)
+        pending.clear()
+
+    stack = []
+    # Nombre de places, transitions et arcs ouverts : leurs sous-éléments sont lus à leur fin
+    inside = 0
+    local_names = {}
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        tag = local_names.get(element.tag)
+        if tag is None:
+            tag = local_names[element.tag] = _local(element.tag)
+        node = tag in ('place', 'transition', 'arc')
+        if event == 'start':
+            stack.append(element)
+            inside += node
+            continue
+        stack.pop()
+        if node:
+            inside -= 1
+        elif inside:
+            # Sous-élément (initialMarking, inscription, graphics...) : libéré avec son nœud
+            continue
+        if tag == 'place':
+            marking = _text_of(element, 'initialMarking')
+            place = names.setdefault(element.get('id'), element.get('id'))
+            net.add_place(place, int(marking) if marking else 0)
+            kinds[place] = 'place'
+        elif tag == 'transition':
+            transition = names.setdefault(element.get('id'), element.get('id'))
+            net.add_transition(transition)
+            kinds[transition] = 'transition'
+        elif tag == 'arc':
+            weight = _text_of(element, 'inscription')
+            source, target = element.get('source'), element.get('target')
+            pending.append((names.setdefault(source, source), names.setdefault(target, target),
+                            int(weight) if weight else 1))
+            if len(pending) >= batch_size:
+                flush()
+        # Élément traité ou ignoré : vidé, puis détaché de son parent (dont il est le dernier fils)
+        element.clear()
+        if stack:
+            del stack[-1][-1]
+    flush(final=True)
+    return net
+
+
+def read_pnml_pre_post(path):
+    """Lit un fichier PNML au format (places, transitions, pre, post, marquage) de l'exo2"""
+    return read_pnml(path).to_pre_post()
+
+
+def write_pnml(net: PetriNet, path, net_id: str = "net"):
+    """Écrit le réseau au format PNML en flux, sans construire d'arbre XML"""
+    arcs = net.arcs
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<pnml xmlns="{PNML_NS}">\n')
+        out.write(f'  <net id={quoteattr(net_id)} type="{PTNET_TYPE}">\n')
+        out.write('    <page id="page0">\n')
+        for place, tokens in net.places.items():
+            out.write(f'      <place id={quoteattr(place)}><name><text>{escape(place)}</text></name>')
+            if tokens:
+                out.write(f'<initialMarking><text>{tokens}</text></initialMarking>')
+            out.write('</place>\n')
+        for trans in arcs.transition_ids:
+            out.write(f'      <transition id={quoteattr(trans)}>'
+                      f'<name><text>{escape(trans)}</text></name></transition>\n')
+        n = 0
+        for arc_iter in (arcs.input_arcs(), arcs.output_arcs()):
+            for (source, target), weight in arc_iter:
+                out.write(f'      <arc id="a{n}" source={quoteattr(source)} target={quoteattr(target)}>')
+                if weight != 1:
+                    out.write(f'<inscription><text>{weight}</text></inscription>')
+                out.write('</arc>\n')
+                n += 1
+        out.write('    </page>\n  </net>\n</pnml>\n')
+
+
+def write_pnml_pre_post(path, places, transitions, pre, post, initial_marking):
+    """Écrit un réseau donné sous la forme pre/post de l'exo2"""
+    write_pnml(PetriNet.from_pre_post(places, transitions, pre, post, initial_marking), path)
@@ -0,0 +1,99 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class Property(ABC):
+    """Propriété vérifiée à la volée sur chaque marquage découvert pendant l'exploration.
+
+    `violated(net, m)` reçoit le réseau compilé (reachability.PackedNet) et le
+    marquage déballé ; elle renvoie True si le marquage viole la propriété.
+    `places` liste les places lues (None : inconnues, toutes) : explore s'en
+    sert pour vérifier que les réductions (symétries, ensembles têtus)
+    préservent la propriété.
+    """
+
+    name = "propriété"
+    places: Optional[Sequence[str]] = None
+
+    @abstractmethod
+    def violated(self, net, m) -> bool:
+        """True si le marquage `m` (déballé) du réseau compilé `net` viole la propriété"""
+
+    def __repr__(self):
+        return self.name
+
+
+class Invariant(Property):
+    """Prédicat qui doit être vrai dans tout marquage accessible (sur le marquage {place: jetons}).
+
+    `places` : places lues par le prédicat, à déclarer pour explorer avec
+    des symétries ou des ensembles têtus.
+    """
+
+    def __init__(self, predicate: Callable[[Dict[str, int]], bool], name: str = "invariant",
+                 places: Optional[Sequence[str]] = None):
+        self.predicate = predicate
+        self.name = name
+        self.places = None if places is None else tuple(places)
+
+    def violated(self, net, m) -> bool:
+        return not self.predicate(dict(zip(net.places, m)))
+
+
+class Deadlock(Property):
+    """Absence de blocage : au moins une transition franchissable dans tout marquage"""
+
+    name = "absence de blocage"
+    # Les blocages sont préservés par les ensembles têtus et par toute symétrie du réseau
+    places = ()
+
+    def violated(self, net, m) -> bool:
+        return not any(net.is_enabled(m, t) for t in range(len(net.transitions)))
+
+
+class PlaceBound(Property):
+    """Borne sur le marquage d'une place"""
+
+    def __init__(self, place: str, bound: int):
+        self.place = place
+        self.places = (place,)
+        self.bound = bound
+        self.name = f"{place} ≤ {bound}"
+
+    def violated(self, net, m) -> bool:
+        return m[net.place_index[self.place]] > self.bound
+
+
+class Violation:
+    """Contre-exemple : propriété violée et plus courte séquence de franchissement qui y mène"""
+
+    def __init__(self, prop: Property, state: int, transitions: List[str], markings: List[Dict[str, int]]):
+        self.property = prop
+        self.state = state
+        self.transitions = transitions
+        self.markings = markings
+
+    @property
+    def marking(self) -> Dict[str, int]:
+        return self.markings[-1]
+
+    def __repr__(self):
+        trace = " -> ".join(self.transitions) or "(marquage initial)"
+        return f"Violation({self.property!r}, trace: {trace})"
+
+
+def places_of(properties: Sequence[Property]) -> Optional[List[str]]:
+    """Places lues par l'ensemble des propriétés (None si l'une d'elles ne les déclare pas)"""
+    places = []
+    for prop in properties:
+        if prop.places is None:
+            return None
+        places += [p for p in prop.places if p not in places]
+    return places
+
+
+def first_violation(properties, net, m) -> Optional[Property]:
+    for prop in properties:
+        if prop.violated(net, m):
+            return prop
+    return None
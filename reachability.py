@@ -0,0 +1,436 @@
+import os
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from instrumentation import ExplorationStats
+from properties import Property, Violation, first_violation, places_of
+from statestore import MemoryStateStore
+
+
+class PackedNet:
+    """Réseau compilé pour l'exploration de l'espace d'états.
+
+    Un marquage est un vecteur d'entiers de largeur fixe (array de type
+    `typecode`, 'H' = 16 bits non signés par défaut) stocké sous forme d'octets :
+    c'est directement la clé de hachage de l'ensemble des états visités. Chaque
+    transition est réduite à ses arcs d'entrée et à son vecteur delta creux
+    (places dont le marquage change réellement).
+    """
+
+    def __init__(self, places: Sequence[str], transitions: Sequence[str],
+                 pre: Dict[str, Dict[str, int]], post: Dict[str, Dict[str, int]],
+                 typecode: str = 'H'):
+        self.places = list(places)
+        self.transitions = list(transitions)
+        self.typecode = typecode
+        self.place_index = {p: i for i, p in enumerate(self.places)}
+        self.transition_index = {t: i for i, t in enumerate(self.transitions)}
+        self.inputs: List[Tuple[Tuple[int, int], ...]] = []
+        self.deltas: List[Tuple[Tuple[int, int], ...]] = []
+        for t in self.transitions:
+            t_pre = pre.get(t, {})
+            t_post = post.get(t, {})
+            self.inputs.append(tuple((self.place_index[p], w) for p, w in t_pre.items() if w > 0))
+            delta = {}
+            for p, w in t_pre.items():
+                delta[self.place_index[p]] = delta.get(self.place_index[p], 0) - w
+            for p, w in t_post.items():
+                delta[self.place_index[p]] = delta.get(self.place_index[p], 0) + w
+            self.deltas.append(tuple((i, d) for i, d in sorted(delta.items()) if d != 0))
+
+    def pack(self, marking: Dict[str, int]) -> bytes:
+        return array(self.typecode, [marking.get(p, 0) for p in self.places]).tobytes()
+
+    def unpack(self, key: bytes) -> array:
+        m = array(self.typecode)
+        m.frombytes(key)
+        return m
+
+    def to_dict(self, key: bytes) -> Dict[str, int]:
+        return dict(zip(self.places, self.unpack(key)))
+
+    def marking_str(self, key: bytes) -> str:
+        return "(" + ", ".join(f"{p}:{v}" for p, v in zip(self.places, self.unpack(key))) + ")"
+
+    def is_enabled(self, m: array, t: int) -> bool:
+        for p, w in self.inputs[t]:
+            if m[p] < w:
+                return False
+        return True
+
+    def fire(self, m: array, t: int) -> array:
+        """Marquage successeur : seules les places du delta de t sont modifiées"""
+        n = m[:]
+        try:
+            for p, d in self.deltas[t]:
+                n[p] += d
+        except OverflowError:
+            raise OverflowError(
+                f"un marquage dépasse la capacité du type '{self.typecode}' "
+                f"(réseau non borné ? utiliser reachable_states_non_borne ou un type plus large)"
+            ) from None
+        return n
+
+    def successors(self, key: bytes) -> Iterator[Tuple[int, bytes]]:
+        """(transition, clé du successeur) pour chaque transition franchissable"""
+        m = self.unpack(key)
+        for t in range(len(self.transitions)):
+            if self.is_enabled(m, t):
+                yield t, self.fire(m, t).tobytes()
+
+
+class StubbornSets:
+    """Réduction par ensembles têtus (ordre partiel), calculée sur la structure pre/post.
+
+    Depuis chaque état, seules les transitions franchissables d'un ensemble
+    têtu sont explorées :
+    - pour une transition franchissable de l'ensemble, on ajoute celles qui
+      peuvent la désactiver ou être désactivées par elle (consommation d'une
+      place d'entrée de l'autre) ;
+    - pour une transition non franchissable, on choisit une place d'entrée
+      insuffisamment marquée (bouc émissaire) et on ajoute ses producteurs ;
+    - si l'ensemble contient une transition visible franchissable, toutes les
+      transitions visibles sont ajoutées.
+    Les blocages sont préservés. Pour les propriétés de sûreté, `visible`
+    liste les transitions qui modifient les places observées (voir
+    visible_transitions) et explore applique la condition de non-ignorance :
+    un état dont aucun successeur réduit n'est nouveau est développé en entier.
+    """
+
+    def __init__(self, net: PackedNet, visible: Optional[Iterable[str]] = None):
+        self.net = net
+        count = len(net.transitions)
+        consumers: Dict[int, List[int]] = {}
+        decreasers: Dict[int, List[int]] = {}
+        producers: Dict[int, List[int]] = {}
+        for t in range(count):
+            for p, _ in net.inputs[t]:
+                consumers.setdefault(p, []).append(t)
+            for p, d in net.deltas[t]:
+                (decreasers if d < 0 else producers).setdefault(p, []).append(t)
+        self.producers: Dict[int, Tuple[int, ...]] = {p: tuple(ts) for p, ts in producers.items()}
+        self.conflicts: List[Tuple[int, ...]] = []
+        for t in range(count):
+            linked = set()
+            for p, d in net.deltas[t]:
+                if d < 0:
+                    linked.update(consumers.get(p, ()))
+            for p, _ in net.inputs[t]:
+                linked.update(decreasers.get(p, ()))
+            linked.discard(t)
+            self.conflicts.append(tuple(sorted(linked)))
+        self.visible = None if visible is None else frozenset(net.transition_index[t] for t in visible)
+
+    def stubborn(self, m: array, enabled: List[int]) -> List[int]:
+        """Transitions franchissables d'un ensemble têtu (germe : la moins conflictuelle)"""
+        if len(enabled) <= 1:
+            return enabled
+        enabled_set = set(enabled)
+        seed = min(enabled, key=lambda t: len(self.conflicts[t]))
+        chosen = {seed}
+        stack = [seed]
+        inputs, producers = self.net.inputs, self.producers
+        while stack:
+            t = stack.pop()
+            if t in enabled_set:
+                added = self.conflicts[t]
+                if self.visible is not None and t in self.visible:
+                    added = tuple(added) + tuple(self.visible)
+            else:
+                scapegoat = min((p for p, w in inputs[t] if m[p] < w),
+                                key=lambda p: len(producers.get(p, ())))
+                added = producers.get(scapegoat, ())
+            for u in added:
+                if u not in chosen:
+                    chosen.add(u)
+                    stack.append(u)
+            if enabled_set <= chosen:
+                return enabled
+        return [t for t in enabled if t in chosen]
+
+    def successors(self, key: bytes) -> Iterator[Tuple[int, bytes]]:
+        net = self.net
+        m = net.unpack(key)
+        enabled = [t for t in range(len(net.transitions)) if net.is_enabled(m, t)]
+        for t in self.stubborn(m, enabled):
+            yield t, net.fire(m, t).tobytes()
+
+
+def visible_transitions(net: PackedNet, places: Iterable[str]) -> List[str]:
+    """Transitions qui modifient le marquage d'une des places observées"""
+    watched = {net.place_index[p] for p in places}
+    return [name for name, delta in zip(net.transitions, net.deltas)
+            if any(p in watched for p, _ in delta)]
+
+
+def _trace(parent, parent_transition, state: int) -> List[int]:
+    path = []
+    while parent[state] >= 0:
+        path.append(parent_transition[state])
+        state = parent[state]
+    return path[::-1]
+
+
+class StateSpace:
+    """Espace d'états exploré : états numérotés dans l'ordre BFS, arcs (src, dst, t)"""
+
+    def __init__(self, net: PackedNet, states, edge_src, edge_dst, edge_transition,
+                 parent=None, parent_transition=None, violation: Optional[Violation] = None):
+        self.net = net
+        self.states = states
+        self.edge_src = edge_src
+        self.edge_dst = edge_dst
+        self.edge_transition = edge_transition
+        self.parent = parent
+        self.parent_transition = parent_transition
+        self.violation = violation
+
+    def __len__(self):
+        return len(self.states)
+
+    def marking(self, state: int) -> Dict[str, int]:
+        return self.net.to_dict(self.states[state])
+
+    def trace(self, state: int) -> List[int]:
+        """Plus courte séquence de transitions (indices) menant de l'état initial à `state`"""
+        return _trace(self.parent, self.parent_transition, state)
+
+    def nodes(self) -> List[Tuple[int, str]]:
+        """Nœuds (id, libellé du marquage) au format de dessin de l'exo2"""
+        return [(i, self.net.marking_str(key)) for i, key in enumerate(self.states)]
+
+    def edges(self) -> List[Tuple[int, int, str]]:
+        """Arcs (id source, id destination, nom de transition) au format de l'exo2"""
+        names = self.net.transitions
+        return [(int(s), int(d), names[t])
+                for s, d, t in zip(self.edge_src, self.edge_dst, self.edge_transition)]
+
+
+def _save_checkpoint(path: str, net: PackedNet, store, edge_log, parent, parent_transition,
+                     head: int, options: dict):
+    """Point de reprise : états visités, arcs, parents BFS ; la frontière est states[head:]"""
+    import numpy as np
+    from snapshot import write_container
+
+    src, dst, transition = edge_log.arrays()
+    arrays = {
+        'states': np.frombuffer(b''.join(store), dtype=np.uint8),
+        'edge_src': np.asarray(src, dtype='<u4'),
+        'edge_dst': np.asarray(dst, dtype='<u4'),
+        'edge_transition': np.asarray(transition, dtype='<u4'),
+        'parent': np.frombuffer(parent, dtype=np.int32),
+        'parent_transition': np.frombuffer(parent_transition, dtype=np.int32),
+    }
+    meta = {'kind': 'exploration', 'places': net.places, 'transitions': net.transitions,
+            'typecode': net.typecode, 'key_size': len(store[0]), 'head': head, **options}
+    # Écriture dans un fichier temporaire puis renommage atomique : un arrêt brutal
+    # pendant l'écriture laisse intact le point de reprise précédent
+    tmp = path + '.tmp'
+    write_container(tmp, arrays, meta)
+    os.replace(tmp, path)
+
+
+def _open_checkpoint(path: str):
+    from snapshot import open_container
+
+    meta, arrays = open_container(path)
+    if meta.get('kind') != 'exploration':
+        raise ValueError(f"{path} n'est pas un point de reprise d'exploration")
+    return meta, arrays
+
+
+def _load_checkpoint(path: str, net: PackedNet, initial: bytes, options: dict, store, edge_log):
+    """Recharge un point de reprise dans `store` et `edge_log` (vides) ; renvoie (head, parents)"""
+    meta, arrays = _open_checkpoint(path)
+    size = meta['key_size']
+    data = arrays['states'].tobytes()
+    if (meta['places'] != net.places or meta['transitions'] != net.transitions
+            or meta['typecode'] != net.typecode or data[:size] != initial
+            or any(meta.get(name) != value for name, value in options.items())):
+        raise ValueError(f"le point de reprise {path} ne correspond pas à ce réseau "
+                         f"(marquage initial ou options d'exploration différents)")
+    chunk = 1 << 16
+    for start in range(0, len(data), chunk * size):
+        block = data[start:start + chunk * size]
+        store.add_batch([block[i:i + size] for i in range(0, len(block), size)])
+    for start in range(0, len(arrays['edge_src']), chunk):
+        edge_log.append(arrays['edge_src'][start:start + chunk].tolist(),
+                        arrays['edge_dst'][start:start + chunk].tolist(),
+                        arrays['edge_transition'][start:start + chunk].tolist())
+    parent, parent_transition = array('i'), array('i')
+    parent.frombytes(arrays['parent'].tobytes())
+    parent_transition.frombytes(arrays['parent_transition'].tobytes())
+    return meta['head'], parent, parent_transition
+
+
+def explore(net: PackedNet, initial: bytes, store=None, batch_size: int = 4096,
+            reduction: Optional[StubbornSets] = None, symmetry=None,
+            properties: Sequence[Property] = (), checkpoint: Optional[str] = None,
+            checkpoint_interval: float = 600.0, monitor=None) -> StateSpace:
+    """Exploration en largeur des marquages accessibles depuis `initial`.
+
+    Les états sont numérotés à leur découverte ; la file d'attente est donc
+    simplement la suite des états non encore développés (de `head` à la fin
+    du stockage), lue par paquets de `batch_size`. Les successeurs d'un paquet
+    sont recherchés ensemble dans le stockage (`store`, en mémoire par défaut,
+    ou statestore.DiskStateStore pour les espaces plus grands que la RAM).
+    Avec `reduction` (StubbornSets), seuls les successeurs d'un ensemble têtu
+    sont explorés ; avec `symmetry` (symmetry.SymmetryGroup), chaque marquage
+    est remplacé par le représentant canonique de son orbite et seuls les
+    représentants sont stockés.
+
+    Chaque état découvert mémorise son parent BFS. Les `properties`
+    (properties.Invariant, Deadlock, PlaceBound) sont vérifiées à la
+    découverte de chaque état : à la première violation l'exploration
+    s'arrête et `violation` contient la plus courte séquence qui y mène (en
+    nombre de franchissements, sans réduction ; avec `symmetry` la trace
+    passe par les représentants des orbites). Les réductions doivent
+    préserver les propriétés : avec `symmetry`, les places qu'elles lisent
+    doivent être fixes pour le groupe ; avec des ensembles têtus construits
+    sans transitions visibles, celles-ci sont déduites des places lues. Dans
+    ces deux cas, une propriété qui ne déclare pas ses places (Invariant
+    sans `places`) lève ValueError.
+
+    Avec `checkpoint` (chemin de fichier), l'état de l'exploration est écrit
+    au plus toutes les `checkpoint_interval` secondes, entre deux paquets,
+    au format conteneur de snapshot.py. Si le fichier existe au lancement,
+    l'exploration reprend exactement là où elle s'était arrêtée (même
+    numérotation des états) : il suffit de relancer le même appel après une
+    interruption. `store` doit alors être vide. Le point de reprise est
+    supprimé dès que l'exploration se termine (espace complet ou violation
+    trouvée) : un nouvel appel repart de zéro au lieu de reprendre un état périmé.
+
+    `monitor` (instrumentation.Monitor) reçoit après chaque paquet les
+    compteurs de l'exploration (états, arcs, frontière, doublons).
+    """
+    unobserved = reduction is not None and reduction.visible is None
+    if properties and (symmetry or unobserved):
+        places = places_of(properties)
+        if places is None:
+            raise ValueError("propriété sans places déclarées (Invariant(..., places=...)) : "
+                             "incompatible avec les symétries et les ensembles têtus sans transitions visibles")
+        if symmetry and not symmetry.fixes([net.place_index[p] for p in places]):
+            raise ValueError(f"les symétries déplacent des places lues par les propriétés "
+                             f"({', '.join(places)}) : des contre-exemples seraient perdus")
+        if unobserved and places:
+            reduction = StubbornSets(net, visible_transitions(net, places))
+    if store is None:
+        store = MemoryStateStore()
+    edge_log = store.edge_log()
+    canonical = symmetry.canonical if symmetry else None
+    initial = canonical(initial) if canonical else initial
+    options = {'reduction': reduction is not None, 'symmetry': bool(symmetry)}
+    resumed = checkpoint is not None and os.path.exists(checkpoint)
+    if resumed:
+        head, parent, parent_transition = _load_checkpoint(checkpoint, net, initial, options, store, edge_log)
+    else:
+        store.add_batch([initial])
+        head, parent, parent_transition = 0, array('i', [-1]), array('i', [-1])
+    successors = reduction.successors if reduction is not None else net.successors
+    proviso = reduction is not None and reduction.visible is not None
+
+    stats = None
+    if monitor is not None:
+        stats = ExplorationStats('explore', len(initial))
+        stats.states, stats.edges, stats.expanded = len(store), len(edge_log), head
+        stats.frontier = stats.states - head
+        monitor.start(stats)
+
+    def report(final: bool = False):
+        stats.states, stats.edges, stats.expanded = len(store), len(edge_log), head
+        stats.frontier = stats.states - head
+        # Chaque état, sauf l'initial, est découvert par un arc ; les autres arcs sont des doublons
+        stats.duplicates = stats.edges - (stats.states - 1)
+        if final:
+            monitor.finish(stats)
+        else:
+            stats.batches += 1
+            monitor.tick(stats)
+
+    def finish(violation=None):
+        if checkpoint is not None:
+            for path in (checkpoint, checkpoint + '.tmp'):
+                if os.path.exists(path):
+                    os.remove(path)
+        if monitor is not None:
+            report(final=True)
+        return StateSpace(net, store, *edge_log.arrays(), parent, parent_transition, violation)
+
+    def violation_at(state: int, prop: Property) -> Violation:
+        transitions = _trace(parent, parent_transition, state)
+        markings, m = [net.to_dict(initial)], initial
+        for t in transitions:
+            m = net.fire(net.unpack(m), t).tobytes()
+            markings.append(net.to_dict(canonical(m) if canonical else m))
+            m = canonical(m) if canonical else m
+        return Violation(prop, state, [net.transitions[t] for t in transitions], markings)
+
+    def discover(src, ids, transitions, keys) -> Optional[Violation]:
+        """Parents des nouveaux états, puis vérification des propriétés"""
+        for s, sid, t, key in zip(src, ids, transitions, keys):
+            if sid == len(parent):
+                parent.append(s)
+                parent_transition.append(t)
+                prop = first_violation(properties, net, net.unpack(key)) if properties else None
+                if prop is not None:
+                    return violation_at(sid, prop)
+        return None
+
+    prop = first_violation(properties, net, net.unpack(initial)) if properties and not resumed else None
+    if prop is not None:
+        return finish(violation_at(0, prop))
+    next_checkpoint = time.monotonic() + checkpoint_interval
+    while head < len(store):
+        batch = store.keys_range(head, head + batch_size)
+        src, transitions, keys = [], [], []
+        for offset, key in enumerate(batch):
+            for t, succ in successors(key):
+                src.append(head + offset)
+                transitions.append(t)
+                keys.append(succ)
+        if canonical:
+            keys = [canonical(key) for key in keys]
+        known = len(store)
+        ids = store.add_batch(keys)
+        edge_log.append(src, ids, transitions)
+        violation = discover(src, ids, transitions, keys)
+        if violation is not None:
+            return finish(violation)
+        if proviso:
+            # Non-ignorance : développement complet des états sans successeur nouveau
+            fresh = {s for s, sid in zip(src, ids) if sid >= known}
+            src, transitions, keys = [], [], []
+            for offset, key in enumerate(batch):
+                state = head + offset
+                if state in fresh:
+                    continue
+                m = net.unpack(key)
+                enabled = [t for t in range(len(net.transitions)) if net.is_enabled(m, t)]
+                reduced = set(reduction.stubborn(m, enabled))
+                for t in enabled:
+                    if t not in reduced:
+                        src.append(state)
+                        transitions.append(t)
+                        keys.append(net.fire(m, t).tobytes())
+            if canonical:
+                keys = [canonical(key) for key in keys]
+            ids = store.add_batch(keys)
+            edge_log.append(src, ids, transitions)
+            violation = discover(src, ids, transitions, keys)
+            if violation is not None:
+                return finish(violation)
+        head += len(batch)
+        if monitor is not None:
+            report()
+        if checkpoint is not None and time.monotonic() >= next_checkpoint:
+            _save_checkpoint(checkpoint, net, store, edge_log, parent, parent_transition, head, options)
+            next_checkpoint = time.monotonic() + checkpoint_interval
+    return finish()
+
+
+def resume_exploration(net: PackedNet, checkpoint: str, store=None, **options) -> StateSpace:
+    """Reprend une exploration interrompue depuis son point de reprise (mêmes options qu'au lancement)"""
+    meta, arrays = _open_checkpoint(checkpoint)
+    initial = arrays['states'][:meta['key_size']].tobytes()
+    return explore(net, initial, store, checkpoint=checkpoint, **options)
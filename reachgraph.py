@@ -0,0 +1,182 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _tarjan(indptr: List[int], indices: List[int], n: int) -> Tuple[List[int], int]:
+    """Composantes fortement connexes (Tarjan itératif) ; numérotées puits d'abord"""
+    index = [-1] * n
+    low = [0] * n
+    comp = [-1] * n
+    stack: List[int] = []
+    counter = count = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        work_node, work_pos = [root], [indptr[root]]
+        while work_node:
+            v = work_node[-1]
+            i, end = work_pos[-1], indptr[v + 1]
+            descended = False
+            while i < end:
+                w = indices[i]
+                i += 1
+                if index[w] == -1:
+                    work_pos[-1] = i
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    work_node.append(w)
+                    work_pos.append(indptr[w])
+                    descended = True
+                    break
+                if comp[w] == -1 and index[w] < low[v]:
+                    low[v] = index[w]
+            if descended:
+                continue
+            work_node.pop()
+            work_pos.pop()
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    comp[w] = count
+                    if w == v:
+                        break
+                count += 1
+            if work_node:
+                u = work_node[-1]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+    return comp, count
+
+
+class ReachabilityGraph:
+    """Graphe d'accessibilité compact : états 0..n-1 (0 = initial), arcs au format CSR.
+
+    Les successeurs de l'état s sont indices[indptr[s]:indptr[s+1]], franchis
+    par les transitions labels[indptr[s]:indptr[s+1]] (indices dans
+    `transitions`). Les analyses (composantes fortement connexes, composantes
+    terminales, transitions mortes ou vivantes, états d'accueil, réversibilité)
+    sont linéaires en la taille du graphe et mises en cache.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, labels: np.ndarray,
+                 transitions: Sequence[str], describe: Optional[Callable[[int], str]] = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.labels = labels
+        self.transitions = list(transitions)
+        self.describe = describe if describe is not None else str
+        self._components = None
+
+    @classmethod
+    def from_edges(cls, num_states: int, src, dst, labels, transitions: Sequence[str],
+                   describe: Optional[Callable[[int], str]] = None) -> "ReachabilityGraph":
+        src = np.asarray(src, dtype=np.int64)
+        order = np.argsort(src, kind='stable')
+        indptr = np.zeros(num_states + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_states), out=indptr[1:])
+        indices = np.asarray(dst, dtype=np.int64)[order]
+        return cls(indptr, indices, np.asarray(labels, dtype=np.int32)[order], transitions, describe)
+
+    @classmethod
+    def from_state_space(cls, space) -> "ReachabilityGraph":
+        """Depuis reachability.StateSpace (marquages conservés pour les libellés)"""
+        net, states = space.net, space.states
+        return cls.from_edges(len(space), space.edge_src, space.edge_dst, space.edge_transition,
+                              net.transitions, lambda i: net.marking_str(states[i]))
+
+    @classmethod
+    def from_coverability(cls, graph) -> "ReachabilityGraph":
+        """Depuis coverability.CoverabilityGraph (libellés avec ω)"""
+        from coverability import omega_str
+        edges = np.array(graph.edge_list, dtype=np.int64).reshape(-1, 3)
+        return cls.from_edges(len(graph), edges[:, 0], edges[:, 1], edges[:, 2], graph.net.transitions,
+                              lambda i: omega_str(graph.net, graph.markings[i]))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def successors(self, state: int) -> np.ndarray:
+        return self.indices[self.indptr[state]:self.indptr[state + 1]]
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def sources(self) -> np.ndarray:
+        """État source de chaque arc (dans l'ordre CSR)"""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.out_degree())
+
+    # Analyses
+    def components(self) -> Tuple[np.ndarray, int]:
+        """(numéro de composante fortement connexe de chaque état, nombre de composantes)"""
+        if self._components is None:
+            comp, count = _tarjan(self.indptr.tolist(), self.indices.tolist(), len(self))
+            self._components = (np.array(comp, dtype=np.int64), count)
+        return self._components
+
+    def terminal_components(self) -> List[int]:
+        """Composantes dont aucun arc ne sort"""
+        comp, count = self.components()
+        src_comp, dst_comp = comp[self.sources()], comp[self.indices]
+        leaving = np.zeros(count, dtype=bool)
+        leaving[src_comp[src_comp != dst_comp]] = True
+        return np.flatnonzero(~leaving).tolist()
+
+    def deadlocks(self) -> np.ndarray:
+        return np.flatnonzero(self.out_degree() == 0)
+
+    def dead_transitions(self) -> List[str]:
+        """Transitions jamais franchissables depuis le marquage initial"""
+        fired = np.bincount(self.labels, minlength=len(self.transitions))
+        return [t for t, n in zip(self.transitions, fired) if n == 0]
+
+    def live_transitions(self) -> List[str]:
+        """Transitions vivantes : franchissables à nouveau depuis tout état accessible.
+
+        Depuis tout état on atteint une composante terminale, dont on ne sort
+        plus : t est vivante ssi elle étiquette un arc dans chacune d'elles.
+        """
+        comp, count = self.components()
+        terminal = self.terminal_components()
+        is_terminal = np.zeros(count, dtype=bool)
+        is_terminal[terminal] = True
+        src_comp = comp[self.sources()]
+        inside = is_terminal[src_comp]
+        # Paires (composante terminale, transition) distinctes, comptées par transition
+        size = len(self.transitions)
+        pairs = np.unique(src_comp[inside] * size + self.labels[inside])
+        covered = np.bincount(pairs % size, minlength=size)
+        return [t for t, n in zip(self.transitions, covered) if n == len(terminal)]
+
+    def is_live(self) -> bool:
+        return len(self.live_transitions()) == len(self.transitions)
+
+    def home_states(self) -> np.ndarray:
+        """États accessibles depuis tout état : ceux de l'unique composante terminale, s'il n'y en a qu'une"""
+        terminal = self.terminal_components()
+        if len(terminal) != 1:
+            return np.zeros(0, dtype=np.int64)
+        comp, _ = self.components()
+        return np.flatnonzero(comp == terminal[0])
+
+    def is_reversible(self) -> bool:
+        """Le marquage initial est-il accessible depuis tout état accessible ?"""
+        _, count = self.components()
+        return count == 1
+
+    # Format de dessin de l'exo2
+    def nodes(self) -> List[Tuple[int, str]]:
+        return [(i, self.describe(i)) for i in range(len(self))]
+
+    def edges(self) -> List[Tuple[int, int, str]]:
+        names = self.transitions
+        return [(s, d, names[t]) for s, d, t in
+                zip(self.sources().tolist(), self.indices.tolist(), self.labels.tolist())]
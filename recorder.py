@@ -0,0 +1,131 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Figure et artistes réutilisés par chaque processus de rendu
+_worker_state = None
+
+
+def _init_worker(places, transitions, edges, pos, figsize):
+    """Construit une seule fois la figure (nœuds, arcs, disposition) dans le processus"""
+    global _worker_state
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    graph = nx.DiGraph()
+    graph.add_nodes_from(places)
+    graph.add_nodes_from(transitions)
+    graph.add_edges_from((u, v) for u, v, _ in edges)
+
+    place_artist = nx.draw_networkx_nodes(graph, pos, nodelist=places, node_shape='o',
+                                          node_size=1000, node_color='lightblue', alpha=0.8, ax=ax)
+    nx.draw_networkx_nodes(graph, pos, nodelist=transitions, node_shape='s',
+                           node_size=1000, node_color='lightcoral', alpha=0.8, ax=ax)
+    nx.draw_networkx_edges(graph, pos, edge_color='gray', arrows=True, arrowsize=20,
+                           arrowstyle='->', ax=ax)
+    texts = nx.draw_networkx_labels(graph, pos, {p: p for p in places}, font_size=9, ax=ax)
+    nx.draw_networkx_labels(graph, pos, {t: t for t in transitions}, font_size=9, ax=ax)
+    nx.draw_networkx_edge_labels(graph, pos, {(u, v): w for u, v, w in edges if w > 1}, ax=ax)
+    status = ax.text(0.01, 0.99, '', transform=ax.transAxes, ha='left', va='top', fontsize=11,
+                     bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
+    ax.axis('off')
+    _worker_state = (fig, ax, place_artist, [texts[p] for p in places], status)
+
+
+def _render_frame(path, title, labels, colors, status_text):
+    """Met à jour marquages, couleurs et titre puis écrit l'image"""
+    fig, ax, place_artist, texts, status = _worker_state
+    for text, label in zip(texts, labels):
+        text.set_text(label)
+    place_artist.set_facecolor(colors)
+    status.set_text(status_text or '')
+    status.set_visible(bool(status_text))
+    ax.set_title(title)
+    fig.savefig(path)
+    return path
+
+
+class FrameRecorder:
+    """Enregistre hors écran l'évolution d'un réseau pendant une simulation.
+
+    La figure et la disposition des nœuds sont construites une seule fois par
+    processus de rendu ; chaque image ne met à jour que les marquages, les
+    couleurs et le titre. Le rendu se fait dans un pool de processus, donc
+    record() ne bloque pas la simulation (sauf si plus de `max_pending` images
+    sont en attente). close() attend la fin du rendu et peut assembler les
+    images en une animation (GIF).
+    """
+
+    def __init__(self, net, output_dir: str, workers: int = 2, animation: Optional[str] = None,
+                 fps: float = 2.0, max_pending: int = 64, figsize=(12, 8)):
+        self.net = net
+        # Un CompiledPetriNet garde son réseau source pour la structure et la disposition
+        self.structure = getattr(net, 'net', net)
+        self.output_dir = output_dir
+        self.animation = animation
+        self.fps = fps
+        self.max_pending = max_pending
+        self.frames = []
+        self._pending = deque()
+
+        arcs = self.structure.arcs
+        self.place_ids = list(self.structure.places)
+        edges = [(p, t, w) for (p, t), w in arcs.input_arcs()]
+        edges += [(t, p, w) for (t, p), w in arcs.output_arcs()]
+        os.makedirs(output_dir, exist_ok=True)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(self.place_ids, list(arcs.transition_ids), edges,
+                      self.structure.layout(), figsize))
+
+    def record(self, title: str = "") -> str:
+        """Capture le marquage courant et confie le rendu de l'image au pool"""
+        if self.net is not self.structure:
+            self.net.write_back()
+        marking = self.structure.places
+        colors = self.structure.place_colors()
+        labels = [f"{p}\n({marking[p]})" for p in self.place_ids]
+        path = os.path.join(self.output_dir, f"frame_{len(self.frames):05d}.png")
+        self._pending.append(self._executor.submit(
+            _render_frame, path, title, labels, [colors[p] for p in self.place_ids],
+            self.structure.status_text()))
+        self.frames.append(path)
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft().result()
+        return path
+
+    def close(self, animate: bool = True):
+        """Attend le rendu de toutes les images et écrit l'animation éventuelle"""
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            self._pending.clear()
+            self._executor.shutdown()
+        if animate and self.animation and self.frames:
+            self._write_animation()
+
+    def _write_animation(self):
+        from PIL import Image
+
+        def rest():
+            # Une image ouverte à la fois : chacune est copiée par save() puis refermée
+            for path in self.frames[1:]:
+                with Image.open(path) as image:
+                    yield image
+
+        with Image.open(self.frames[0]) as first:
+            first.save(self.animation, save_all=True, append_images=rest(),
+                       duration=int(1000 / self.fps), loop=0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Après une exception, les images demandées sont rendues mais pas l'animation
+        self.close(animate=exc_type is None)
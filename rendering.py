@@ -0,0 +1,136 @@
+from collections import defaultdict, deque
+from typing import Dict, Hashable, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+
+Node = Tuple[Hashable, str]
+Edge = Tuple[Hashable, Hashable, str]
+
+
+def layered_positions(nodes: Sequence[Node], edges: Sequence[Edge]) -> Dict[Hashable, Tuple[float, float]]:
+    """Disposition en niveaux BFS depuis le premier nœud, en O(V + E) (listes d'adjacence)"""
+    if not nodes:
+        return {}
+    successors = defaultdict(list)
+    for src, dst, _ in edges:
+        successors[src].append(dst)
+    root = nodes[0][0]
+    dist = {root: 0}
+    queue = deque([root])
+    while queue:
+        u = queue.popleft()
+        for v in successors[u]:
+            if v not in dist:
+                dist[v] = dist[u] + 1
+                queue.append(v)
+
+    # Les nœuds non atteints depuis la racine sont placés au dernier niveau
+    max_level = max(dist.values())
+    level_nodes = defaultdict(list)
+    for nid, _ in nodes:
+        level_nodes[dist.get(nid, max_level)].append(nid)
+    positions = {}
+    for lvl, ids in level_nodes.items():
+        n = len(ids)
+        for i, nid in enumerate(ids):
+            positions[nid] = (i - n / 2, -lvl)
+    return positions
+
+
+def _stride(count: int, limit: int) -> int:
+    return 1 if count <= limit else -(-count // limit)
+
+
+def draw_graph(nodes: Sequence[Node], edges: Sequence[Edge], positions: Dict[Hashable, Tuple[float, float]],
+               title: str = "", max_labels: int = 100, arrows_limit: int = 2000, max_edges: int = 50000,
+               ax=None, show: bool = True):
+    """Dessin groupé : arcs en une seule collection, nœuds en un seul scatter.
+
+    Jusqu'à `arrows_limit` arcs, les flèches sont dessinées par un unique
+    quiver ; au-delà, par une LineCollection sans pointe, limitée à
+    `max_edges` arcs (un sur k : le coût du tracé Agg est proportionnel au
+    nombre de segments ; export_graph garde le graphe complet), et sans
+    libellés de transitions. Au plus `max_labels` libellés de nœuds et
+    d'arcs sont affichés (un sur k).
+    """
+    if ax is None:
+        _, ax = plt.subplots(figsize=(12, 8))
+    index = {nid: i for i, (nid, _) in enumerate(nodes)}
+    xy = np.array([positions[nid] for nid, _ in nodes], dtype=float).reshape(-1, 2)
+    if edges:
+        arrows = len(edges) <= arrows_limit
+        drawn = edges if arrows else edges[::_stride(len(edges), max_edges)]
+        src = np.fromiter((index[s] for s, _, _ in drawn), dtype=np.int64, count=len(drawn))
+        dst = np.fromiter((index[d] for _, d, _ in drawn), dtype=np.int64, count=len(drawn))
+        start, end = xy[src], xy[dst]
+        if arrows:
+            delta = end - start
+            ax.quiver(start[:, 0], start[:, 1], delta[:, 0], delta[:, 1], angles='xy', scale_units='xy',
+                      scale=1, color='blue', width=0.002, headwidth=6, zorder=1)
+            step = _stride(len(drawn), max_labels)
+            middle = (start + end) / 2
+            for k in range(0, len(drawn), step):
+                ax.text(middle[k, 0], middle[k, 1], drawn[k][2], color='red', fontsize=9)
+        else:
+            ax.add_collection(LineCollection(np.stack([start, end], axis=1), colors='blue',
+                                             linewidths=0.3, alpha=0.5, zorder=1))
+
+    size = 225 if len(nodes) <= max_labels else max(4, 225 * max_labels / len(nodes))
+    ax.scatter(xy[:, 0], xy[:, 1], s=size, color='orange', zorder=2)
+    step = _stride(len(nodes), max_labels)
+    for k in range(0, len(nodes), step):
+        ax.text(xy[k, 0], xy[k, 1], nodes[k][1], fontsize=10, ha='center', va='center', color='black', zorder=3)
+
+    ax.autoscale_view()
+    ax.axis('off')
+    ax.set_title(title)
+    if show:
+        plt.show()
+    return ax
+
+
+def write_dot(nodes: Sequence[Node], edges: Sequence[Edge], path, name: str = "reachability"):
+    """Export Graphviz DOT, écrit en flux (pour les graphes trop grands à dessiner)"""
+    def quote(text) -> str:
+        return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write(f"digraph {quote(name)} {{\n")
+        for nid, label in nodes:
+            out.write(f"  {quote(nid)} [label={quote(label)}];\n")
+        for src, dst, label in edges:
+            out.write(f"  {quote(src)} -> {quote(dst)} [label={quote(label)}];\n")
+        out.write("}\n")
+
+
+def _attr(value) -> str:
+    return f'"{value}"' if isinstance(value, int) else quoteattr(str(value))
+
+
+def write_graphml(nodes: Sequence[Node], edges: Sequence[Edge], path, name: str = "reachability"):
+    """Export GraphML (Gephi, yEd, networkx), écrit en flux"""
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                  '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                  '  <key id="label" for="node" attr.name="label" attr.type="string"/>\n'
+                  '  <key id="transition" for="edge" attr.name="transition" attr.type="string"/>\n'
+                  f'  <graph id={quoteattr(name)} edgedefault="directed">\n')
+        for nid, label in nodes:
+            out.write(f'    <node id={_attr(nid)}><data key="label">{escape(label)}</data></node>\n')
+        for src, dst, label in edges:
+            out.write(f'    <edge source={_attr(src)} target={_attr(dst)}>'
+                      f'<data key="transition">{escape(label)}</data></edge>\n')
+        out.write('  </graph>\n</graphml>\n')
+
+
+def export_graph(nodes: Sequence[Node], edges: Sequence[Edge], path, name: str = "reachability"):
+    """Export selon l'extension du fichier (.dot / .gv ou .graphml)"""
+    if str(path).endswith(('.dot', '.gv')):
+        write_dot(nodes, edges, path, name)
+    elif str(path).endswith('.graphml'):
+        write_graphml(nodes, edges, path, name)
+    else:
+        raise ValueError(f"format d'export inconnu pour {path} (.dot, .gv ou .graphml)")
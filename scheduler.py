@@ -0,0 +1,72 @@
+from typing import Dict, List, Set
+
+
+def transition_deltas(arcs) -> List[Dict[int, int]]:
+    """Pour chaque transition, variation non nulle du marquage {id place: delta}"""
+    deltas = []
+    for t in range(len(arcs.transition_ids)):
+        delta = {}
+        for p, w in arcs.trans_in[t].items():
+            delta[p] = delta.get(p, 0) - w
+        for p, w in arcs.trans_out[t].items():
+            delta[p] = delta.get(p, 0) + w
+        deltas.append({p: d for p, d in delta.items() if d != 0})
+    return deltas
+
+
+def dependency_lists(arcs) -> List[List[int]]:
+    """Transitions dont la sensibilisation peut changer après chaque transition.
+
+    Ce sont les transitions qui consomment dans une place dont le marquage
+    est modifié par le franchissement.
+    """
+    dependents = []
+    for delta in transition_deltas(arcs):
+        touched = set()
+        for p in delta:
+            touched.update(arcs.place_out[p].nodes)
+        dependents.append(sorted(touched))
+    return dependents
+
+
+class IncrementalScheduler:
+    """Maintient à jour l'ensemble des transitions franchissables d'un réseau.
+
+    Les dépendances transition -> transitions (via les places dont le marquage
+    change) sont précalculées : après un franchissement, seules les transitions
+    qui consomment dans une place modifiée sont re-testées. Les franchissements
+    doivent passer par fire() pour que l'ensemble reste cohérent.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        self.transition_ids = net.arcs.transition_ids
+        self.dependents = dependency_lists(net.arcs)
+        self.enabled: Set[int] = set()
+        self.refresh()
+
+    def refresh(self):
+        """Recalcule entièrement l'ensemble (après une modification externe du marquage)"""
+        is_enabled = self.net.is_transition_enabled
+        self.enabled = {t for t, trans in enumerate(self.transition_ids) if is_enabled(trans)}
+
+    def enabled_transitions(self) -> List[str]:
+        return [self.transition_ids[t] for t in sorted(self.enabled)]
+
+    def is_enabled(self, transition_id: str) -> bool:
+        return self.net.arcs.transition_index[transition_id] in self.enabled
+
+    def fire(self, transition_id: str) -> bool:
+        """Franchit la transition puis ne re-teste que son voisinage"""
+        t = self.net.arcs.transition_index[transition_id]
+        if t not in self.enabled or not self.net.fire_transition(transition_id):
+            return False
+        is_enabled = self.net.is_transition_enabled
+        ids = self.transition_ids
+        enabled = self.enabled
+        for u in self.dependents[t]:
+            if is_enabled(ids[u]):
+                enabled.add(u)
+            else:
+                enabled.discard(u)
+        return True
@@ -1,58 +1,119 @@
 import networkx as nx
 import matplotlib.pyplot as plt
-from typing import List, Dict, Set, Tuple
+import numpy as np
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
+from arcstore import ArcStore
+from scheduler import IncrementalScheduler
 
 class PetriNet:
-    def __init__(self):
+    def __init__(self, headless: bool = False):
         self.places = {}  
         self.transitions = set()
-        self.input_arcs = {}  
-        self.output_arcs = {} 
-        self.graph = nx.DiGraph()
+        self.arcs = ArcStore()
+        # En mode headless, visualize() ne fait rien : aucun travail networkx/matplotlib
+        self.headless = headless
+        self._graph = None
+        # Vues des arcs en cache : {'input'/'output': (version de l'ArcStore, vue)}
+        self._arc_views = {}
+
+    @property
+    def graph(self) -> nx.DiGraph:
+        """Vue networkx en lecture seule, construite à la demande (visualisation, export)"""
+        if self._graph is None:
+            graph = nx.DiGraph()
+            for place in self.places:
+                graph.add_node(place, type='place')
+            for trans in self.transitions:
+                graph.add_node(trans, type='transition')
+            graph.add_edges_from((p, t, {'weight': w, 'type': 'input'})
+                                 for (p, t), w in self.arcs.input_arcs())
+            graph.add_edges_from((t, p, {'weight': w, 'type': 'output'})
+                                 for (t, p), w in self.arcs.output_arcs())
+            self._graph = nx.freeze(graph)
+        nodes = self._graph.nodes
+        for place, tokens in self.places.items():
+            nodes[place]['marking'] = tokens
+        return self._graph
+
+    def _arc_view(self, kind: str, arcs) -> Mapping[Tuple[str, str], int]:
+        """Vue construite une fois, puis reconstruite seulement si les arcs ont changé"""
+        cached = self._arc_views.get(kind)
+        if cached is None or cached[0] != self.arcs.version:
+            cached = self._arc_views[kind] = (self.arcs.version, MappingProxyType(dict(arcs())))
+        return cached[1]
+
+    @property
+    def input_arcs(self) -> Mapping[Tuple[str, str], int]:
+        """Vue en lecture seule des arcs d'entrée {(place, transition): poids} (add_input_arc pour modifier)"""
+        return self._arc_view('input', self.arcs.input_arcs)
+
+    @property
+    def output_arcs(self) -> Mapping[Tuple[str, str], int]:
+        """Vue en lecture seule des arcs de sortie {(transition, place): poids} (add_output_arc pour modifier)"""
+        return self._arc_view('output', self.arcs.output_arcs)
     
     def add_place(self, place_id: str, marking: int = 0):
    
         self.places[place_id] = marking
-        self.graph.add_node(place_id, type='place', marking=marking)
+        self.arcs.add_place(place_id)
+        self._graph = None
     
     def add_transition(self, transition_id: str):
 
         self.transitions.add(transition_id)
-        self.graph.add_node(transition_id, type='transition')
+        self.arcs.add_transition(transition_id)
+        self._graph = None
     
     def add_input_arc(self, place_id: str, transition_id: str, weight: int = 1):
 
-        self.input_arcs[(place_id, transition_id)] = weight
-        self.graph.add_edge(place_id, transition_id, weight=weight, type='input')
+        self.arcs.add_input_arc(place_id, transition_id, weight)
+        self._graph = None
     
     def add_output_arc(self, transition_id: str, place_id: str, weight: int = 1):
      
-        self.output_arcs[(transition_id, place_id)] = weight
-        self.graph.add_edge(transition_id, place_id, weight=weight, type='output')
+        self.arcs.add_output_arc(transition_id, place_id, weight)
+        self._graph = None
+
+    def load_arcs(self, input_arcs=(), output_arcs=()):
+        """Chargement en masse d'arcs (place, transition, poids) / (transition, place, poids).
+
+        Les places et transitions doivent déjà exister ; un arc en double (dans
+        le paquet ou déjà présent) lève ValueError sans rien charger.
+        """
+        place_index = self.arcs.place_index
+        transition_index = self.arcs.transition_index
+        input_arcs = list(input_arcs)
+        output_arcs = list(output_arcs)
+        self.arcs.load_input_arcs([place_index[p] for p, _, _ in input_arcs],
+                                  [transition_index[t] for _, t, _ in input_arcs],
+                                  [w for _, _, w in input_arcs])
+        self.arcs.load_output_arcs([transition_index[t] for t, _, _ in output_arcs],
+                                   [place_index[p] for _, p, _ in output_arcs],
+                                   [w for _, _, w in output_arcs])
+        self._graph = None
     
     def get_output_transitions(self, place_id: str) -> List[str]:
       
-        return [trans for (place, trans) in self.input_arcs.keys() if place == place_id]
+        return self.arcs.output_transitions(place_id)
     
     def get_input_transitions(self, place_id: str) -> List[str]:
      
-        return [trans for (trans, place) in self.output_arcs.keys() if place == place_id]
+        return self.arcs.input_transitions(place_id)
     
     def get_output_places(self, transition_id: str) -> List[str]:
      
-        return [place for (trans, place) in self.output_arcs.keys() if trans == transition_id]
+        return self.arcs.output_places(transition_id)
     
     def get_input_places(self, transition_id: str) -> List[str]:
       
-        return [place for (place, trans) in self.input_arcs.keys() if trans == transition_id]
+        return self.arcs.input_places(transition_id)
     
     def is_transition_enabled(self, transition_id: str) -> bool:
   
-        for (place, trans) in self.input_arcs:
-            if trans == transition_id:
-                weight = self.input_arcs[(place, trans)]
-                if self.places[place] < weight:
-                    return False
+        for place, weight in self.arcs.input_weights(transition_id):
+            if self.places[place] < weight:
+                return False
         return True
     
     def fire_transition(self, transition_id: str) -> bool:
@@ -61,42 +122,47 @@ class PetriNet:
             return False
         
       
-        for (place, trans) in self.input_arcs:
-            if trans == transition_id:
-                weight = self.input_arcs[(place, trans)]
-                self.places[place] -= weight
-         
-                self.graph.nodes[place]['marking'] = self.places[place]
+        for place, weight in self.arcs.input_weights(transition_id):
+            self.places[place] -= weight
         
        
-        for (trans, place) in self.output_arcs:
-            if trans == transition_id:
-                weight = self.output_arcs[(trans, place)]
-                self.places[place] += weight
-             
-                self.graph.nodes[place]['marking'] = self.places[place]
+        for place, weight in self.arcs.output_weights(transition_id):
+            self.places[place] += weight
         
         return True
     
+    def layout(self) -> Dict[str, Tuple[float, float]]:
+        """Positions des nœuds : places dans une colonne, transitions dans une autre"""
+        pos = {}
+        for i, place in enumerate(self.places):
+            pos[place] = (0, i)
+        for i, trans in enumerate(self.arcs.transition_ids):
+            pos[trans] = (2, i)
+        return pos
+
+    def place_colors(self) -> Dict[str, str]:
+        return {place: 'lightblue' for place in self.places}
+
+    def status_text(self) -> Optional[str]:
+        """Texte d'état affiché avec le réseau (aucun par défaut)"""
+        return None
+
     def visualize(self, title="Réseau de Petri"):
+        if self.headless:
+            return
      
         plt.figure(figsize=(12, 8))
         
       
-        pos = {}
+        pos = self.layout()
         place_nodes = [node for node in self.graph.nodes() if node in self.places]
         transition_nodes = [node for node in self.graph.nodes() if node in self.transitions]
         
- 
-        for i, place in enumerate(place_nodes):
-            pos[place] = (0, i)
-        for i, trans in enumerate(transition_nodes):
-            pos[trans] = (2, i)
-        
        
+        colors = self.place_colors()
         nx.draw_networkx_nodes(self.graph, pos, nodelist=place_nodes, 
                               node_shape='o', node_size=1000, 
-                              node_color='lightblue', alpha=0.7)
+                              node_color=[colors[p] for p in place_nodes], alpha=0.7)
         
       
         nx.draw_networkx_nodes(self.graph, pos, nodelist=transition_nodes, 
@@ -150,6 +216,101 @@ class PetriNet:
             print(f"  - Places de sortie: {self.get_output_places(transition)}")
         print()
 
+    def to_pre_post(self):
+        """Convertit le réseau au format (places, transitions, pre, post, marquage) de l'exo2"""
+        places = list(self.places)
+        transitions = list(self.arcs.transition_ids)
+        pre = {t: dict(self.arcs.input_weights(t)) for t in transitions}
+        post = {t: dict(self.arcs.output_weights(t)) for t in transitions}
+        return places, transitions, pre, post, dict(self.places)
+
+    @classmethod
+    def from_pre_post(cls, places, transitions, pre, post, initial_marking, headless: bool = True):
+        """Construit le réseau à partir de la forme pre/post utilisée dans exo2"""
+        net = cls(headless=headless)
+        for p in places:
+            net.add_place(p, initial_marking.get(p, 0))
+        for t in transitions:
+            net.add_transition(t)
+        net.load_arcs([(p, t, w) for t in transitions for p, w in pre.get(t, {}).items() if w],
+                      [(t, p, w) for t in transitions for p, w in post.get(t, {}).items() if w])
+        return net
+
+    def compile(self) -> "CompiledPetriNet":
+        """Compile le réseau en matrices d'incidence (mode d'exécution vectorisé)"""
+        return CompiledPetriNet(self)
+
+
+class CompiledPetriNet:
+    """Réseau de Petri compilé : matrices Pre/Post/C indexées par des entiers.
+
+    Les lignes correspondent aux transitions et les colonnes aux places, de sorte
+    que la sensibilisation de toutes les transitions se calcule en une seule
+    comparaison vectorielle et qu'un franchissement est une simple addition
+    de vecteurs. L'API par identifiants (chaînes) de PetriNet reste disponible.
+    """
+
+    def __init__(self, net: PetriNet):
+        self.net = net
+        self.place_ids = list(net.places)
+        self.transition_ids = sorted(net.transitions)
+        self.place_index = {p: i for i, p in enumerate(self.place_ids)}
+        self.transition_index = {t: i for i, t in enumerate(self.transition_ids)}
+        self.transitions = set(self.transition_ids)
+
+        shape = (len(self.transition_ids), len(self.place_ids))
+        self.pre = np.zeros(shape, dtype=np.int64)
+        self.post = np.zeros(shape, dtype=np.int64)
+        arcs = net.arcs
+        for t, trans in enumerate(arcs.transition_ids):
+            row = self.transition_index[trans]
+            for p, weight in arcs.trans_in[t].items():
+                self.pre[row, self.place_index[arcs.place_ids[p]]] = weight
+            for p, weight in arcs.trans_out[t].items():
+                self.post[row, self.place_index[arcs.place_ids[p]]] = weight
+        self.incidence = self.post - self.pre
+
+        self.marking = np.array([net.places[p] for p in self.place_ids], dtype=np.int64)
+
+    @property
+    def arcs(self) -> ArcStore:
+        return self.net.arcs
+
+    @property
+    def places(self) -> Dict[str, int]:
+        """Marquage courant sous forme de dictionnaire place -> jetons"""
+        return dict(zip(self.place_ids, self.marking.tolist()))
+
+    def enabled_mask(self) -> np.ndarray:
+        """Vecteur booléen des transitions franchissables (une seule comparaison)"""
+        return np.all(self.marking >= self.pre, axis=1)
+
+    def enabled_transitions(self) -> List[str]:
+        return [self.transition_ids[i] for i in np.flatnonzero(self.enabled_mask())]
+
+    def is_transition_enabled(self, transition_id: str) -> bool:
+        row = self.pre[self.transition_index[transition_id]]
+        return bool(np.all(self.marking >= row))
+
+    def fire(self, index: int) -> bool:
+        """Franchit la transition d'indice `index` : M' = M + C[t]"""
+        if not np.all(self.marking >= self.pre[index]):
+            return False
+        self.marking += self.incidence[index]
+        return True
+
+    def fire_transition(self, transition_id: str) -> bool:
+        return self.fire(self.transition_index[transition_id])
+
+    def write_back(self):
+        """Recopie le marquage courant dans le réseau source"""
+        for place, tokens in self.places.items():
+            self.net.places[place] = tokens
+
+    def visualize(self, title="Réseau de Petri"):
+        self.write_back()
+        self.net.visualize(title)
+
 
 def create_example_network():
     """Crée un exemple de réseau de Petri"""
@@ -171,13 +332,16 @@ def create_example_network():
     
     return net
 
-def simulate_network(net):
+def simulate_network(net, recorder=None):
+    """Jeu de jetons pas à pas ; avec un FrameRecorder, les états sont enregistrés hors écran"""
 
+    show = recorder.record if recorder is not None else net.visualize
     print("=== SIMULATION ===")
-    net.visualize("État initial")
+    show("État initial")
     
 
-    enabled_transitions = [t for t in net.transitions if net.is_transition_enabled(t)]
+    scheduler = IncrementalScheduler(net)
+    enabled_transitions = scheduler.enabled_transitions()
     print(f"Transitions enabled: {enabled_transitions}")
     
    
@@ -186,13 +350,13 @@ def simulate_network(net):
     
     while enabled_transitions and steps < max_steps:
         for transition in enabled_transitions:
-            if net.fire_transition(transition):
+            if scheduler.fire(transition):
                 print(f"Franchissement de {transition}")
-                net.visualize(f"Après franchissement de {transition}")
+                show(f"Après franchissement de {transition}")
                 steps += 1
                 break
         
-        enabled_transitions = [t for t in net.transitions if net.is_transition_enabled(t)]
+        enabled_transitions = scheduler.enabled_transitions()
         print(f"Transitions enabled: {enabled_transitions}")
 
 if __name__ == "__main__":
@@ -0,0 +1,261 @@
+import json
+import struct
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simulation import PetriNet
+
+# Format conteneur : MAGIC | longueur de l'en-tête (u64) | en-tête JSON | tableaux alignés
+MAGIC = b'PNSNAP01'
+ALIGN = 64
+_PREFIX = struct.Struct('<8sQ')
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _layout(arrays: Dict[str, np.ndarray], meta: dict, header_reserve: int = 0):
+    """Calcule l'en-tête (décalages de chaque tableau) et la taille totale du conteneur"""
+    entries = {name: {'dtype': a.dtype.str, 'shape': list(a.shape)} for name, a in arrays.items()}
+    # Les décalages dépendent de la taille de l'en-tête : on itère jusqu'à ce qu'il tienne
+    reserved = header_reserve
+    while True:
+        offset = _align(_PREFIX.size + reserved)
+        for name, a in arrays.items():
+            entries[name]['offset'] = offset
+            offset = _align(offset + a.nbytes)
+        header = json.dumps({'meta': meta, 'arrays': entries}).encode('utf-8')
+        if len(header) <= reserved:
+            return header.ljust(reserved), offset
+        reserved = len(header)
+
+
+def _write_into(buffer, header: bytes, arrays: Dict[str, np.ndarray], entries: dict):
+    view = memoryview(buffer).cast('B')
+    view[:_PREFIX.size] = _PREFIX.pack(MAGIC, len(header))
+    view[_PREFIX.size:_PREFIX.size + len(header)] = header
+    for name, a in arrays.items():
+        start = entries[name]['offset']
+        view[start:start + a.nbytes] = np.ascontiguousarray(a).view(np.uint8).reshape(-1)
+
+
+def write_container(path, arrays: Dict[str, np.ndarray], meta: dict, header_reserve: int = 0):
+    header, size = _layout(arrays, meta, header_reserve)
+    entries = json.loads(header)['arrays']
+    with open(path, 'wb') as out:
+        out.write(_PREFIX.pack(MAGIC, len(header)))
+        out.write(header)
+        for name, a in arrays.items():
+            out.seek(entries[name]['offset'])
+            out.write(np.ascontiguousarray(a).tobytes())
+        out.truncate(size)
+
+
+def read_container(buffer) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """Décode un conteneur ; les tableaux sont des vues sans copie sur `buffer`"""
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    magic, header_len = _PREFIX.unpack(raw[:_PREFIX.size].tobytes())
+    if magic != MAGIC:
+        raise ValueError("ce n'est pas un instantané de réseau de Petri")
+    header = json.loads(raw[_PREFIX.size:_PREFIX.size + header_len].tobytes())
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = raw[entry['offset']:entry['offset'] + count * dtype.itemsize] \
+            .view(dtype).reshape(shape)
+    return header['meta'], arrays
+
+
+def open_container(path) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """Ouvre un conteneur par projection mémoire (mmap) : ouverture instantanée"""
+    return read_container(np.memmap(path, dtype=np.uint8, mode='r'))
+
+
+def share_container(arrays: Dict[str, np.ndarray], meta: dict) -> shared_memory.SharedMemory:
+    """Copie un conteneur dans un segment de mémoire partagée.
+
+    Les processus de travail l'ouvrent avec attach_container(shm.name), sans copie.
+    Le créateur doit appeler shm.close() puis shm.unlink() une fois le travail fini.
+    """
+    header, size = _layout(arrays, meta)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    _write_into(shm.buf, header, arrays, json.loads(header)['arrays'])
+    return shm
+
+
+def attach_container(name: str) -> Tuple[dict, Dict[str, np.ndarray], shared_memory.SharedMemory]:
+    """Ouvre un conteneur en mémoire partagée ; garder `shm` ouvert tant que les tableaux servent"""
+    shm = shared_memory.SharedMemory(name=name)
+    meta, arrays = read_container(shm.buf)
+    return meta, arrays, shm
+
+
+def _encode_names(names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [n.encode('utf-8') for n in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_names(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+
+
+def _concat(adjacencies, field: str, dtype) -> np.ndarray:
+    """Concatène les tableaux array des listes d'adjacence (type C natif, puis converti)"""
+    native = np.dtype(getattr(adjacencies[0], field).typecode) if adjacencies else dtype
+    data = np.frombuffer(b''.join(getattr(a, field).tobytes() for a in adjacencies), dtype=native)
+    return data.astype(dtype, copy=False)
+
+
+class NetSnapshot:
+    """Réseau décodé d'un instantané : arcs sous forme de tableaux d'indices et de poids"""
+
+    def __init__(self, meta: dict, arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+        self._place_ids = None
+        self._transition_ids = None
+
+    @property
+    def place_ids(self) -> List[str]:
+        if self._place_ids is None:
+            self._place_ids = _decode_names(self.arrays['place_names'], self.arrays['place_name_offsets'])
+        return self._place_ids
+
+    @property
+    def transition_ids(self) -> List[str]:
+        if self._transition_ids is None:
+            self._transition_ids = _decode_names(self.arrays['transition_names'],
+                                                 self.arrays['transition_name_offsets'])
+        return self._transition_ids
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['arrays'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_petri_net(self, net: Optional[PetriNet] = None) -> PetriNet:
+        """Reconstruit un PetriNet par chargement en masse des arcs"""
+        if net is None:
+            net = PetriNet(headless=True)
+        for place, tokens in zip(self.place_ids, self.arrays['initial_marking'].tolist()):
+            net.add_place(place, tokens)
+        for trans in self.transition_ids:
+            net.add_transition(trans)
+        a = self.arrays
+        net.arcs.load_input_arcs(a['in_place'].tolist(), a['in_transition'].tolist(),
+                                 a['in_weight'].tolist())
+        net.arcs.load_output_arcs(a['out_transition'].tolist(), a['out_place'].tolist(),
+                                  a['out_weight'].tolist())
+        return net
+
+
+def net_arrays(net: PetriNet) -> Tuple[Dict[str, np.ndarray], dict]:
+    """Tableaux et métadonnées décrivant la structure et le marquage du réseau"""
+    arcs = net.arcs
+    if list(net.places) != arcs.place_ids:
+        raise ValueError("les places du réseau et de son ArcStore ne sont pas dans le même ordre")
+    arrays = {}
+    arrays['place_names'], arrays['place_name_offsets'] = _encode_names(arcs.place_ids)
+    arrays['transition_names'], arrays['transition_name_offsets'] = _encode_names(arcs.transition_ids)
+    arrays['initial_marking'] = np.array(list(net.places.values()), dtype=np.int64)
+    for prefix, adjacency in (('in', arcs.trans_in), ('out', arcs.trans_out)):
+        degrees = np.array([len(a) for a in adjacency], dtype=np.int64)
+        arrays[f'{prefix}_transition'] = np.repeat(np.arange(len(adjacency), dtype=np.int32), degrees)
+        arrays[f'{prefix}_place'] = _concat(adjacency, 'nodes', np.int32)
+        arrays[f'{prefix}_weight'] = _concat(adjacency, 'weights', np.int64)
+    meta = {'kind': 'net', 'places': len(arcs.place_ids), 'transitions': len(arcs.transition_ids)}
+    return arrays, meta
+
+
+def save_net(net: PetriNet, path):
+    arrays, meta = net_arrays(net)
+    write_container(path, arrays, meta)
+
+
+def load_net(path) -> NetSnapshot:
+    """Ouvre un instantané de réseau par projection mémoire"""
+    meta, arrays = open_container(path)
+    if meta.get('kind') != 'net':
+        raise ValueError(f"{path} ne contient pas un réseau")
+    return NetSnapshot(meta, arrays)
+
+
+def share_net(net: PetriNet) -> shared_memory.SharedMemory:
+    """Place l'instantané du réseau en mémoire partagée (voir attach_net)"""
+    return share_container(*net_arrays(net))
+
+
+def attach_net(name: str) -> Tuple[NetSnapshot, shared_memory.SharedMemory]:
+    meta, arrays, shm = attach_container(name)
+    return NetSnapshot(meta, arrays), shm
+
+
+def save_markings(path, markings: np.ndarray, place_ids: Sequence[str], dtype=np.int32):
+    """Enregistre une matrice N x |P| de marquages en vecteurs d'entiers de largeur fixe"""
+    markings = np.asarray(markings, dtype=dtype)
+    write_container(path, {'markings': markings}, {'kind': 'markings', 'places': list(place_ids)})
+
+
+def load_markings(path) -> Tuple[np.ndarray, List[str]]:
+    """Ouvre un ensemble de marquages par projection mémoire (matrice N x |P| en lecture seule)"""
+    meta, arrays = open_container(path)
+    if meta.get('kind') != 'markings':
+        raise ValueError(f"{path} ne contient pas de marquages")
+    return arrays['markings'], meta['places']
+
+
+class MarkingWriter:
+    """Écriture incrémentale d'un ensemble de marquages (ajout par lignes).
+
+    L'en-tête est réservé à l'ouverture et réécrit à la fermeture avec le nombre
+    final de lignes ; le fichier produit se relit avec load_markings.
+    """
+
+    HEADER_RESERVE = 4096
+
+    def __init__(self, path, place_ids: Sequence[str], dtype=np.int32):
+        self.path = path
+        self.place_ids = list(place_ids)
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        empty = np.zeros((0, len(self.place_ids)), dtype=self.dtype)
+        self._reserve = max(self.HEADER_RESERVE, 2 * len(json.dumps(self.place_ids)) + 256)
+        header, self._data_offset = _layout({'markings': empty}, self._meta(), self._reserve)
+        self._file = open(path, 'wb')
+        self._file.write(_PREFIX.pack(MAGIC, len(header)))
+        self._file.write(header)
+        self._file.seek(self._data_offset)
+
+    def _meta(self):
+        return {'kind': 'markings', 'places': self.place_ids}
+
+    def append(self, rows):
+        rows = np.asarray(rows, dtype=self.dtype).reshape(-1, len(self.place_ids))
+        self._file.write(rows.tobytes())
+        self.count += len(rows)
+
+    def close(self):
+        entries = {'markings': {'dtype': self.dtype.str, 'shape': [self.count, len(self.place_ids)],
+                                'offset': self._data_offset}}
+        header = json.dumps({'meta': self._meta(), 'arrays': entries}).encode('utf-8')
+        header = header.ljust(self._reserve)
+        self._file.seek(0)
+        self._file.write(_PREFIX.pack(MAGIC, len(header)))
+        self._file.write(header)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,264 @@
+import mmap
+import os
+import zlib
+from array import array
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+class MemoryEdgeLog:
+    """Arcs de l'espace d'états en mémoire : trois tableaux (source, destination, transition)"""
+
+    def __init__(self):
+        self.src, self.dst, self.transition = array('I'), array('I'), array('I')
+
+    def append(self, src: Sequence[int], dst: Sequence[int], transition: Sequence[int]):
+        self.src.extend(src)
+        self.dst.extend(dst)
+        self.transition.extend(transition)
+
+    def __len__(self):
+        return len(self.src)
+
+    def arrays(self):
+        return self.src, self.dst, self.transition
+
+    def close(self):
+        pass
+
+
+class MemoryStateStore:
+    """Ensemble des états visités en mémoire (par défaut) : clé empaquetée -> numéro"""
+
+    def __init__(self):
+        self._index = {}
+        self._keys: List[bytes] = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __getitem__(self, sid: int) -> bytes:
+        return self._keys[sid]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def keys_range(self, start: int, stop: int) -> List[bytes]:
+        return self._keys[start:stop]
+
+    def add_batch(self, keys: Sequence[bytes]) -> List[int]:
+        """Numéros des clés ; les clés inconnues reçoivent les numéros suivants, dans l'ordre"""
+        index, stored = self._index, self._keys
+        ids = []
+        for key in keys:
+            sid = index.get(key)
+            if sid is None:
+                sid = index[key] = len(stored)
+                stored.append(key)
+            ids.append(sid)
+        return ids
+
+    def edge_log(self) -> MemoryEdgeLog:
+        return MemoryEdgeLog()
+
+    def close(self):
+        pass
+
+
+class DiskEdgeLog:
+    """Arcs écrits séquentiellement dans un fichier d'enregistrements (u32, u32, u32)"""
+
+    RECORD = np.dtype([('src', '<u4'), ('dst', '<u4'), ('transition', '<u4')])
+
+    def __init__(self, path: str, buffer_records: int = 1 << 16):
+        self.path = path
+        self._file = open(path, 'wb+')
+        self._count = 0
+        self._buffer = array('I')
+        self._buffer_records = buffer_records
+
+    def append(self, src: Sequence[int], dst: Sequence[int], transition: Sequence[int]):
+        buf = self._buffer
+        for record in zip(src, dst, transition):
+            buf.extend(record)
+        self._count += len(src)
+        if len(buf) >= 3 * self._buffer_records:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(np.asarray(self._buffer, dtype='<u4').tobytes())
+            self._buffer = array('I')
+        self._file.flush()
+
+    def __len__(self):
+        return self._count
+
+    def arrays(self):
+        """Colonnes (src, dst, transition) projetées en mémoire depuis le fichier"""
+        self.flush()
+        if self._count == 0:
+            empty = np.zeros(0, dtype='<u4')
+            return empty, empty, empty
+        records = np.memmap(self.path, dtype=self.RECORD, mode='r', shape=(self._count,))
+        return records['src'], records['dst'], records['transition']
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class DiskStateStore:
+    """Ensemble des états visités sur disque, pour les espaces plus grands que la RAM.
+
+    - table de hachage à adressage ouvert projetée en mémoire (mmap) : chaque case
+      contient la clé empaquetée suivie du numéro d'état + 1 (0 = case vide) ;
+      elle est doublée (réécriture séquentielle) au-delà du taux de remplissage ;
+    - fichier des états en ajout seul (enregistrements de largeur fixe) : il donne
+      la clé d'un numéro et sert de file d'attente BFS sur disque, lue
+      séquentiellement par keys_range ;
+    - add_batch trie les recherches par case pour regrouper les accès aux pages.
+    """
+
+    ID_SIZE = 8
+
+    def __init__(self, directory: str, key_size: Optional[int] = None,
+                 initial_capacity: int = 1 << 16, max_load: float = 0.5):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.key_size = key_size
+        self.max_load = max_load
+        self._capacity = max(16, 1 << (initial_capacity - 1).bit_length())
+        self._count = 0
+        self._states_path = os.path.join(directory, 'states.bin')
+        self._table_path = os.path.join(directory, 'table.bin')
+        self._states = open(self._states_path, 'wb+')
+        self._pending: List[bytes] = []
+        self._table = None
+        self._table_file = None
+
+    # Table de hachage projetée en mémoire
+    def _open_table(self, path: str, capacity: int):
+        slot = self.key_size + self.ID_SIZE
+        f = open(path, 'wb+')
+        f.truncate(capacity * slot)
+        return f, mmap.mmap(f.fileno(), capacity * slot)
+
+    def _slot_of(self, key: bytes, capacity: int) -> int:
+        return (zlib.crc32(key) * 0x9E3779B1) & (capacity - 1)
+
+    def _probe(self, table, capacity: int, key: bytes):
+        """(case, numéro) : case où se trouve la clé, ou première case vide (numéro -1)"""
+        size = self.key_size
+        slot_size = size + self.ID_SIZE
+        i = self._slot_of(key, capacity)
+        while True:
+            off = i * slot_size
+            stored = int.from_bytes(table[off + size:off + slot_size], 'little')
+            if stored == 0:
+                return i, -1
+            if table[off:off + size] == key:
+                return i, stored - 1
+            i = (i + 1) & (capacity - 1)
+
+    def _write_slot(self, table, i: int, key: bytes, sid: int):
+        slot_size = self.key_size + self.ID_SIZE
+        off = i * slot_size
+        table[off:off + slot_size] = key + (sid + 1).to_bytes(self.ID_SIZE, 'little')
+
+    def _grow(self):
+        """Double la table en la relisant séquentiellement"""
+        new_capacity = self._capacity * 2
+        tmp_path = self._table_path + '.tmp'
+        new_file, new_table = self._open_table(tmp_path, new_capacity)
+        size, slot_size = self.key_size, self.key_size + self.ID_SIZE
+        old = self._table
+        for off in range(0, self._capacity * slot_size, slot_size):
+            stored = int.from_bytes(old[off + size:off + slot_size], 'little')
+            if stored:
+                key = old[off:off + size]
+                i, _ = self._probe(new_table, new_capacity, key)
+                self._write_slot(new_table, i, key, stored - 1)
+        old.close()
+        self._table_file.close()
+        os.replace(tmp_path, self._table_path)
+        self._table, self._table_file, self._capacity = new_table, new_file, new_capacity
+
+    # Interface commune avec MemoryStateStore
+    def __len__(self):
+        return self._count
+
+    def _flush_states(self):
+        if self._pending:
+            self._states.seek(0, os.SEEK_END)
+            self._states.write(b''.join(self._pending))
+            self._pending = []
+            self._states.flush()
+
+    def keys_range(self, start: int, stop: int) -> List[bytes]:
+        """Lecture séquentielle des états [start, stop) dans le fichier des états"""
+        self._flush_states()
+        stop = min(stop, self._count)
+        if start >= stop:
+            return []
+        size = self.key_size
+        self._states.seek(start * size)
+        data = self._states.read((stop - start) * size)
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def __getitem__(self, sid: int) -> bytes:
+        if not 0 <= sid < self._count:
+            raise IndexError(sid)
+        return self.keys_range(sid, sid + 1)[0]
+
+    def __iter__(self):
+        chunk = 1 << 16
+        for start in range(0, self._count, chunk):
+            yield from self.keys_range(start, start + chunk)
+
+    def add_batch(self, keys: Sequence[bytes]) -> List[int]:
+        if not keys:
+            return []
+        if self._table is None:
+            if self.key_size is None:
+                self.key_size = len(keys[0])
+            self._table_file, self._table = self._open_table(self._table_path, self._capacity)
+
+        # Recherches groupées, triées par case pour la localité des pages
+        capacity = self._capacity
+        order = sorted(range(len(keys)), key=lambda j: self._slot_of(keys[j], capacity))
+        found = [-1] * len(keys)
+        for j in order:
+            found[j] = self._probe(self._table, capacity, keys[j])[1]
+
+        # Insertion des nouvelles clés dans l'ordre du lot (numérotation déterministe)
+        new_ids = {}
+        ids = []
+        for j, key in enumerate(keys):
+            sid = found[j]
+            if sid < 0:
+                sid = new_ids.get(key)
+                if sid is None:
+                    if (self._count + 1) > self.max_load * self._capacity:
+                        self._grow()
+                    sid = self._count
+                    i, _ = self._probe(self._table, self._capacity, key)
+                    self._write_slot(self._table, i, key, sid)
+                    self._pending.append(key)
+                    self._count += 1
+                    new_ids[key] = sid
+            ids.append(sid)
+        return ids
+
+    def edge_log(self) -> DiskEdgeLog:
+        return DiskEdgeLog(os.path.join(self.directory, 'edges.bin'))
+
+    def close(self):
+        self._flush_states()
+        if self._table is not None:
+            self._table.flush()
+            self._table.close()
+            self._table_file.close()
+            self._table = None
+        self._states.close()
@@ -0,0 +1,368 @@
+import heapq
+import math
+import random
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from simulation import PetriNet
+from scheduler import dependency_lists, transition_deltas
+
+
+class StochasticPetriNet(PetriNet):
+    """Réseau de Petri stochastique : chaque transition a un taux exponentiel.
+
+    semantics='single' : une transition franchissable tire au taux λ (serveur unique) ;
+    semantics='infinite' : le taux est λ x degré de sensibilisation (serveurs infinis).
+    """
+
+    def __init__(self, headless: bool = False, semantics: str = 'single'):
+        if semantics not in ('single', 'infinite'):
+            raise ValueError(f"sémantique inconnue: {semantics}")
+        super().__init__(headless)
+        self.semantics = semantics
+        self.rates: Dict[str, float] = {}
+
+    def add_transition(self, transition_id: str, rate: float = 1.0):
+        super().add_transition(transition_id)
+        self.rates[transition_id] = rate
+
+    @classmethod
+    def from_pre_post(cls, places, transitions, pre, post, initial_marking, rates=None,
+                      semantics: str = 'single', headless: bool = True):
+        """Construit le réseau à partir de la forme pre/post utilisée dans exo2"""
+        net = cls(headless=headless, semantics=semantics)
+        rates = rates or {}
+        for p in places:
+            net.add_place(p, initial_marking.get(p, 0))
+        for t in transitions:
+            net.add_transition(t, rates.get(t, 1.0))
+            for p, w in pre.get(t, {}).items():
+                if w:
+                    net.add_input_arc(p, t, w)
+            for p, w in post.get(t, {}).items():
+                if w:
+                    net.add_output_arc(t, p, w)
+        return net
+
+
+class SimulationResult:
+    """Statistiques d'une trajectoire stochastique"""
+
+    def __init__(self, time, events, final_marking, time_averaged_marking, firing_counts):
+        self.time = time
+        self.events = events
+        self.final_marking = final_marking
+        self.time_averaged_marking = time_averaged_marking
+        self.firing_counts = firing_counts
+
+    @property
+    def throughput(self) -> Dict[str, float]:
+        """Nombre moyen de franchissements par unité de temps, par transition"""
+        if self.time <= 0:
+            return {t: 0.0 for t in self.firing_counts}
+        return {t: n / self.time for t, n in self.firing_counts.items()}
+
+
+class NextReactionSimulator:
+    """Simulation exacte (Gillespie) par la méthode de la prochaine réaction.
+
+    Les dates de franchissement prévues sont dans un tas ; après un événement
+    seules les transitions dépendantes (graphe de dépendances) sont
+    replanifiées, avec réutilisation des dates (Gibson & Bruck), d'où un coût
+    O(log T) par événement. Les marquages moyens dans le temps sont intégrés
+    paresseusement, place par place, au moment où elles changent.
+    """
+
+    def __init__(self, net: StochasticPetriNet, seed=None):
+        arcs = net.arcs
+        self.net = net
+        self.place_ids = arcs.place_ids
+        self.transition_ids = arcs.transition_ids
+        self.infinite = net.semantics == 'infinite'
+        self.rates = [net.rates.get(t, 1.0) for t in arcs.transition_ids]
+        self.inputs = [list(adj.items()) for adj in arcs.trans_in]
+        self.deltas = [list(d.items()) for d in transition_deltas(arcs)]
+        # Transitions à replanifier après chaque franchissement (dépendantes + elle-même)
+        self.updates = [sorted(set(deps) | {t}) for t, deps in enumerate(dependency_lists(arcs))]
+        self.rng = random.Random(seed)
+
+    def propensity(self, marking, t: int) -> float:
+        rate = self.rates[t]
+        if rate <= 0:
+            return 0.0
+        if self.infinite:
+            degree = min((marking[p] // w for p, w in self.inputs[t]), default=1)
+            return rate * degree
+        for p, w in self.inputs[t]:
+            if marking[p] < w:
+                return 0.0
+        return rate
+
+    def run(self, horizon: Optional[float] = None, max_events: Optional[int] = None) -> SimulationResult:
+        """Simule jusqu'à la date `horizon` ou `max_events` événements"""
+        if horizon is None and max_events is None:
+            raise ValueError("il faut fixer horizon et/ou max_events")
+        horizon = math.inf if horizon is None else horizon
+        max_events = math.inf if max_events is None else max_events
+
+        marking = [self.net.places.get(p, 0) for p in self.place_ids]
+        n_trans = len(self.transition_ids)
+        expovariate = self.rng.expovariate
+        propensity = self.propensity
+        deltas, updates = self.deltas, self.updates
+
+        area = [0.0] * len(marking)
+        last_change = [0.0] * len(marking)
+        counts = [0] * n_trans
+
+        # Tas (date, transition, version) avec suppression paresseuse
+        rates = [0.0] * n_trans
+        due = [math.inf] * n_trans
+        version = [0] * n_trans
+        heap = []
+        for t in range(n_trans):
+            a = propensity(marking, t)
+            rates[t] = a
+            if a > 0:
+                due[t] = expovariate(a)
+                heap.append((due[t], t, 0))
+        heapq.heapify(heap)
+
+        now = 0.0
+        events = 0
+        while heap and events < max_events:
+            when, t, v = heap[0]
+            if v != version[t]:
+                heapq.heappop(heap)
+                continue
+            if when > horizon:
+                break
+            heapq.heappop(heap)
+            now = when
+            events += 1
+            counts[t] += 1
+            for p, d in deltas[t]:
+                area[p] += marking[p] * (now - last_change[p])
+                last_change[p] = now
+                marking[p] += d
+
+            for u in updates[t]:
+                old_rate, new_rate = rates[u], propensity(marking, u)
+                if u != t and new_rate == old_rate:
+                    continue
+                rates[u] = new_rate
+                version[u] += 1
+                if new_rate <= 0:
+                    due[u] = math.inf
+                    continue
+                if u != t and old_rate > 0 and due[u] != math.inf:
+                    due[u] = now + (old_rate / new_rate) * (due[u] - now)
+                else:
+                    due[u] = now + expovariate(new_rate)
+                heapq.heappush(heap, (due[u], u, version[u]))
+
+            if len(heap) > 4 * n_trans + 64:
+                heap = [(due[u], u, version[u]) for u in range(n_trans) if due[u] != math.inf]
+                heapq.heapify(heap)
+
+        end = now if events >= max_events or horizon == math.inf else horizon
+        for p in range(len(marking)):
+            area[p] += marking[p] * (end - last_change[p])
+
+        return SimulationResult(
+            time=end,
+            events=events,
+            final_marking=dict(zip(self.place_ids, marking)),
+            time_averaged_marking={p: (area[i] / end if end > 0 else float(marking[i]))
+                                   for i, p in enumerate(self.place_ids)},
+            firing_counts=dict(zip(self.transition_ids, counts)),
+        )
+
+
+class TauLeapingSimulator:
+    """Simulation approchée par tau-leaping pour les réseaux à forte population.
+
+    À chaque saut de durée tau, chaque transition non critique est franchie un
+    nombre de fois tiré selon une loi de Poisson de paramètre a_j(M)·tau. Le
+    pas est adapté (Cao, Gillespie & Petzold) pour que les propensions varient
+    au plus d'une fraction `epsilon` ; les transitions critiques (moins de
+    `critical_threshold` franchissements possibles) sont traitées exactement,
+    et un saut qui rendrait un marquage négatif est rejoué avec tau/2. Quand
+    un saut ne vaudrait pas mieux que quelques pas exacts (tau < 10/a0, ou
+    aucune transition non critique), un bloc de `ssa_steps` pas exacts est
+    simulé avant de retenter un saut.
+    """
+
+    def __init__(self, net: StochasticPetriNet, epsilon: float = 0.03,
+                 critical_threshold: int = 10, seed=None, ssa_steps: int = 100):
+        arcs = net.arcs
+        self.net = net
+        self.place_ids = arcs.place_ids
+        self.transition_ids = arcs.transition_ids
+        self.infinite = net.semantics == 'infinite'
+        self.epsilon = epsilon
+        self.critical_threshold = critical_threshold
+        self.ssa_steps = ssa_steps
+        self.rng = np.random.default_rng(seed)
+
+        shape = (len(self.transition_ids), len(self.place_ids))
+        pre = np.zeros(shape, dtype=np.int64)
+        post = np.zeros(shape, dtype=np.int64)
+        for t in range(shape[0]):
+            for p, w in arcs.trans_in[t].items():
+                pre[t, p] = w
+            for p, w in arcs.trans_out[t].items():
+                post[t, p] = w
+        self.pre = pre
+        self.incidence = post - pre
+        self.rates = np.array([net.rates.get(t, 1.0) for t in self.transition_ids], dtype=float)
+        # Degré de sensibilisation : min sur les places d'entrée de M(p) // Pre(t, p)
+        self._has_input = pre.any(axis=1)
+        self._safe_pre = np.where(pre > 0, pre, 1)
+        # Consommation nette : sert à repérer les transitions critiques
+        self._consumes = self.incidence < 0
+        self._safe_consumption = np.where(self._consumes, -self.incidence, 1)
+        # Pas exacts : propensions, deltas creux et dépendances de la méthode exacte
+        self._exact = NextReactionSimulator(net)
+
+    def enabling_degree(self, marking: np.ndarray) -> np.ndarray:
+        ratios = np.where(self.pre > 0, marking // self._safe_pre, np.iinfo(np.int64).max)
+        degree = ratios.min(axis=1) if ratios.shape[1] else np.zeros(len(ratios), dtype=np.int64)
+        # Une transition sans place d'entrée est toujours franchissable (degré 1)
+        return np.where(self._has_input, degree, 1)
+
+    def remaining_firings(self, marking: np.ndarray) -> np.ndarray:
+        """Nombre de franchissements avant d'épuiser une place consommée (inf sinon)"""
+        ratios = np.where(self._consumes, marking // self._safe_consumption, np.iinfo(np.int64).max)
+        return ratios.min(axis=1) if ratios.shape[1] else np.full(len(ratios), np.iinfo(np.int64).max)
+
+    def propensities(self, degree: np.ndarray) -> np.ndarray:
+        if self.infinite:
+            return self.rates * degree
+        return self.rates * (degree > 0)
+
+    def _leap_size(self, marking, a, noncritical) -> float:
+        """Pas maximal tel que chaque marquage ne varie que d'une fraction epsilon"""
+        v = self.incidence[noncritical]
+        a_nc = a[noncritical]
+        mu = a_nc @ v
+        sigma2 = a_nc @ (v * v)
+        bound = np.maximum(self.epsilon * marking, 1.0)
+        with np.errstate(divide='ignore'):
+            tau_mu = np.where(mu != 0, bound / np.abs(mu), np.inf)
+            tau_sigma = np.where(sigma2 > 0, bound ** 2 / sigma2, np.inf)
+        return float(min(tau_mu.min(initial=np.inf), tau_sigma.min(initial=np.inf)))
+
+    def _ssa_block(self, marking: np.ndarray, area: np.ndarray, counts: np.ndarray, now: float,
+                   horizon: float, steps: int) -> Tuple[float, int]:
+        """Au plus `steps` pas exacts (méthode directe) ; renvoie (date atteinte, pas effectués).
+
+        `marking`, `area` et `counts` sont mis à jour sur place. Après chaque
+        franchissement, seules les propensions des transitions dépendantes
+        sont recalculées ; l'aire est intégrée paresseusement, place par place.
+        """
+        exact = self._exact
+        propensity, deltas, updates = exact.propensity, exact.deltas, exact.updates
+        m = marking.tolist()
+        n_trans = len(counts)
+        a = [propensity(m, t) for t in range(n_trans)]
+        acc = [0.0] * len(m)
+        last = [now] * len(m)
+        waits = self.rng.exponential(size=steps).tolist()
+        draws = self.rng.random(size=steps).tolist()
+        done = 0
+        for wait, draw in zip(waits, draws):
+            a0 = sum(a)
+            if a0 <= 0:
+                break
+            dt = wait / a0
+            if now + dt > horizon:
+                now = horizon
+                break
+            now += dt
+            # Transition t telle que a_0 + ... + a_(t-1) <= draw·a0 < a_0 + ... + a_t
+            target, t = draw * a0, 0
+            while t < n_trans - 1 and (target >= a[t] or a[t] <= 0):
+                target -= a[t]
+                t += 1
+            while a[t] <= 0:
+                t -= 1
+            for p, d in deltas[t]:
+                acc[p] += m[p] * (now - last[p])
+                last[p] = now
+                m[p] += d
+            counts[t] += 1
+            done += 1
+            for u in updates[t]:
+                a[u] = propensity(m, u)
+        for p in range(len(m)):
+            acc[p] += m[p] * (now - last[p])
+        area += acc
+        marking[:] = m
+        return now, done
+
+    def run(self, horizon: float, max_leaps: Optional[int] = None) -> SimulationResult:
+        """Simule jusqu'à la date `horizon` (ou `max_leaps` sauts)"""
+        marking = np.array([self.net.places.get(p, 0) for p in self.place_ids], dtype=np.int64)
+        area = np.zeros(len(marking), dtype=float)
+        counts = np.zeros(len(self.transition_ids), dtype=np.int64)
+        rng = self.rng
+        now = 0.0
+        leaps = 0
+        tau1 = None
+
+        while now < horizon and (max_leaps is None or leaps < max_leaps):
+            degree = self.enabling_degree(marking)
+            a = self.propensities(degree)
+            a0 = a.sum()
+            if a0 <= 0:
+                break
+            critical = (a > 0) & (self.remaining_firings(marking) < self.critical_threshold)
+            noncritical = (a > 0) & ~critical
+            a_crit = a[critical].sum()
+
+            if tau1 is None:
+                tau1 = self._leap_size(marking, a, noncritical) if noncritical.any() else np.inf
+
+            if tau1 < 10.0 / a0 or not noncritical.any():
+                # Trop peu d'événements attendus (ou seulement des transitions critiques,
+                # une par saut) : un bloc de pas exacts avant de retenter un saut
+                steps = self.ssa_steps if max_leaps is None else min(self.ssa_steps, max_leaps - leaps)
+                now, done = self._ssa_block(marking, area, counts, now, horizon, steps)
+                leaps += done
+                tau1 = None
+                continue
+
+            tau2 = rng.exponential(1.0 / a_crit) if a_crit > 0 else np.inf
+            tau = min(tau1, tau2, horizon - now)
+            fired = np.zeros(len(a), dtype=np.int64)
+            fired[noncritical] = rng.poisson(a[noncritical] * tau)
+            if tau2 <= tau1 and tau2 <= horizon - now:
+                crit_idx = np.flatnonzero(critical)
+                fired[rng.choice(crit_idx, p=a[crit_idx] / a_crit)] += 1
+            new_marking = marking + fired @ self.incidence
+            if (new_marking < 0).any():
+                tau1 /= 2.0
+                continue
+
+            area += marking * tau
+            marking = new_marking
+            counts += fired
+            now += tau
+            leaps += 1
+            tau1 = None
+
+        if now < horizon and (max_leaps is None or leaps < max_leaps):
+            # Blocage : le marquage reste constant jusqu'à l'horizon
+            area += marking * (horizon - now)
+            now = horizon
+
+        return SimulationResult(
+            time=now,
+            events=int(counts.sum()),
+            final_marking=dict(zip(self.place_ids, marking.tolist())),
+            time_averaged_marking=dict(zip(self.place_ids,
+                                           (area / now if now > 0 else marking.astype(float)).tolist())),
+            firing_counts=dict(zip(self.transition_ids, counts.tolist())),
+        )
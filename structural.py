@@ -0,0 +1,305 @@
+import heapq
+from collections import defaultdict
+from fractions import Fraction
+from functools import reduce
+from itertools import count
+from math import floor, gcd
+from typing import Dict, List, Optional, Tuple
+
+from reachability import PackedNet
+
+
+def incidence_matrix(net: PackedNet) -> List[Dict[int, int]]:
+    """Matrice d'incidence creuse C = Post - Pre : une ligne {transition: C[p, t]} par place"""
+    rows: List[Dict[int, int]] = [{} for _ in net.places]
+    for t, delta in enumerate(net.deltas):
+        for p, d in delta:
+            rows[p][t] = d
+    return rows
+
+
+def _transpose(rows: List[Dict[int, int]], columns: int) -> List[Dict[int, int]]:
+    result: List[Dict[int, int]] = [{} for _ in range(columns)]
+    for i, row in enumerate(rows):
+        for j, v in row.items():
+            result[j][i] = v
+    return result
+
+
+def _normalize(c: Dict[int, int], y: Dict[int, int]):
+    g = reduce(gcd, y.values(), reduce(gcd, c.values(), 0))
+    if g > 1:
+        c = {k: v // g for k, v in c.items()}
+        y = {k: v // g for k, v in y.items()}
+    return c, y
+
+
+def _farkas(rows: List[Dict[int, int]], columns: int, inequality: bool = False,
+            max_rows: int = 100000) -> List[Dict[int, int]]:
+    """Générateurs minimaux du cône {y ≥ 0 : yᵀA = 0} (ou yᵀA ≤ 0 si `inequality`).
+
+    Algorithme de Farkas (élimination de Fourier–Motzkin), en entiers
+    exacts : chaque colonne est annulée en combinant les lignes de signes
+    opposés. Une combinaison n'est gardée que si aucune autre ligne n'a un
+    support inclus dans l'union des deux supports (test d'adjacence) : les
+    lignes restent les rayons extrêmes, c'est-à-dire les semiflots de
+    support minimal, sans doublons ni redondances. La colonne traitée à
+    chaque étape est celle qui crée le moins de lignes (tas, coûts tenus à
+    jour) ; des index colonne -> lignes et variable -> lignes limitent
+    chaque étape aux lignes concernées. Le nombre de semiflots minimaux
+    peut être exponentiel : au-delà de `max_rows` lignes, ValueError.
+    """
+    n = len(rows)
+    # Ligne : colonnes restantes {colonne: valeur}, combinaison {variable: poids} et support
+    # en bits (variables non nulles, puis colonnes déjà traitées où la combinaison est négative)
+    coeffs: Dict[int, Dict[int, int]] = {}
+    combos: Dict[int, Dict[int, int]] = {}
+    supports: Dict[int, int] = {}
+    by_column: Dict[int, set] = defaultdict(set)
+    by_variable: Dict[int, set] = defaultdict(set)
+    positive, negative = [0] * columns, [0] * columns
+    heap: List[Tuple[int, int]] = []
+    ids = count()
+
+    def cost(j: int) -> int:
+        return positive[j] * negative[j] - positive[j] - (0 if inequality else negative[j])
+
+    def count_signs(c: Dict[int, int], step: int):
+        for j, v in c.items():
+            if v > 0:
+                positive[j] += step
+            else:
+                negative[j] += step
+            heapq.heappush(heap, (cost(j), j))
+
+    def add(c: Dict[int, int], y: Dict[int, int], s: int):
+        r = next(ids)
+        coeffs[r], combos[r], supports[r] = c, y, s
+        for j in c:
+            by_column[j].add(r)
+        for v in y:
+            by_variable[v].add(r)
+        count_signs(c, 1)
+
+    def remove(r: int):
+        c = coeffs.pop(r)
+        for j in c:
+            by_column[j].discard(r)
+        for v in combos.pop(r):
+            by_variable[v].discard(r)
+        del supports[r]
+        count_signs(c, -1)
+
+    for i, row in enumerate(rows):
+        add(dict(row), {i: 1}, 1 << i)
+    remaining = {j for row in rows for j in row}
+    while remaining:
+        c_j, j = heapq.heappop(heap)
+        if j not in remaining or c_j != cost(j):
+            continue
+        remaining.discard(j)
+
+        pos = [r for r in by_column[j] if coeffs[r][j] > 0]
+        neg = [r for r in by_column[j] if coeffs[r][j] < 0]
+        created = []
+        for a in pos:
+            a_c, a_y, alpha = coeffs[a], combos[a], coeffs[a][j]
+            for b in neg:
+                b_c, b_y = coeffs[b], combos[b]
+                union = supports[a] | supports[b]
+                variables = a_y.keys() | b_y.keys()
+                if any(r != a and r != b and supports[r] & ~union == 0
+                       for v in variables for r in by_variable[v]):
+                    continue
+                beta = -b_c[j]
+                c = {}
+                for k in a_c.keys() | b_c.keys():
+                    if k != j:
+                        v = beta * a_c.get(k, 0) + alpha * b_c.get(k, 0)
+                        if v:
+                            c[k] = v
+                y = {k: beta * a_y.get(k, 0) + alpha * b_y.get(k, 0) for k in variables}
+                created.append((*_normalize(c, y), union))
+        for r in pos:
+            remove(r)
+        for r in neg:
+            if inequality:
+                # yᵀA_j < 0 est admis : la colonne devient une contrainte lâche, notée dans le support
+                c, y, s = coeffs[r], combos[r], supports[r]
+                remove(r)
+                add({k: v for k, v in c.items() if k != j}, y, s | 1 << (n + j))
+            else:
+                remove(r)
+        for row in created:
+            add(*row)
+        if len(coeffs) > max_rows:
+            raise ValueError(f"plus de {max_rows} semiflots intermédiaires : analyse structurelle abandonnée")
+    return sorted(combos.values(), key=lambda y: sorted(y.items()))
+
+
+def _eliminate(row: Dict[int, Fraction], pivot: Dict[int, Fraction], factor: Fraction):
+    """row -= factor * pivot, en retirant les coefficients devenus nuls"""
+    for j, v in pivot.items():
+        w = row.get(j, 0) - factor * v
+        if w:
+            row[j] = w
+        else:
+            row.pop(j, None)
+
+
+def _simplex(constraints: List[Tuple[Dict[int, int], int]], objective: Dict[int, int],
+             variables: int) -> Optional[Tuple[Fraction, Dict[int, Fraction]]]:
+    """Maximise objective·x sous a·x ≤ b pour chaque (a, b) de `constraints` (b ≥ 0) et x ≥ 0.
+
+    Simplexe primal en rationnels exacts sur un tableau creux (une ligne
+    {variable: coefficient} par contrainte), depuis la base des variables
+    d'écart (numérotées à partir de `variables`) : l'origine est admissible,
+    sans phase 1. La règle de Bland garantit la terminaison. Renvoie
+    (valeur optimale, {variable: valeur non nulle}), ou None si l'objectif
+    n'est pas borné.
+    """
+    rows = [{j: Fraction(a) for j, a in coeffs.items() if a} for coeffs, _ in constraints]
+    rhs = [Fraction(b) for _, b in constraints]
+    basis = [variables + i for i in range(len(rows))]
+    # Ligne de coût : z + Σ cost[j]·x_j = value
+    cost = {j: Fraction(-c) for j, c in objective.items() if c}
+    value = Fraction(0)
+    while True:
+        entering = min((j for j, d in cost.items() if d < 0), default=None)
+        if entering is None:
+            break
+        leaving, best = None, None
+        for i, row in enumerate(rows):
+            a = row.get(entering)
+            if a is not None and a > 0:
+                ratio = rhs[i] / a
+                if leaving is None or ratio < best or (ratio == best and basis[i] < basis[leaving]):
+                    leaving, best = i, ratio
+        if leaving is None:
+            return None
+        pivot = rows[leaving]
+        a = pivot.pop(entering)
+        pivot[basis[leaving]] = Fraction(1)
+        for j in pivot:
+            pivot[j] /= a
+        rhs[leaving] /= a
+        basis[leaving] = entering
+        for i, row in enumerate(rows):
+            factor = row.pop(entering, None) if i != leaving else None
+            if factor:
+                _eliminate(row, pivot, factor)
+                rhs[i] -= factor * rhs[leaving]
+        factor = cost.pop(entering)
+        _eliminate(cost, pivot, factor)
+        value -= factor * rhs[leaving]
+    return value, {b: v for b, v in zip(basis, rhs) if b < variables and v}
+
+
+class StructuralAnalysis:
+    """Analyse structurelle d'un réseau, sans énumérer les marquages accessibles.
+
+    - P-semiflots y ≥ 0, yᵀC = 0 : y·M = y·M0 pour tout marquage accessible
+      (lois de conservation) ; le réseau est conservatif si toute place est
+      dans le support d'un P-semiflot ;
+    - T-semiflots x ≥ 0, Cx = 0 : séquences qui ramènent au même marquage ;
+      le réseau est consistant si toute transition en fait partie ;
+    - P-sous-semiflots y ≥ 0, yᵀC ≤ 0 : y·M ≤ y·M0, d'où une borne pour
+      chaque place de leur support, quel que soit le marquage initial (place
+      structurellement bornée) ; une place hors de tous les supports est
+      non bornée pour un marquage initial suffisant.
+    Le bornage structurel et les bornes des places se décident par
+    programmation linéaire (_simplex), sans énumérer les semiflots ; ceux-ci
+    ne sont calculés, une fois et à la demande, que pour être listés, par
+    _farkas : polynomial sur les réseaux usuels (composants, ressources
+    partagées), exponentiel dans le pire cas.
+    """
+
+    def __init__(self, net: PackedNet, max_rows: int = 100000):
+        self.net = net
+        self.max_rows = max_rows
+        self.incidence = incidence_matrix(net)
+        self._p = self._t = self._sub = self._unbounded = None
+
+    def _named(self, vectors: List[Dict[int, int]], names: List[str]) -> List[Dict[str, int]]:
+        return [{names[i]: w for i, w in sorted(v.items())} for v in vectors]
+
+    @property
+    def p_semiflows(self) -> List[Dict[str, int]]:
+        if self._p is None:
+            self._p = self._named(_farkas(self.incidence, len(self.net.transitions), max_rows=self.max_rows),
+                                  self.net.places)
+        return self._p
+
+    @property
+    def t_semiflows(self) -> List[Dict[str, int]]:
+        if self._t is None:
+            transposed = _transpose(self.incidence, len(self.net.transitions))
+            self._t = self._named(_farkas(transposed, len(self.net.places), max_rows=self.max_rows),
+                                  self.net.transitions)
+        return self._t
+
+    @property
+    def p_subsemiflows(self) -> List[Dict[str, int]]:
+        if self._sub is None:
+            self._sub = self._named(_farkas(self.incidence, len(self.net.transitions), inequality=True,
+                                            max_rows=self.max_rows), self.net.places)
+        return self._sub
+
+    def is_conservative(self) -> bool:
+        covered = {p for y in self.p_semiflows for p in y}
+        return len(covered) == len(self.net.places)
+
+    def is_consistent(self) -> bool:
+        covered = {t for x in self.t_semiflows for t in x}
+        return len(covered) == len(self.net.transitions)
+
+    def unbounded_places(self) -> List[str]:
+        """Places non structurellement bornées (hors du support de tout P-sous-semiflot).
+
+        Un seul programme linéaire : maximiser Σ t_p sous yᵀC ≤ 0, y ≥ 0,
+        t_p ≤ y_p et t_p ≤ 1. Le cône des P-sous-semiflots étant stable par
+        somme et par homothétie, un y de support maximal donne t_p = 1 sur
+        tout ce support : à l'optimum, t_p = 1 exactement sur les places
+        bornées.
+        """
+        if self._unbounded is None:
+            n = len(self.net.places)
+            # Variables : y_p = p, t_p = n + p
+            constraints = [(column, 0) for column in _transpose(self.incidence, len(self.net.transitions))]
+            constraints += [({n + p: 1, p: -1}, 0) for p in range(n)]
+            constraints += [({n + p: 1}, 1) for p in range(n)]
+            _, solution = _simplex(constraints, {n + p: 1 for p in range(n)}, 2 * n)
+            self._unbounded = [q for p, q in enumerate(self.net.places) if solution.get(n + p) != 1]
+        return list(self._unbounded)
+
+    def is_structurally_bounded(self) -> bool:
+        return not self.unbounded_places()
+
+    def bounds(self, initial: Dict[str, int]) -> Dict[str, Optional[int]]:
+        """Borne de chaque place valable pour tout marquage accessible depuis `initial` (None : aucune).
+
+        Pour chaque place p, programme linéaire de l'équation d'état :
+        max M(p) sous M = M0 + Cx ≥ 0, x ≥ 0. Par dualité, c'est le minimum
+        de y·M0 sur les P-sous-semiflots avec y_p ≥ 1 : la meilleure borne
+        que donnent les P-sous-semiflots, sans les énumérer.
+        """
+        unbounded = set(self.unbounded_places())
+        marking = [initial.get(p, 0) for p in self.net.places]
+        # -C x ≤ M0 : aucune place ne devient négative
+        constraints = [({t: -c for t, c in row.items()}, m) for row, m in zip(self.incidence, marking)]
+        result: Dict[str, Optional[int]] = {}
+        for p, name in enumerate(self.net.places):
+            if name in unbounded:
+                result[name] = None
+                continue
+            optimum = _simplex(constraints, self.incidence[p], len(self.net.transitions))
+            result[name] = None if optimum is None else marking[p] + floor(optimum[0])
+        return result
+
+    def conservation_laws(self, initial: Dict[str, int]) -> List[str]:
+        """P-semiflots écrits comme égalités vérifiées par tout marquage accessible"""
+        laws = []
+        for y in self.p_semiflows:
+            terms = " + ".join(p if w == 1 else f"{w}·{p}" for p, w in y.items())
+            laws.append(f"{terms} = {sum(w * initial.get(p, 0) for p, w in y.items())}")
+        return laws
@@ -0,0 +1,341 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from reachability import PackedNet
+
+FALSE, TRUE = 0, 1
+
+
+class BDD:
+    """Diagrammes de décision binaires réduits et ordonnés (table d'unicité + caches).
+
+    Un nœud est un entier ; 0 et 1 sont les feuilles. La variable i est la
+    i-ème place de l'ordre choisi ; les feuilles ont le niveau `num_vars`.
+    """
+
+    def __init__(self, num_vars: int):
+        self.num_vars = num_vars
+        self.var: List[int] = [num_vars, num_vars]
+        self.low: List[int] = [FALSE, TRUE]
+        self.high: List[int] = [FALSE, TRUE]
+        self._unique: Dict[Tuple[int, int, int], int] = {}
+        self._cache: Dict[tuple, int] = {}
+
+    def __len__(self):
+        return len(self.var)
+
+    def node(self, v: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (v, low, high)
+        u = self._unique.get(key)
+        if u is None:
+            u = self._unique[key] = len(self.var)
+            self.var.append(v)
+            self.low.append(low)
+            self.high.append(high)
+        return u
+
+    def cube(self, values: Dict[int, bool]) -> int:
+        """Conjonction de littéraux {variable: valeur}"""
+        u = TRUE
+        for v in sorted(values, reverse=True):
+            u = self.node(v, FALSE, u) if values[v] else self.node(v, u, FALSE)
+        return u
+
+    def _cofactors(self, u: int, v: int) -> Tuple[int, int]:
+        if self.var[u] == v:
+            return self.low[u], self.high[u]
+        return u, u
+
+    @staticmethod
+    def _terminal(op: str, u: int, w: int) -> Optional[int]:
+        """Résultat immédiat de l'opération, ou None s'il faut descendre"""
+        if op == 'and':
+            if u == FALSE or w == FALSE:
+                return FALSE
+            if u == TRUE:
+                return w
+            if w == TRUE or u == w:
+                return u
+        elif op == 'or':
+            if u == TRUE or w == TRUE:
+                return TRUE
+            if u == FALSE:
+                return w
+            if w == FALSE or u == w:
+                return u
+        else:
+            if u == FALSE or w == TRUE or u == w:
+                return FALSE
+            if w == FALSE:
+                return u
+        return None
+
+    def _lookup(self, op: str, u: int, w: int) -> Optional[int]:
+        r = self._terminal(op, u, w)
+        if r is None:
+            r = self._cache.get((op, u, w) if op == 'diff' or u < w else (op, w, u))
+        return r
+
+    def apply(self, op: str, u: int, w: int) -> int:
+        """'and' / 'or' / 'diff' (u et non w).
+
+        Parcours postfixe à pile explicite (mémoïsé) : la profondeur n'est
+        pas limitée par la pile d'appels de Python (réseaux de milliers de places).
+        """
+        r = self._lookup(op, u, w)
+        if r is not None:
+            return r
+        var, cache = self.var, self._cache
+        stack = [(u, w)]
+        while stack:
+            x, y = stack[-1]
+            if self._lookup(op, x, y) is not None:
+                stack.pop()
+                continue
+            v = min(var[x], var[y])
+            x0, x1 = self._cofactors(x, v)
+            y0, y1 = self._cofactors(y, v)
+            lo, hi = self._lookup(op, x0, y0), self._lookup(op, x1, y1)
+            if lo is None or hi is None:
+                if lo is None:
+                    stack.append((x0, y0))
+                if hi is None:
+                    stack.append((x1, y1))
+                continue
+            stack.pop()
+            cache[(op, x, y) if op == 'diff' or x < y else (op, y, x)] = self.node(v, lo, hi)
+        return self._lookup(op, u, w)
+
+    def count(self, u: int) -> int:
+        """Nombre d'affectations satisfaisantes sur les `num_vars` variables"""
+        var, low, high = self.var, self.low, self.high
+        memo = {FALSE: 0, TRUE: 1}
+        stack = [u]
+        while stack:
+            x = stack[-1]
+            if x in memo:
+                stack.pop()
+                continue
+            lo, hi = low[x], high[x]
+            if lo not in memo or hi not in memo:
+                stack.extend(c for c in (lo, hi) if c not in memo)
+                continue
+            stack.pop()
+            v = var[x]
+            memo[x] = (memo[lo] << (var[lo] - v - 1)) + (memo[hi] << (var[hi] - v - 1))
+        return memo[u] << var[u]
+
+    def assignments(self, u: int) -> Iterator[Dict[int, bool]]:
+        """Affectations partielles (chemins vers 1) ; les variables absentes sont libres"""
+        stack = [(u, {})]
+        while stack:
+            x, values = stack.pop()
+            if x == FALSE:
+                continue
+            if x == TRUE:
+                yield values
+                continue
+            v = self.var[x]
+            stack.append((self.high[x], {**values, v: True}))
+            stack.append((self.low[x], {**values, v: False}))
+
+
+class SafeNetRelation:
+    """Relation de transition d'un réseau sauf (1-borné), franchissement symbolique par transition"""
+
+    def __init__(self, net: PackedNet, bdd: BDD, level: Dict[int, int]):
+        self.bdd = bdd
+        self.transitions = []
+        for t in range(len(net.transitions)):
+            pre = {p for p, w in net.inputs[t]}
+            if any(w != 1 for _, w in net.inputs[t]):
+                raise ValueError(f"{net.transitions[t]} : poids différent de 1 (réseau non sauf)")
+            post = set(pre)
+            for p, d in net.deltas[t]:
+                if d > 0:
+                    post.add(p)
+                else:
+                    post.discard(p)
+            if any(abs(d) != 1 or (d > 0 and p in pre) for p, d in net.deltas[t]):
+                raise ValueError(f"{net.transitions[t]} : poids différent de 1 (réseau non sauf)")
+            # action par variable : 'consume' (1 -> 0), 'produce' (0 -> 1), 'test' (1 -> 1)
+            actions = {}
+            for p in pre | post:
+                actions[level[p]] = 'test' if p in pre and p in post else ('consume' if p in pre else 'produce')
+            self.transitions.append(actions)
+        self.levels = [sorted(a) for a in self.transitions]
+        self.top = [levels[0] if levels else bdd.num_vars for levels in self.levels]
+        self.names = list(net.transitions)
+        self._cache: Dict[Tuple[int, int, int], int] = {}
+
+    def enabled(self, t: int) -> int:
+        """Ensemble des marquages où t est franchissable"""
+        return self.bdd.cube({v: True for v, a in self.transitions[t].items() if a != 'produce'})
+
+    def image(self, t: int, u: int) -> int:
+        """Successeurs par t des marquages de u (produit relationnel spécialisé à t).
+
+        Parcours postfixe à pile explicite, mémoïsé par (t, nœud, rang de la variable de t).
+        """
+        bdd = self.bdd
+        actions = self.transitions[t]
+        levels = self.levels[t]
+        cache = self._cache
+        end = len(levels)
+
+        def value(x: int, i: int) -> Optional[int]:
+            if x == FALSE or i == end:
+                return x
+            return cache.get((t, x, i))
+
+        def children(x: int, i: int) -> Tuple[Tuple[int, int], ...]:
+            v = levels[i]
+            if bdd.var[x] < v:
+                return (bdd.low[x], i), (bdd.high[x], i)
+            lo, hi = bdd._cofactors(x, v)
+            if actions[v] == 'produce':
+                return (hi, i + 1), (lo, i + 1)
+            return (hi, i + 1),
+
+        stack = [(u, 0)]
+        while stack:
+            x, i = stack[-1]
+            if value(x, i) is not None:
+                stack.pop()
+                continue
+            calls = children(x, i)
+            results = [value(*call) for call in calls]
+            if None in results:
+                stack.extend(call for call, r in zip(calls, results) if r is None)
+                continue
+            stack.pop()
+            v = levels[i]
+            if bdd.var[x] < v:
+                r = bdd.node(bdd.var[x], results[0], results[1])
+            elif actions[v] == 'consume':
+                r = bdd.node(v, results[0], FALSE)
+            elif actions[v] == 'test':
+                r = bdd.node(v, FALSE, results[0])
+            else:
+                if results[0] != FALSE:
+                    raise ValueError(f"{self.names[t]} produit un second jeton : le réseau n'est pas sauf")
+                r = bdd.node(v, FALSE, results[1])
+            cache[(t, x, i)] = r
+        return value(u, 0)
+
+
+class SymbolicStateSpace:
+    """Ensemble des marquages accessibles d'un réseau sauf, représenté par un BDD"""
+
+    def __init__(self, net: PackedNet, bdd: BDD, relation: SafeNetRelation, order: List[int],
+                 reachable: int, iterations: int):
+        self.net = net
+        self.bdd = bdd
+        self.relation = relation
+        self.order = order
+        self.reachable = reachable
+        self.iterations = iterations
+
+    def count(self) -> int:
+        return self.bdd.count(self.reachable)
+
+    def _encode(self, marking: Dict[str, int]) -> int:
+        places = self.net.places
+        return self.bdd.cube({level: bool(marking.get(places[p], 0)) for level, p in enumerate(self.order)})
+
+    def contains(self, marking: Dict[str, int]) -> bool:
+        return self.bdd.apply('and', self.reachable, self._encode(marking)) != FALSE
+
+    def deadlocks(self) -> int:
+        """BDD des marquages accessibles sans transition franchissable"""
+        bdd = self.bdd
+        live = FALSE
+        for t in range(len(self.relation.transitions)):
+            live = bdd.apply('or', live, self.relation.enabled(t))
+        return bdd.apply('diff', self.reachable, live)
+
+    def deadlock_count(self) -> int:
+        return self.bdd.count(self.deadlocks())
+
+    def markings(self, u: Optional[int] = None, limit: int = 100) -> List[Dict[str, int]]:
+        """Quelques marquages (au plus `limit`) de l'ensemble u (par défaut : les accessibles)"""
+        u = self.reachable if u is None else u
+        places = self.net.places
+        result = []
+        for values in self.bdd.assignments(u):
+            free = [level for level in range(len(self.order)) if level not in values]
+            for bits in range(1 << min(len(free), 20)):
+                full = dict(values)
+                for i, level in enumerate(free):
+                    full[level] = bool(bits >> i & 1)
+                result.append({places[p]: int(full[level]) for level, p in sorted(enumerate(self.order),
+                                                                                   key=lambda e: e[1])})
+                if len(result) >= limit:
+                    return result
+        return result
+
+
+def connectivity_order(net: PackedNet) -> List[int]:
+    """Ordre des variables : parcours en largeur des places voisines (via les transitions)"""
+    neighbours: Dict[int, set] = {p: set() for p in range(len(net.places))}
+    for inputs, delta in zip(net.inputs, net.deltas):
+        touched = {p for p, _ in inputs} | {p for p, _ in delta}
+        for p in touched:
+            neighbours[p] |= touched - {p}
+    order, seen = [], set()
+    for start in range(len(net.places)):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        while queue:
+            p = queue.pop(0)
+            order.append(p)
+            for q in sorted(neighbours[p]):
+                if q not in seen:
+                    seen.add(q)
+                    queue.append(q)
+    return order
+
+
+def symbolic_reachability(net: PackedNet, initial: Dict[str, int],
+                          order: Optional[Sequence[int]] = None) -> SymbolicStateSpace:
+    """Marquages accessibles d'un réseau sauf par point fixe symbolique.
+
+    Chaque transition est appliquée par un produit relationnel spécialisé
+    (seules ses variables sont lues et réécrites). Les transitions sont
+    regroupées par variable la plus haute de leur support et les groupes
+    sont saturés du bas vers le haut (ordre de saturation) : chaque groupe
+    est itéré jusqu'à son point fixe local avant de passer au suivant, et le
+    tout est répété jusqu'au point fixe global. `order` donne l'ordre des
+    places dans le BDD (par défaut connectivity_order).
+    """
+    order = list(order) if order is not None else connectivity_order(net)
+    level = {p: i for i, p in enumerate(order)}
+    bdd = BDD(len(order))
+    relation = SafeNetRelation(net, bdd, level)
+    for p in net.places:
+        if initial.get(p, 0) > 1:
+            raise ValueError(f"marquage initial non sauf en {p}")
+    reachable = bdd.cube({level[net.place_index[p]]: bool(initial.get(p, 0)) for p in net.places})
+
+    groups: Dict[int, List[int]] = {}
+    for t, top in enumerate(relation.top):
+        groups.setdefault(top, []).append(t)
+    schedule = [groups[top] for top in sorted(groups, reverse=True)]
+
+    iterations = 0
+    changed = True
+    while changed:
+        changed = False
+        for group in schedule:
+            while True:
+                iterations += 1
+                before = reachable
+                for t in group:
+                    reachable = bdd.apply('or', reachable, relation.image(t, reachable))
+                if reachable == before:
+                    break
+                changed = True
+    return SymbolicStateSpace(net, bdd, relation, order, reachable, iterations)
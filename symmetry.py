@@ -0,0 +1,193 @@
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+from networkx.algorithms import isomorphism
+
+from reachability import PackedNet
+
+
+def _transition_arcs(net: PackedNet, t: int) -> Tuple[Dict[int, int], Dict[int, int]]:
+    pre = dict(net.inputs[t])
+    post = dict(pre)
+    for p, d in net.deltas[t]:
+        post[p] = post.get(p, 0) + d
+    return pre, {p: w for p, w in post.items() if w > 0}
+
+
+def _is_automorphism(net: PackedNet, perm: Sequence[int]) -> bool:
+    """La permutation des places préserve-t-elle l'ensemble des transitions (pre, post) ?"""
+    signatures, images = Counter(), Counter()
+    for t in range(len(net.transitions)):
+        pre, post = _transition_arcs(net, t)
+        signatures[(tuple(sorted(pre.items())), tuple(sorted(post.items())))] += 1
+        images[(tuple(sorted((perm[p], w) for p, w in pre.items())),
+                tuple(sorted((perm[p], w) for p, w in post.items())))] += 1
+    return signatures == images
+
+
+class SymmetryGroup:
+    """Groupe de symétries des places d'un réseau, pour l'exploration par orbites.
+
+    Deux représentations :
+    - blocs interchangeables (`block_groups`) : chaque groupe est une liste de
+      composants de même forme (places correspondantes dans le même ordre) et
+      toute permutation des composants est une symétrie (groupe symétrique
+      S_N) ; la forme canonique trie les composants, en O(N log N) ;
+    - éléments explicites (`permutations`) : le groupe engendré par des
+      générateurs quelconques, énuméré ; la forme canonique est la plus
+      petite image du marquage.
+    Toutes les permutations sont vérifiées : ce doivent être des
+    automorphismes du réseau (pre et post préservés).
+    """
+
+    def __init__(self, net: PackedNet, block_groups: Sequence[Sequence[Sequence[int]]] = (),
+                 permutations: Sequence[Sequence[int]] = ()):
+        self.net = net
+        self.block_groups = [[tuple(block) for block in group] for group in block_groups if len(group) > 1]
+        self.permutations = [tuple(perm) for perm in permutations]
+        for group in self.block_groups:
+            self._check_blocks(group)
+
+    def _check_blocks(self, group: List[Tuple[int, ...]]):
+        count = len(self.net.places)
+        if len({len(block) for block in group}) != 1:
+            raise ValueError("les composants symétriques doivent avoir le même nombre de places")
+        # S_N est engendré par la transposition (0 1) et le cycle (0 1 ... N-1)
+        for shift in ((1, 0) + tuple(range(2, len(group))), tuple(range(1, len(group))) + (0,)):
+            perm = list(range(count))
+            for source, target in enumerate(shift):
+                for p, q in zip(group[source], group[target]):
+                    perm[p] = q
+            if not _is_automorphism(self.net, perm):
+                names = [[self.net.places[p] for p in block] for block in group]
+                raise ValueError(f"les composants {names} ne sont pas interchangeables")
+
+    @classmethod
+    def from_components(cls, net: PackedNet, components: Sequence[Sequence[str]]) -> "SymmetryGroup":
+        """Composants interchangeables déclarés par leurs places, dans le même ordre"""
+        return cls(net, [[[net.place_index[p] for p in component] for component in components]])
+
+    @classmethod
+    def from_generators(cls, net: PackedNet, generators: Sequence[Dict[str, str]],
+                        max_size: int = 100000) -> "SymmetryGroup":
+        """Groupe engendré par des permutations de places {place: image} (places absentes fixes)"""
+        count = len(net.places)
+        gens = []
+        for gen in generators:
+            perm = list(range(count))
+            for p, q in gen.items():
+                perm[net.place_index[p]] = net.place_index[q]
+            if sorted(perm) != list(range(count)) or not _is_automorphism(net, perm):
+                raise ValueError(f"{gen} n'est pas une symétrie du réseau")
+            gens.append(tuple(perm))
+        identity = tuple(range(count))
+        elements = {identity}
+        frontier = [identity]
+        while frontier:
+            new = []
+            for element in frontier:
+                for gen in gens:
+                    product = tuple(gen[i] for i in element)
+                    if product not in elements:
+                        elements.add(product)
+                        new.append(product)
+            if len(elements) > max_size:
+                raise ValueError(f"groupe de symétrie trop grand (> {max_size} éléments)")
+            frontier = new
+        elements.discard(identity)
+        return cls(net, permutations=sorted(elements))
+
+    @classmethod
+    def detect(cls, net: PackedNet, shared: Optional[Sequence[str]] = None) -> "SymmetryGroup":
+        """Détecte les composants isomorphes du réseau (permutables entre eux).
+
+        Les places partagées (`shared`, par défaut celles reliées à plus de
+        deux fois le nombre médian de transitions, comme un mutex) restent
+        fixes : les composants sont les parties connexes du reste du réseau,
+        comparées avec leurs arcs vers les places partagées.
+        """
+        graph = nx.DiGraph()
+        for t in range(len(net.transitions)):
+            pre, post = _transition_arcs(net, t)
+            for p, w in pre.items():
+                graph.add_edge(('p', p), ('t', t), weight=w)
+            for p, w in post.items():
+                graph.add_edge(('t', t), ('p', p), weight=w)
+        if shared is None:
+            degrees = sorted(graph.degree(n) for n in graph if n[0] == 'p')
+            median = degrees[len(degrees) // 2] if degrees else 0
+            hubs = {n for n in graph if n[0] == 'p' and graph.degree(n) > 2 * median}
+        else:
+            hubs = {('p', net.place_index[p]) for p in shared}
+        for n in graph:
+            graph.nodes[n]['kind'] = n if n in hubs else n[0]
+
+        classes = defaultdict(list)
+        for nodes in nx.weakly_connected_components(graph.subgraph(set(graph) - hubs)):
+            attached = {h for n in nodes for h in nx.all_neighbors(graph, n) if h in hubs}
+            sub = graph.subgraph(nodes | attached)
+            invariant = (sorted((repr(d['kind']), sub.in_degree(n), sub.out_degree(n))
+                                for n, d in sub.nodes(data=True)),
+                         sorted(w for _, _, w in sub.edges(data='weight')))
+            classes[repr(invariant)].append(sub)
+
+        node_match = isomorphism.categorical_node_match('kind', None)
+        edge_match = isomorphism.numerical_edge_match('weight', 1)
+        block_groups = []
+        for candidates in classes.values():
+            while len(candidates) > 1:
+                reference, rest = candidates[0], candidates[1:]
+                order = sorted(n for n in reference if n[0] == 'p' and n not in hubs)
+                group, unmatched = [[p for _, p in order]], []
+                for other in rest:
+                    matcher = isomorphism.DiGraphMatcher(reference, other, node_match, edge_match)
+                    if matcher.is_isomorphic():
+                        group.append([matcher.mapping[n][1] for n in order])
+                    else:
+                        unmatched.append(other)
+                if len(group) > 1 and group[0]:
+                    block_groups.append(group)
+                candidates = unmatched
+        return cls(net, block_groups)
+
+    def __bool__(self):
+        return bool(self.block_groups or self.permutations)
+
+    def order(self) -> int:
+        """Nombre d'éléments du groupe"""
+        size = len(self.permutations) + 1
+        for group in self.block_groups:
+            for k in range(2, len(group) + 1):
+                size *= k
+        return size
+
+    def fixes(self, places: Sequence[int]) -> bool:
+        """Chaque place de `places` est-elle laissée en place par tout élément du groupe ?"""
+        places = set(places)
+        for group in self.block_groups:
+            if any(p in places for block in group for p in block):
+                return False
+        return all(perm[p] == p for perm in self.permutations for p in places)
+
+    def canonical(self, key: bytes) -> bytes:
+        """Représentant canonique de l'orbite du marquage `key`"""
+        net = self.net
+        m = net.unpack(key)
+        for group in self.block_groups:
+            values = sorted(tuple(m[p] for p in block) for block in group)
+            for block, vals in zip(group, values):
+                for p, v in zip(block, vals):
+                    m[p] = v
+        if not self.permutations:
+            return m.tobytes()
+        best = values = tuple(m)
+        for perm in self.permutations:
+            image = [0] * len(values)
+            for p, q in enumerate(perm):
+                image[q] = values[p]
+            image = tuple(image)
+            if image < best:
+                best = image
+        return array(net.typecode, best).tobytes()
@@ -0,0 +1,99 @@
+"""Réseaux de test partagés par les modules de tests"""
+import random
+from collections import deque
+from typing import Dict, List, Tuple
+
+from reachability import PackedNet
+
+
+def philosophers(n: int) -> Tuple[PackedNet, Dict[str, int]]:
+    """Dîner des philosophes (réseau sauf) : penser -> manger en prenant les deux fourchettes"""
+    places, transitions, pre, post = [], [], {}, {}
+    for i in range(n):
+        places += [f'think{i}', f'eat{i}', f'fork{i}']
+    for i in range(n):
+        left, right = f'fork{i}', f'fork{(i + 1) % n}'
+        transitions += [f'take{i}', f'release{i}']
+        pre[f'take{i}'] = {f'think{i}': 1, left: 1, right: 1}
+        post[f'take{i}'] = {f'eat{i}': 1}
+        pre[f'release{i}'] = {f'eat{i}': 1}
+        post[f'release{i}'] = {f'think{i}': 1, left: 1, right: 1}
+    initial = {f'think{i}': 1 for i in range(n)}
+    initial.update({f'fork{i}': 1 for i in range(n)})
+    return PackedNet(places, transitions, pre, post), initial
+
+
+def greedy_philosophers(n: int) -> Tuple[PackedNet, Dict[str, int]]:
+    """Philosophes qui prennent la fourchette gauche puis la droite : blocage possible"""
+    places, transitions, pre, post = [], [], {}, {}
+    for i in range(n):
+        places += [f'think{i}', f'hold{i}', f'eat{i}', f'fork{i}']
+    for i in range(n):
+        left, right = f'fork{i}', f'fork{(i + 1) % n}'
+        transitions += [f'left{i}', f'right{i}', f'release{i}']
+        pre[f'left{i}'], post[f'left{i}'] = {f'think{i}': 1, left: 1}, {f'hold{i}': 1}
+        pre[f'right{i}'], post[f'right{i}'] = {f'hold{i}': 1, right: 1}, {f'eat{i}': 1}
+        pre[f'release{i}'], post[f'release{i}'] = {f'eat{i}': 1}, {f'think{i}': 1, left: 1, right: 1}
+    initial = {f'think{i}': 1 for i in range(n)}
+    initial.update({f'fork{i}': 1 for i in range(n)})
+    return PackedNet(places, transitions, pre, post), initial
+
+
+def cycles(n: int, idle: int = 0) -> Tuple[PackedNet, Dict[str, int]]:
+    """n cycles indépendants a_i <-> b_i (2**n marquages), précédés de `idle` places marquées isolées"""
+    places = [f'idle{i}' for i in range(idle)] + [f'{c}{i}' for i in range(n) for c in 'ab']
+    transitions, pre, post = [], {}, {}
+    for i in range(n):
+        transitions += [f'ab{i}', f'ba{i}']
+        pre[f'ab{i}'], post[f'ab{i}'] = {f'a{i}': 1}, {f'b{i}': 1}
+        pre[f'ba{i}'], post[f'ba{i}'] = {f'b{i}': 1}, {f'a{i}': 1}
+    initial = {f'idle{i}': 1 for i in range(idle)}
+    initial.update({f'a{i}': 1 for i in range(n)})
+    return PackedNet(places, transitions, pre, post), initial
+
+
+def producer_consumer(typecode: str = 'H', net_class=PackedNet) -> Tuple[PackedNet, Dict[str, int]]:
+    """Réseau non borné : le tampon `buffer` croît sans limite"""
+    places = ['ready', 'buffer', 'idle', 'busy']
+    transitions = ['produce', 'consume', 'done']
+    pre = {'produce': {'ready': 1}, 'consume': {'buffer': 1, 'idle': 1}, 'done': {'busy': 1}}
+    post = {'produce': {'ready': 1, 'buffer': 1}, 'consume': {'busy': 1}, 'done': {'idle': 1}}
+    return net_class(places, transitions, pre, post, typecode), {'ready': 1, 'idle': 1}
+
+
+def random_pre_post(rng: random.Random, max_places: int = 5, max_transitions: int = 5, max_weight: int = 2):
+    """Places, transitions, pre, post et marquage initial d'un petit réseau aléatoire"""
+    places = [f'p{i}' for i in range(rng.randint(1, max_places))]
+    transitions = [f't{i}' for i in range(rng.randint(1, max_transitions))]
+
+    def arcs():
+        chosen = rng.sample(places, rng.randint(0, min(2, len(places))))
+        return {p: rng.randint(1, max_weight) for p in chosen}
+
+    pre = {t: arcs() for t in transitions}
+    post = {t: arcs() for t in transitions}
+    initial = {p: rng.randint(0, 2) for p in places}
+    return places, transitions, pre, post, initial
+
+
+def random_net(rng: random.Random, max_places: int = 5, max_transitions: int = 5,
+               max_weight: int = 2) -> Tuple[PackedNet, Dict[str, int]]:
+    """Petit réseau aléatoire (souvent non borné) et marquage initial aléatoire"""
+    places, transitions, pre, post, initial = random_pre_post(rng, max_places, max_transitions, max_weight)
+    return PackedNet(places, transitions, pre, post), initial
+
+
+def naive_bfs(net: PackedNet, initial: Dict[str, int]) -> Tuple[List[bytes], List[Tuple[int, int, int]]]:
+    """Référence : parcours en largeur direct, sans stockage par paquets"""
+    start = net.pack(initial)
+    index, states, edges = {start: 0}, [start], []
+    queue = deque([start])
+    while queue:
+        key = queue.popleft()
+        for t, succ in net.successors(key):
+            if succ not in index:
+                index[succ] = len(states)
+                states.append(succ)
+                queue.append(succ)
+            edges.append((index[key], index[succ], t))
+    return states, edges
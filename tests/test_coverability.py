@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import pytest
+
+from coverability import _covers, backward_coverability, karp_miller, minimal_coverability_set, omega_marking
+from nets import naive_bfs, philosophers, producer_consumer, random_net
+
+SEEDS = range(150)
+
+
+def maximal(markings):
+    markings = set(markings)
+    return {m for m in markings if not any(o != m and _covers(o, m) for o in markings)}
+
+
+def fire_sequence(net, initial, names):
+    """Marquage atteint par la séquence `names`, en vérifiant que chaque transition est franchissable"""
+    m = net.unpack(net.pack(initial))
+    for name in names:
+        t = net.transition_index[name]
+        assert net.is_enabled(m, t), name
+        m = net.fire(m, t)
+    return tuple(m)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_minimal_coverability_set_is_the_karp_miller_antichain(seed):
+    net, initial = random_net(random.Random(seed))
+    start = omega_marking(net, initial)
+    tree = karp_miller(net, start)
+    mcs = minimal_coverability_set(net, start)
+    assert set(mcs.markings) == maximal(tree.markings)
+    assert sorted(tree.unbounded_places()) == sorted(mcs.unbounded_places())
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_backward_coverability_agrees_with_karp_miller(seed):
+    net, initial = random_net(random.Random(seed))
+    start = omega_marking(net, initial)
+    tree = karp_miller(net, start)
+    for target in itertools.product(range(3), repeat=min(len(net.places), 3)):
+        target = target + (0,) * (len(net.places) - len(target))
+        witness = backward_coverability(net, start, target)
+        assert (witness is not None) == any(_covers(m, target) for m in tree.markings)
+        if witness is not None:
+            assert _covers(fire_sequence(net, initial, witness), target)
+
+
+@pytest.mark.parametrize('n', [2, 3, 4])
+def test_karp_miller_on_bounded_nets_is_the_reachability_graph(n):
+    net, initial = philosophers(n)
+    states, edges = naive_bfs(net, initial)
+    tree = karp_miller(net, omega_marking(net, initial))
+    assert tree.is_bounded()
+    assert set(tree.markings) == {tuple(net.unpack(key)) for key in states}
+    assert len(tree.edge_list) == len(edges)
+
+
+def test_unbounded_buffer():
+    net, initial = producer_consumer()
+    start = omega_marking(net, initial)
+    for build in (karp_miller, minimal_coverability_set):
+        assert build(net, start).unbounded_places() == ['buffer']
+    target = omega_marking(net, {'buffer': 5, 'busy': 1})
+    assert _covers(fire_sequence(net, initial, backward_coverability(net, start, target)), target)
+    # idle et busy s'excluent (P-semiflot idle + busy = 1)
+    assert backward_coverability(net, start, omega_marking(net, {'busy': 1, 'idle': 1})) is None
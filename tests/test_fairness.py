@@ -0,0 +1,135 @@
+import itertools
+import random
+
+import pytest
+
+from fairness import starvation
+from reachgraph import ReachabilityGraph
+
+LABELS = ['a', 'b', 'c']
+
+
+def graph_of(n, edges):
+    return ReachabilityGraph.from_edges(n, [s for s, _, _ in edges], [d for _, d, _ in edges],
+                                        [t for _, _, t in edges], LABELS)
+
+
+def enabled_in(edges, state):
+    return {t for s, _, t in edges if s == state}
+
+
+def reachable(n, edges):
+    seen, stack = {0}, [0]
+    while stack:
+        s = stack.pop()
+        for x, d, _ in edges:
+            if x == s and d not in seen:
+                seen.add(d)
+                stack.append(d)
+    return seen
+
+
+def strongly_connected(states, edges):
+    for start in states:
+        seen, stack = {start}, [start]
+        while stack:
+            s = stack.pop()
+            for x, d, _ in edges:
+                if x == s and d not in seen:
+                    seen.add(d)
+                    stack.append(d)
+        if seen != states:
+            return False
+    return True
+
+
+def fair(states, edges, fired, fairness):
+    for u in range(len(LABELS)):
+        if u in fired:
+            continue
+        if fairness == 'weak' and all(u in enabled_in(edges, s) for s in states):
+            return False
+        if fairness == 'strong' and any(u in enabled_in(edges, s) for s in states):
+            return False
+    return True
+
+
+def brute_force(n, edges, t, fairness):
+    """Un ensemble d'états fortement connexe, accessible, dont les arcs internes évitent t et sont équitables"""
+    for size in range(1, n + 1):
+        for states in itertools.combinations(range(n), size):
+            states = set(states)
+            inner = [(s, d, u) for s, d, u in edges if s in states and d in states and u != t]
+            if inner and strongly_connected(states, inner) and fair(states, edges, {u for _, _, u in inner},
+                                                                    fairness):
+                return True
+    return False
+
+
+def check_lasso(edges, t, fairness, lasso):
+    arcs = set(edges)
+    path = lasso.stem_states
+    assert path[0] == 0
+    for s, d, name in zip(path, path[1:], lasso.stem):
+        assert (s, d, LABELS.index(name)) in arcs
+    cycle = [path[-1]] + lasso.cycle_states
+    assert lasso.cycle and cycle[0] == cycle[-1]
+    for s, d, name in zip(cycle, cycle[1:], lasso.cycle):
+        assert (s, d, LABELS.index(name)) in arcs and name != LABELS[t]
+    assert fair(set(cycle), edges, {LABELS.index(name) for name in lasso.cycle}, fairness)
+
+
+def random_graphs(count, seed=5):
+    """Graphes étiquetés aléatoires dont tous les états sont accessibles depuis 0"""
+    rng = random.Random(seed)
+    while count:
+        n = rng.randint(1, 6)
+        edges = sorted({(rng.randrange(n), rng.randrange(n), rng.randrange(len(LABELS)))
+                        for _ in range(rng.randint(0, 12))})
+        if len(reachable(n, edges)) == n:
+            count -= 1
+            yield n, edges
+
+
+@pytest.mark.parametrize('n, edges', list(random_graphs(300)))
+def test_starvation_matches_brute_force(n, edges):
+    graph = graph_of(n, edges)
+    for t in range(len(LABELS)):
+        for fairness in (None, 'weak', 'strong'):
+            lasso = starvation(graph, LABELS[t], fairness)
+            assert (lasso is not None) == brute_force(n, edges, t, fairness)
+            if lasso is not None:
+                check_lasso(edges, t, fairness, lasso)
+
+
+def test_weak_fairness_excludes_continuously_enabled_starvation():
+    # a et b bouclent sur l'unique état : b^ω affame a, qui reste franchissable
+    edges = [(0, 0, 0), (0, 0, 1)]
+    graph = graph_of(1, edges)
+    lasso = starvation(graph, 'a')
+    assert lasso.cycle == ['b'] and lasso.stem == []
+    assert starvation(graph, 'a', 'weak') is None
+    assert starvation(graph, 'a', 'strong') is None
+
+
+def test_strong_fairness_excludes_intermittently_enabled_starvation():
+    # a n'est franchissable qu'un état sur deux le long du cycle b
+    edges = [(0, 1, 1), (1, 0, 1), (0, 0, 0)]
+    graph = graph_of(2, edges)
+    lasso = starvation(graph, 'a', 'weak')
+    assert sorted(lasso.cycle) == ['b', 'b']
+    check_lasso(edges, 0, 'weak', lasso)
+    assert starvation(graph, 'a', 'strong') is None
+
+
+def test_lasso_stem_reaches_the_fair_cycle():
+    # 0 -c-> 1, puis boucle b en 1 ; a n'est franchissable qu'en 0
+    edges = [(0, 1, 2), (1, 1, 1), (0, 0, 0)]
+    lasso = starvation(graph_of(2, edges), 'a', 'strong')
+    assert lasso.stem == ['c'] and lasso.stem_states == [0, 1]
+    assert lasso.cycle == ['b'] and lasso.cycle_states == [1]
+
+
+def test_unknown_fairness():
+    with pytest.raises(ValueError):
+        starvation(graph_of(1, [(0, 0, 0)]), 'a', 'fair')
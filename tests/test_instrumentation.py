@@ -0,0 +1,91 @@
+import io
+import json
+
+import pytest
+
+from coverability import karp_miller, minimal_coverability_set, omega_marking
+from instrumentation import CallbackMonitor, ExplorationStats, JsonLinesReporter, Monitor
+from nets import greedy_philosophers, producer_consumer
+from reachability import explore
+
+FIELDS = {'event', 'engine', 'elapsed', 'states', 'edges', 'expanded', 'frontier', 'duplicates',
+          'duplicate_ratio', 'states_per_second', 'batches', 'state_bytes'}
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_json_lines_reporter_on_explore(tmp_path):
+    net, initial = greedy_philosophers(4)
+    path = tmp_path / 'exploration.jsonl'
+    space = explore(net, net.pack(initial), batch_size=8, monitor=JsonLinesReporter(str(path), interval=0.0))
+    records = read_lines(path)
+    assert [r['event'] for r in records] == ['start'] + ['progress'] * (len(records) - 2) + ['finish']
+    for record in records:
+        assert FIELDS <= set(record)
+        assert record['engine'] == 'explore'
+        assert record['state_bytes'] == record['states'] * len(net.pack(initial))
+        assert 0.0 <= record['duplicate_ratio'] <= 1.0
+    start, finish = records[0], records[-1]
+    assert start['states'] == 1 and start['expanded'] == 0 and start['frontier'] == 1
+    assert finish['states'] == len(space) and finish['edges'] == len(space.edge_src)
+    assert finish['expanded'] == len(space) and finish['frontier'] == 0
+    assert finish['duplicates'] == len(space.edge_src) - (len(space) - 1)
+    # Un paquet ne dépasse pas 8 états, moins quand la frontière est plus petite
+    assert finish['batches'] == len(records) - 2 >= -(-len(space) // 8)
+    # Compteurs croissants d'une ligne à l'autre
+    for before, after in zip(records, records[1:]):
+        assert after['states'] >= before['states'] and after['expanded'] >= before['expanded']
+
+
+def test_json_lines_reporter_appends_and_keeps_open_streams(tmp_path):
+    net, initial = greedy_philosophers(2)
+    path = tmp_path / 'exploration.jsonl'
+    for _ in range(2):
+        explore(net, net.pack(initial), monitor=JsonLinesReporter(str(path), interval=3600.0))
+    # Avec un long intervalle, seule la première progression est transmise
+    assert [r['event'] for r in read_lines(path)] == ['start', 'progress', 'finish'] * 2
+    stream = io.StringIO()
+    explore(net, net.pack(initial), monitor=JsonLinesReporter(stream, interval=0.0))
+    assert not stream.closed
+    assert json.loads(stream.getvalue().splitlines()[-1])['event'] == 'finish'
+
+
+def test_callback_monitor_on_explore():
+    net, initial = greedy_philosophers(3)
+    progress, finished = [], []
+    monitor = CallbackMonitor(lambda stats: progress.append(stats.snapshot()),
+                              lambda stats: finished.append(stats), interval=0.0)
+    space = explore(net, net.pack(initial), batch_size=4, monitor=monitor)
+    assert len(finished) == 1 and isinstance(finished[0], ExplorationStats)
+    assert finished[0].states == len(space) and finished[0].frontier == 0
+    assert [p['batches'] for p in progress] == list(range(1, len(progress) + 1))
+    assert progress[-1]['states'] == len(space)
+    # Sans on_finish, la fin est simplement ignorée
+    explore(net, net.pack(initial), monitor=CallbackMonitor(interval=0.0))
+
+
+@pytest.mark.parametrize('build', [karp_miller, minimal_coverability_set])
+def test_monitor_on_coverability(build, tmp_path):
+    net, initial = producer_consumer()
+    path = tmp_path / 'couverture.jsonl'
+    graph = build(net, omega_marking(net, initial), JsonLinesReporter(str(path), interval=0.0))
+    records = read_lines(path)
+    assert records[0]['event'] == 'start' and records[-1]['event'] == 'finish'
+    assert {r['engine'] for r in records} == {build.__name__}
+    assert records[-1]['states'] == len(graph)
+
+
+def test_monitor_throttles_progress(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr('instrumentation.time.monotonic', lambda: clock[0])
+    seen = []
+    monitor = CallbackMonitor(lambda stats: seen.append(clock[0]), interval=1.0)
+    stats = ExplorationStats('test')
+    for t in (0.0, 0.5, 0.99, 1.0, 1.5, 2.2, 2.3):
+        clock[0] = t
+        monitor.tick(stats)
+    assert seen == [0.0, 1.0, 2.2]
+    assert Monitor().finish(stats) is None
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from montecarlo import BatchSimulator
+from simulation import PetriNet
+
+
+def choice_net(branches: int = 2) -> PetriNet:
+    """Un jeton en `start`, consommé par l'une des `branches` transitions en conflit"""
+    transitions = [f'go{i}' for i in range(branches)]
+    places = ['start'] + [f'end{i}' for i in range(branches)]
+    pre = {t: {'start': 1} for t in transitions}
+    post = {f'go{i}': {f'end{i}': 1} for i in range(branches)}
+    return PetriNet.from_pre_post(places, transitions, pre, post, {'start': 1})
+
+
+def ring_net() -> PetriNet:
+    """Deux jetons qui tournent sur un anneau de trois places : jamais bloqué"""
+    places, transitions = ['a', 'b', 'c'], ['ab', 'bc', 'ca']
+    pre = {'ab': {'a': 1}, 'bc': {'b': 1}, 'ca': {'c': 1}}
+    post = {'ab': {'b': 1}, 'bc': {'c': 1}, 'ca': {'a': 1}}
+    return PetriNet.from_pre_post(places, transitions, pre, post, {'a': 2})
+
+
+def test_seeded_runs_are_reproducible():
+    first = BatchSimulator(ring_net(), seed=42).run(500, 30, record_traces=True)
+    second = BatchSimulator(ring_net(), seed=42).run(500, 30, record_traces=True)
+    other = BatchSimulator(ring_net(), seed=43).run(500, 30, record_traces=True)
+    assert np.array_equal(first.traces, second.traces)
+    assert np.array_equal(first.final_markings, second.final_markings)
+    assert not np.array_equal(first.traces, other.traces)
+
+
+@pytest.mark.parametrize('branches', [2, 3])
+def test_conflicts_are_resolved_uniformly(branches):
+    runs = 30000
+    result = BatchSimulator(choice_net(branches), seed=1).run(runs, 5)
+    means = result.mean_final_marking()
+    # Écart type de la proportion : sqrt(p(1-p)/runs) < 0.003 ; tolérance de 5 écarts types
+    for i in range(branches):
+        assert means[f'end{i}'] == pytest.approx(1 / branches, abs=0.015)
+    assert means['start'] == 0
+
+
+def test_deadlocked_runs_stop():
+    result = BatchSimulator(choice_net(), seed=0).run(1000, 50, record_traces=True)
+    assert result.deadlock_probability() == 1.0
+    assert (result.steps_taken == 1).all()
+    assert (result.traces[:, 1:] == -1).all()
+    assert all(len(result.trace(run)) == 1 for run in range(10))
+
+
+def test_live_runs_use_every_step():
+    result = BatchSimulator(ring_net(), seed=0).run(200, 40, chunk_size=64)
+    assert result.deadlock_probability() == 0.0
+    assert (result.steps_taken == 40).all()
+    assert (result.final_markings.sum(axis=1) == 2).all()
+
+
+def test_target_hit_step():
+    result = BatchSimulator(choice_net(), seed=3).run(4000, 5, target={'end0': 1})
+    assert result.hit_probability() == pytest.approx(0.5, abs=0.04)
+    assert set(np.unique(result.hit_step)) == {-1, 1}
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from nets import cycles, greedy_philosophers, philosophers, producer_consumer
+from parallel import explore_parallel
+from reachability import PackedNet, explore
+
+
+def labelled_edges(space):
+    states = space.states
+    return sorted((states[s], states[d], t) for s, d, t in zip(space.edge_src, space.edge_dst,
+                                                                space.edge_transition))
+
+
+@pytest.mark.parametrize('net, initial', [philosophers(5), greedy_philosophers(4), cycles(6)])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_parallel_matches_sequential(net, initial, workers):
+    sequential = explore(net, net.pack(initial))
+    parallel = explore_parallel(net, net.pack(initial), workers=workers, batch_size=16)
+    assert len(parallel) == len(sequential)
+    assert parallel.states[0] == net.pack(initial)
+    assert set(parallel.states) == set(sequential.states)
+    assert labelled_edges(parallel) == labelled_edges(sequential)
+
+
+class VanishingNet(PackedNet):
+    """Réseau dont le développement tue le processus sans message (comme un arrêt par le système)"""
+
+    def successors(self, key):
+        os._exit(3)
+
+
+def test_worker_error_is_raised():
+    # Tampon non borné codé sur un octet : OverflowError dans un processus
+    net, initial = producer_consumer(typecode='B')
+    with pytest.raises(RuntimeError, match="OverflowError"):
+        explore_parallel(net, net.pack(initial), workers=2, poll=0.1)
+
+
+def test_vanished_worker_is_detected():
+    net, initial = producer_consumer(net_class=VanishingNet)
+    with pytest.raises(RuntimeError, match="code de sortie 3"):
+        explore_parallel(net, net.pack(initial), workers=2, poll=0.1)
@@ -0,0 +1,112 @@
+import random
+
+import numpy as np
+import pytest
+
+from nets import random_pre_post
+from simulation import PetriNet
+
+
+def small_net() -> PetriNet:
+    net = PetriNet(headless=True)
+    net.add_place('p', 1)
+    net.add_place('q')
+    net.add_transition('t')
+    net.load_arcs([('p', 't', 1)], [('t', 'q', 2)])
+    return net
+
+
+def test_arc_views_are_read_only():
+    net = small_net()
+    assert net.input_arcs == {('p', 't'): 1}
+    assert net.output_arcs == {('t', 'q'): 2}
+    with pytest.raises(TypeError):
+        net.input_arcs[('q', 't')] = 1
+    with pytest.raises(TypeError):
+        net.output_arcs[('t', 'p')] = 1
+
+
+def test_arc_views_are_cached_until_arcs_change():
+    net = small_net()
+    view = net.input_arcs
+    assert net.input_arcs is view and net.output_arcs is net.output_arcs
+    net.add_place('r')
+    net.add_transition('u')
+    assert net.input_arcs is view
+    net.add_input_arc('q', 'u', 2)
+    assert net.input_arcs == {('p', 't'): 1, ('q', 'u'): 2}
+    # Remplacement du poids d'un arc existant
+    net.add_input_arc('q', 'u', 3)
+    assert net.input_arcs[('q', 'u')] == 3
+    output = net.output_arcs
+    net.add_output_arc('u', 'r')
+    assert net.output_arcs == {('t', 'q'): 2, ('u', 'r'): 1}
+    net.load_arcs([('r', 't', 1)], [('u', 'p', 4)])
+    assert net.input_arcs[('r', 't')] == 1 and net.output_arcs[('u', 'p')] == 4
+    # Une vue déjà obtenue reste une photographie de l'état d'alors
+    assert view == {('p', 't'): 1} and output == {('t', 'q'): 2}
+    # Chargement direct dans l'ArcStore (instantanés) : la vue suit aussi
+    net.arcs.load_input_arcs([net.arcs.place_index['p']], [net.arcs.transition_index['u']], [5])
+    assert net.input_arcs[('p', 'u')] == 5
+
+
+def test_load_arcs_rejects_duplicates():
+    net = small_net()
+    with pytest.raises(ValueError, match="p -> t"):
+        net.load_arcs([('p', 't', 3)])
+    with pytest.raises(ValueError, match="t -> p"):
+        net.load_arcs(output_arcs=[('t', 'p', 1), ('t', 'p', 1)])
+    # Rien n'est chargé quand le paquet est refusé
+    assert net.output_arcs == {('t', 'q'): 2}
+
+
+def random_petri_net(seed: int) -> PetriNet:
+    rng = random.Random(seed)
+    return PetriNet.from_pre_post(*random_pre_post(rng, max_places=6, max_transitions=6, max_weight=3))
+
+
+@pytest.mark.parametrize('seed', range(100))
+def test_compiled_net_matches_dict_net(seed):
+    net = random_petri_net(seed)
+    compiled = net.compile()
+    rng = random.Random(seed)
+    for _ in range(40):
+        expected = [net.is_transition_enabled(t) for t in compiled.transition_ids]
+        assert compiled.enabled_mask().tolist() == expected
+        assert compiled.enabled_transitions() == [t for t, e in zip(compiled.transition_ids, expected) if e]
+        # Transitions franchissables ou non : les deux représentations doivent refuser les mêmes
+        t = rng.randrange(len(compiled.transition_ids))
+        assert compiled.fire(t) == net.fire_transition(compiled.transition_ids[t])
+        assert compiled.places == net.places
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_write_back_updates_the_source_net(seed):
+    net, reference = random_petri_net(seed), random_petri_net(seed)
+    compiled = net.compile()
+    initial = dict(net.places)
+    rng = random.Random(seed)
+    for _ in range(20):
+        enabled = np.flatnonzero(compiled.enabled_mask())
+        if not len(enabled):
+            break
+        t = int(rng.choice(enabled))
+        assert compiled.fire_transition(compiled.transition_ids[t])
+        assert reference.fire_transition(compiled.transition_ids[t])
+    # Le réseau source n'est modifié qu'à la recopie
+    assert net.places == initial
+    compiled.write_back()
+    assert net.places == reference.places
+
+
+def test_compiled_incidence_of_a_self_loop():
+    net = small_net()
+    net.add_transition('loop')
+    net.load_arcs([('q', 'loop', 2)], [('loop', 'q', 2)])
+    compiled = net.compile()
+    loop = compiled.transition_index['loop']
+    assert not compiled.incidence[loop].any()
+    assert compiled.enabled_transitions() == ['t']
+    assert compiled.fire_transition('t') and compiled.places == {'p': 0, 'q': 2}
+    assert compiled.enabled_transitions() == ['loop']
+    assert compiled.fire(loop) and compiled.places == {'p': 0, 'q': 2}
@@ -0,0 +1,86 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import pnml
+from pnml import read_pnml, write_pnml
+from simulation import PetriNet
+
+HEADER = '<pnml xmlns="http://www.pnml.org/version-2009/grammar/pnml"><net id="n"><page id="g">'
+FOOTER = '</page></net></pnml>'
+
+
+def write(tmp_path, body: str) -> str:
+    path = tmp_path / 'net.pnml'
+    path.write_text(HEADER + body + FOOTER, encoding='utf-8')
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    net = PetriNet.from_pre_post(['a', 'b'], ['t', 'u'], {'t': {'a': 1}, 'u': {'b': 2}},
+                                 {'t': {'b': 2}, 'u': {'a': 1}}, {'a': 3})
+    path = str(tmp_path / 'net.pnml')
+    write_pnml(net, path)
+    loaded = read_pnml(path)
+    assert loaded.places == {'a': 3, 'b': 0}
+    assert loaded.input_arcs == net.input_arcs
+    assert loaded.output_arcs == net.output_arcs
+
+
+def test_every_element_is_released(tmp_path, monkeypatch):
+    graphics = '<graphics><position x="1" y="2"/><dimension x="3" y="4"/></graphics>'
+    tool = '<toolspecific tool="t" version="1"><data><deep><deeper/></deep></data></toolspecific>'
+    path = str(tmp_path / 'net.pnml')
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write(f'<pnml xmlns="{pnml.PNML_NS}">{tool}<net id="n" type="{pnml.PTNET_TYPE}">'
+                  f'<name><text>réseau</text></name>{tool}<page id="g">{graphics}')
+        for i in range(50):
+            out.write(f'<place id="p{i}"><name><text>p{i}</text>{graphics}</name>{graphics}{tool}'
+                      f'<initialMarking><text>{i % 3}</text></initialMarking></place>'
+                      f'<transition id="t{i}">{graphics}</transition>{tool}'
+                      f'<arc id="a{i}" source="p{i}" target="t{i}">{graphics}'
+                      f'<inscription><text>2</text></inscription></arc>')
+        out.write(f'</page>{tool}</net></pnml>')
+    parse = ET.iterparse
+    # Éléments hors de toute place, transition ou arc (ces nœuds compris) : à libérer à leur fin
+    owned, tags = [], []
+
+    def recording_iterparse(source, events):
+        for event, element in parse(source, events):
+            if event == 'start':
+                tags.append(pnml._local(element.tag))
+            yield event, element
+            if event == 'end':
+                tags.pop()
+                if not {'place', 'transition', 'arc'} & set(tags):
+                    owned.append(element)
+
+    monkeypatch.setattr(pnml.ET, 'iterparse', recording_iterparse)
+    net = read_pnml(path, batch_size=7)
+    assert net.places == {f'p{i}': i % 3 for i in range(50)}
+    assert net.input_arcs == {(f'p{i}', f't{i}'): 2 for i in range(50)}
+    assert {pnml._local(e.tag) for e in owned} >= {'pnml', 'net', 'name', 'page', 'graphics', 'toolspecific',
+                                                  'place', 'transition', 'arc'}
+    assert all(len(e) == 0 and not e.attrib for e in owned)
+
+
+def test_arcs_before_their_nodes(tmp_path):
+    path = write(tmp_path, '<arc id="x" source="p" target="t"/>'
+                           '<arc id="y" source="t" target="q"><inscription><text>2</text></inscription></arc>'
+                           '<place id="p"/><transition id="t"/><place id="q"/>')
+    net = read_pnml(path, batch_size=1)
+    assert net.input_arcs == {('p', 't'): 1}
+    assert net.output_arcs == {('t', 'q'): 2}
+
+
+def test_duplicate_arcs_are_rejected(tmp_path):
+    path = write(tmp_path, '<place id="p"/><transition id="t"/>'
+                           '<arc id="x" source="p" target="t"/><arc id="y" source="p" target="t"/>')
+    with pytest.raises(ValueError, match="en double"):
+        read_pnml(path)
+
+
+def test_unknown_endpoint(tmp_path):
+    path = write(tmp_path, '<place id="p"/><arc id="x" source="p" target="t"/>')
+    with pytest.raises(ValueError, match="extrémité inconnue"):
+        read_pnml(path)
@@ -0,0 +1,271 @@
+import os
+import random
+
+import pytest
+
+from instrumentation import Monitor
+from nets import cycles, greedy_philosophers, naive_bfs, philosophers
+from properties import Deadlock, Invariant, PlaceBound, Property
+from reachability import StubbornSets, explore, resume_exploration, visible_transitions
+from statestore import DiskStateStore, MemoryStateStore
+from symmetry import SymmetryGroup
+
+NETS = [philosophers(3), philosophers(5), greedy_philosophers(3), greedy_philosophers(4), cycles(4)]
+
+
+@pytest.fixture(params=['memory', 'disk'])
+def new_store(request, tmp_path):
+    """Fabrique de stockages vides ; sur disque, la table part de 16 cases et doit grandir"""
+    stores = []
+
+    def make():
+        if request.param == 'memory':
+            store = MemoryStateStore()
+        else:
+            store = DiskStateStore(str(tmp_path / f'store{len(stores)}'), initial_capacity=16)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def deadlock_keys(states, edges):
+    has_successor = {s for s, _, _ in edges}
+    return {key for i, key in enumerate(states) if i not in has_successor}
+
+
+def rotation(n: int, kinds):
+    """Rotation des philosophes d'un cran : symétrie du réseau en anneau"""
+    return {f'{kind}{i}': f'{kind}{(i + 1) % n}' for kind in kinds for i in range(n)}
+
+
+@pytest.mark.parametrize('net, initial', NETS)
+@pytest.mark.parametrize('batch_size', [1, 7, 4096])
+def test_explore_matches_naive_bfs(net, initial, batch_size, new_store):
+    states, edges = naive_bfs(net, initial)
+    space = explore(net, net.pack(initial), store=new_store(), batch_size=batch_size)
+    # Même numérotation (ordre de découverte en largeur) et mêmes arcs
+    assert list(space.states) == states
+    assert sorted(zip(space.edge_src, space.edge_dst, space.edge_transition)) == sorted(edges)
+
+
+@pytest.mark.parametrize('net, initial', NETS)
+def test_parents_give_shortest_traces(net, initial, new_store):
+    states, edges = naive_bfs(net, initial)
+    depth = {0: 0}
+    for s, d, _ in edges:
+        depth.setdefault(d, depth[s] + 1)
+    space = explore(net, net.pack(initial), store=new_store())
+    for state in range(len(space)):
+        key = net.pack(initial)
+        for t in space.trace(state):
+            key = net.fire(net.unpack(key), t).tobytes()
+        assert key == space.states[state]
+        assert len(space.trace(state)) == depth[state]
+
+
+@pytest.mark.parametrize('n', [2, 3, 4, 5, 6])
+def test_stubborn_sets_preserve_deadlocks(n, new_store):
+    net, initial = greedy_philosophers(n)
+    states, edges = naive_bfs(net, initial)
+    reduced = explore(net, net.pack(initial), store=new_store(), reduction=StubbornSets(net))
+    assert set(reduced.states) <= set(states)
+    # Jusqu'à 3 philosophes, toutes les transitions sont en conflit : rien à réduire
+    assert len(reduced) < len(states) if n > 3 else len(reduced) == len(states)
+    reduced_edges = list(zip(reduced.edge_src, reduced.edge_dst, reduced.edge_transition))
+    assert deadlock_keys(list(reduced.states), reduced_edges) == deadlock_keys(states, edges)
+
+
+@pytest.mark.parametrize('n', [3, 4])
+def test_stubborn_sets_preserve_safety_violations(n, new_store):
+    net, initial = philosophers(n)
+    both = Invariant(lambda m: not (m['eat0'] and m['eat2']), "eat0 et eat2 exclusifs")
+    full = explore(net, net.pack(initial), store=new_store(), properties=[both]).violation
+    reduction = StubbornSets(net, visible_transitions(net, ['eat0', 'eat2']))
+    reduced = explore(net, net.pack(initial), store=new_store(), reduction=reduction,
+                      properties=[both]).violation
+    assert (full is None) == (reduced is None) == (n == 3)
+    if reduced is not None:
+        assert reduced.marking['eat0'] and reduced.marking['eat2']
+
+
+@pytest.mark.parametrize('n', [3, 4, 5])
+def test_symmetry_explores_one_state_per_orbit(n, new_store):
+    net, initial = philosophers(n)
+    group = SymmetryGroup.from_generators(net, [rotation(n, ('think', 'eat', 'fork'))])
+    assert group.order() == n
+    states, _ = naive_bfs(net, initial)
+    reduced = explore(net, net.pack(initial), store=new_store(), symmetry=group)
+    assert set(reduced.states) == {group.canonical(key) for key in states}
+
+
+def test_symmetry_of_independent_components(new_store):
+    net, initial = cycles(5)
+    group = SymmetryGroup.detect(net)
+    states, _ = naive_bfs(net, initial)
+    reduced = explore(net, net.pack(initial), store=new_store(), symmetry=group)
+    # Orbites : nombre de cycles dont le jeton est en b (0 à 5)
+    assert len(reduced) == 6
+    assert set(reduced.states) == {group.canonical(key) for key in states}
+
+
+def test_violation_is_a_shortest_counterexample(new_store):
+    net, initial = greedy_philosophers(3)
+    states, edges = naive_bfs(net, initial)
+    violation = explore(net, net.pack(initial), store=new_store(), properties=[Deadlock()]).violation
+    assert violation is not None
+    assert net.pack(violation.marking) in deadlock_keys(states, edges)
+    # Tous les philosophes tiennent leur fourchette gauche : 3 franchissements au minimum
+    assert len(violation.transitions) == 3
+    assert len(violation.markings) == 4
+
+
+class Interrupt(Monitor):
+    """Interrompt l'exploration après `batches` paquets, comme un arrêt brutal"""
+
+    def __init__(self, batches: int):
+        super().__init__(interval=0.0)
+        self.batches = batches
+
+    def progress(self, stats):
+        if stats.batches == self.batches:
+            raise KeyboardInterrupt
+
+
+@pytest.mark.parametrize('batches', [2, 5, 8])
+def test_checkpoint_resume_keeps_numbering(tmp_path, batches, new_store):
+    net, initial = greedy_philosophers(4)
+    checkpoint = str(tmp_path / 'exploration.ckpt')
+    reference = explore(net, net.pack(initial), store=new_store(), batch_size=4)
+    with pytest.raises(KeyboardInterrupt):
+        explore(net, net.pack(initial), store=new_store(), batch_size=4, checkpoint=checkpoint,
+                checkpoint_interval=0, monitor=Interrupt(batches))
+    assert os.path.exists(checkpoint)
+    resumed = resume_exploration(net, checkpoint, store=new_store(), batch_size=4)
+    assert list(resumed.states) == list(reference.states)
+    assert list(resumed.edge_src) == list(reference.edge_src)
+    assert list(resumed.edge_dst) == list(reference.edge_dst)
+    assert list(resumed.edge_transition) == list(reference.edge_transition)
+    assert list(resumed.parent) == list(reference.parent)
+    # Exploration terminée : le point de reprise ne doit pas servir à un appel suivant
+    assert not os.path.exists(checkpoint)
+
+
+def test_checkpoint_is_removed_after_a_violation(tmp_path, new_store):
+    net, initial = greedy_philosophers(3)
+    checkpoint = str(tmp_path / 'exploration.ckpt')
+    space = explore(net, net.pack(initial), store=new_store(), batch_size=1, properties=[Deadlock()],
+                    checkpoint=checkpoint, checkpoint_interval=0)
+    assert space.violation is not None
+    assert not os.path.exists(checkpoint)
+
+
+def test_checkpoint_rejects_another_net(tmp_path, new_store):
+    net, initial = greedy_philosophers(3)
+    checkpoint = str(tmp_path / 'exploration.ckpt')
+    with pytest.raises(KeyboardInterrupt):
+        explore(net, net.pack(initial), store=new_store(), batch_size=2, checkpoint=checkpoint,
+                checkpoint_interval=0, monitor=Interrupt(2))
+    other, other_initial = greedy_philosophers(3)
+    with pytest.raises(ValueError):
+        explore(other, other.pack(other_initial), store=new_store(), batch_size=2,
+                reduction=StubbornSets(other), checkpoint=checkpoint)
+
+
+def test_symmetry_rejects_properties_on_moved_places(new_store):
+    net, initial = cycles(2)
+    # Violée après ab1 ; l'orbite de (a0, b1) est représentée par (b0, a1), qui ne la viole pas
+    mixed = Invariant(lambda m: not (m['a0'] and m['b1']), "a0 et b1 exclusifs", places=['a0', 'b1'])
+    violation = explore(net, net.pack(initial), store=new_store(), properties=[mixed]).violation
+    assert violation.transitions == ['ab1']
+    group = SymmetryGroup.from_components(net, [['a0', 'b0'], ['a1', 'b1']])
+    with pytest.raises(ValueError):
+        explore(net, net.pack(initial), store=new_store(), symmetry=group, properties=[mixed])
+    undeclared = Invariant(lambda m: not (m['a0'] and m['b1']))
+    with pytest.raises(ValueError):
+        explore(net, net.pack(initial), store=new_store(), symmetry=group, properties=[undeclared])
+
+
+def test_symmetry_with_properties_on_fixed_places(new_store):
+    net, initial = cycles(3)
+    group = SymmetryGroup.from_components(net, [['a1', 'b1'], ['a2', 'b2']])
+    fixed = Invariant(lambda m: not m['b0'], "a0 garde son jeton", places=['b0'])
+    violation = explore(net, net.pack(initial), store=new_store(), symmetry=group,
+                        properties=[fixed]).violation
+    assert violation.transitions == ['ab0']
+    net, initial = greedy_philosophers(4)
+    group = SymmetryGroup.from_generators(net, [rotation(4, ('think', 'hold', 'eat', 'fork'))])
+    violation = explore(net, net.pack(initial), store=new_store(), symmetry=group,
+                        properties=[Deadlock()]).violation
+    assert violation is not None and len(violation.transitions) == 4
+
+
+def test_unobserved_stubborn_sets_observe_property_places(new_store):
+    net, initial = cycles(3)
+    both = Invariant(lambda m: not (m['b0'] and m['b1']), "b0 et b1 exclusifs", places=['b0', 'b1'])
+    full = explore(net, net.pack(initial), store=new_store(), properties=[both]).violation
+    reduced = explore(net, net.pack(initial), store=new_store(), reduction=StubbornSets(net),
+                      properties=[both]).violation
+    assert full is not None and reduced is not None
+    assert reduced.marking['b0'] and reduced.marking['b1']
+    undeclared = Invariant(lambda m: not (m['b0'] and m['b1']))
+    with pytest.raises(ValueError):
+        explore(net, net.pack(initial), store=new_store(), reduction=StubbornSets(net),
+                properties=[undeclared])
+
+
+def test_stubborn_sets_with_place_bounds(new_store):
+    net, initial = cycles(3)
+    bound = PlaceBound('b2', 0)
+    reduced = explore(net, net.pack(initial), store=new_store(), reduction=StubbornSets(net),
+                      properties=[bound]).violation
+    assert reduced is not None and reduced.marking['b2'] == 1
+
+
+@pytest.mark.parametrize('key_size', [2, 7])
+def test_disk_store_grows_and_rehashes(tmp_path, key_size):
+    rng = random.Random(key_size)
+    disk = DiskStateStore(str(tmp_path / 'store'), initial_capacity=16)
+    memory = MemoryStateStore()
+    keys = [rng.randrange(5000).to_bytes(key_size, 'little') for _ in range(20000)]
+    for start in range(0, len(keys), 999):
+        # Lots avec doublons internes et clés déjà connues
+        batch = keys[start:start + 999]
+        assert disk.add_batch(batch) == memory.add_batch(batch)
+    assert disk._capacity > 16 and len(disk) <= disk.max_load * disk._capacity
+    assert len(disk) == len(memory)
+    assert list(disk) == list(memory)
+    assert disk[len(disk) - 1] == memory[len(memory) - 1]
+    # Après plusieurs doublements, chaque clé garde son numéro d'origine
+    assert disk.add_batch(list(memory)) == list(range(len(memory)))
+    disk.close()
+
+
+class MinimumTokens(Property):
+    """Propriété utilisateur : au moins `minimum` jetons dans le réseau"""
+
+    def __init__(self, minimum: int):
+        self.minimum = minimum
+        self.name = f"au moins {minimum} jetons"
+
+    def violated(self, net, m) -> bool:
+        return sum(m) < self.minimum
+
+
+def test_user_defined_properties():
+    with pytest.raises(TypeError):
+        Property()
+
+    class Incomplete(Property):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    net, initial = greedy_philosophers(3)
+    assert explore(net, net.pack(initial), properties=[MinimumTokens(3)]).violation is None
+    # Prendre une fourchette remplace deux jetons (penser, fourchette) par un (tenir)
+    violation = explore(net, net.pack(initial), properties=[MinimumTokens(4)]).violation
+    assert repr(violation.property) == "au moins 4 jetons"
+    assert sum(violation.marking.values()) == 3 and len(violation.transitions) == 3
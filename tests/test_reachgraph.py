@@ -0,0 +1,125 @@
+import random
+
+import numpy as np
+import pytest
+
+from coverability import karp_miller, omega_marking
+from nets import greedy_philosophers, philosophers, producer_consumer
+from reachability import PackedNet, explore
+from reachgraph import ReachabilityGraph
+
+LABELS = ['a', 'b', 'c', 'd']
+
+
+def graph_of(n, edges, transitions=LABELS):
+    return ReachabilityGraph.from_edges(n, [s for s, _, _ in edges], [d for _, d, _ in edges],
+                                        [t for _, _, t in edges], transitions)
+
+
+def closure(n, edges):
+    """reach[s] : états accessibles depuis s (s compris)"""
+    reach = []
+    for start in range(n):
+        seen, stack = {start}, [start]
+        while stack:
+            s = stack.pop()
+            for x, d, _ in edges:
+                if x == s and d not in seen:
+                    seen.add(d)
+                    stack.append(d)
+        reach.append(seen)
+    return reach
+
+
+def random_graphs(count, seed=11):
+    """Graphes étiquetés aléatoires dont tous les états sont accessibles depuis 0"""
+    rng = random.Random(seed)
+    while count:
+        n = rng.randint(1, 7)
+        edges = sorted({(rng.randrange(n), rng.randrange(n), rng.randrange(len(LABELS)))
+                        for _ in range(rng.randint(0, 14))})
+        if len(closure(n, edges)[0]) == n:
+            count -= 1
+            yield n, edges
+
+
+@pytest.mark.parametrize('n, edges', list(random_graphs(300)))
+def test_analyses_match_brute_force(n, edges):
+    graph = graph_of(n, edges)
+    reach = closure(n, edges)
+    comp, count = graph.components()
+    assert count == len({frozenset(t for t in reach[s] if s in reach[t]) for s in range(n)})
+    for s in range(n):
+        for t in range(n):
+            assert (comp[s] == comp[t]) == (t in reach[s] and s in reach[t])
+    terminal = {s for s in range(n) if all(s in reach[t] for t in reach[s])}
+    assert {s for s in range(n) if comp[s] in graph.terminal_components()} == terminal
+    assert graph.deadlocks().tolist() == [s for s in range(n) if not any(x == s for x, _, _ in edges)]
+    assert graph.dead_transitions() == [LABELS[t] for t in range(len(LABELS))
+                                        if not any(u == t for _, _, u in edges)]
+    live = [LABELS[t] for t in range(len(LABELS))
+            if all(any(x in reach[s] and u == t for x, _, u in edges) for s in range(n))]
+    assert graph.live_transitions() == live
+    assert graph.is_live() == (len(live) == len(LABELS))
+    assert graph.home_states().tolist() == [s for s in range(n) if all(s in r for r in reach)]
+    assert graph.is_reversible() == all(0 in r for r in reach)
+
+
+def test_reversible_cycle():
+    graph = graph_of(3, [(0, 1, 0), (1, 2, 1), (2, 0, 2)], ['a', 'b', 'c'])
+    assert graph.components()[1] == 1 and len(graph.terminal_components()) == 1
+    assert graph.is_reversible() and graph.is_live()
+    assert graph.home_states().tolist() == [0, 1, 2]
+    assert graph.deadlocks().tolist() == [] and graph.dead_transitions() == []
+    assert graph.edges() == [(0, 1, 'a'), (1, 2, 'b'), (2, 0, 'c')]
+
+
+def test_deadlock_is_the_only_home_state():
+    # 0 -a-> 1 (blocage), 0 -b-> 2 -c-> 0 : le cycle b c n'est pas terminal
+    graph = graph_of(3, [(0, 1, 0), (0, 2, 1), (2, 0, 2)], ['a', 'b', 'c'])
+    assert graph.deadlocks().tolist() == [1]
+    assert graph.live_transitions() == [] and not graph.is_live()
+    assert graph.home_states().tolist() == [1]
+    assert not graph.is_reversible()
+    assert graph.components()[1] == 2
+
+
+def test_explored_nets():
+    net, initial = philosophers(3)
+    graph = ReachabilityGraph.from_state_space(explore(net, net.pack(initial)))
+    assert graph.is_reversible() and graph.is_live() and len(graph.deadlocks()) == 0
+    assert graph.nodes()[0] == (0, net.marking_str(net.pack(initial)))
+
+    net, initial = greedy_philosophers(3)
+    graph = ReachabilityGraph.from_state_space(explore(net, net.pack(initial)))
+    # Un seul blocage : chaque philosophe tient sa fourchette gauche
+    assert len(graph.deadlocks()) == 1 and graph.live_transitions() == []
+    assert not graph.is_reversible() and len(graph.home_states()) == 1
+
+
+def test_dead_transition():
+    # `never` demande un jeton dans une place que rien ne marque
+    net = PackedNet(['p', 'q', 'empty'], ['pq', 'qp', 'never'],
+                    {'pq': {'p': 1}, 'qp': {'q': 1}, 'never': {'empty': 1}},
+                    {'pq': {'q': 1}, 'qp': {'p': 1}, 'never': {'p': 1}})
+    graph = ReachabilityGraph.from_state_space(explore(net, net.pack({'p': 1})))
+    assert len(graph) == 2 and graph.is_reversible()
+    assert graph.dead_transitions() == ['never']
+    assert graph.live_transitions() == ['pq', 'qp'] and not graph.is_live()
+
+
+def test_coverability_graph():
+    net, initial = producer_consumer()
+    tree = karp_miller(net, omega_marking(net, initial))
+    graph = ReachabilityGraph.from_coverability(tree)
+    assert len(graph) == len(tree) and graph.num_edges == len(tree.edge_list)
+    assert 'ω' in ''.join(label for _, label in graph.nodes())
+
+
+def test_long_chain_does_not_recurse():
+    n = 200000
+    src = np.arange(n - 1)
+    graph = ReachabilityGraph.from_edges(n, src, src + 1, np.zeros(n - 1), ['a'])
+    assert graph.components()[1] == n
+    assert graph.terminal_components() == [graph.components()[0][n - 1]]
+    assert graph.deadlocks().tolist() == [n - 1] and graph.home_states().tolist() == [n - 1]
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from PIL import Image
+
+import exo3
+from recorder import FrameRecorder
+from simulation import PetriNet
+
+
+def chain() -> PetriNet:
+    return PetriNet.from_pre_post(['p', 'q', 'r'], ['t', 'u'], {'t': {'p': 1}, 'u': {'q': 1}},
+                                  {'t': {'q': 1}, 'u': {'r': 2}}, {'p': 1})
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_frames_and_animation_are_written(tmp_path, compiled):
+    net = chain()
+    simulated = net.compile() if compiled else net
+    animation = str(tmp_path / 'run.gif')
+    with FrameRecorder(simulated, str(tmp_path / 'frames'), workers=1, animation=animation,
+                       figsize=(4, 3)) as recorder:
+        recorder.record("initial")
+        for transition in ('t', 'u'):
+            assert simulated.fire_transition(transition)
+            recorder.record(f"après {transition}")
+    assert recorder.frames == [str(tmp_path / 'frames' / f'frame_{i:05d}.png') for i in range(3)]
+    for path in recorder.frames:
+        with Image.open(path) as image:
+            assert image.format == 'PNG' and image.size == (400, 300)
+    with Image.open(animation) as gif:
+        assert gif.format == 'GIF' and gif.n_frames == 3
+    # Un réseau compilé est recopié dans sa source avant chaque image
+    assert net.places == {'p': 0, 'q': 0, 'r': 2}
+
+
+def test_no_animation_after_an_exception(tmp_path):
+    animation = str(tmp_path / 'run.gif')
+    with pytest.raises(RuntimeError):
+        with FrameRecorder(chain(), str(tmp_path), workers=1, animation=animation,
+                           figsize=(4, 3)) as recorder:
+            recorder.record("initial")
+            raise RuntimeError("simulation interrompue")
+    assert os.path.exists(recorder.frames[0])
+    assert not os.path.exists(animation)
+
+
+def test_complete_cycle_closes_the_recorder_on_failure(tmp_path, monkeypatch):
+    closed = []
+    close = FrameRecorder.close
+
+    def tracked_close(self, animate=True):
+        closed.append(animate)
+        close(self, animate)
+
+    def fail(self, scheduler):
+        raise RuntimeError("affichage impossible")
+
+    monkeypatch.setattr(FrameRecorder, 'close', tracked_close)
+    monkeypatch.setattr(exo3.TrafficLightSystem, 'print_current_state', fail)
+    with pytest.raises(RuntimeError):
+        exo3.simulate_complete_cycle(recorder_dir=str(tmp_path))
+    assert closed == [False]
+    assert not os.path.exists(tmp_path / 'cycle.gif')
@@ -0,0 +1,107 @@
+import re
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import pytest
+
+from nets import philosophers
+from reachability import explore
+from rendering import draw_graph, export_graph, layered_positions
+
+NODES = [(0, '(p:1, q:0)'), (1, '(p:ω, q:"x")'), (2, 'a <&> b'), (3, 'back\\slash')]
+EDGES = [(0, 1, 't1'), (1, 2, 't<2>'), (2, 0, 't"3"'), (1, 1, 'é')]
+
+_QUOTED = r'"((?:[^"\\]|\\.)*)"'
+
+
+def unquote(text: str) -> str:
+    return re.sub(r'\\(.)', r'\1', text)
+
+
+def read_dot(path):
+    """Relit le sous-ensemble de DOT produit par write_dot : nœuds et arcs étiquetés"""
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert re.fullmatch(rf'digraph {_QUOTED} {{', lines[0]) and lines[-1] == '}'
+    nodes, edges = [], []
+    for line in lines[1:-1]:
+        edge = re.fullmatch(rf'  {_QUOTED} -> {_QUOTED} \[label={_QUOTED}\];', line)
+        if edge:
+            edges.append(tuple(unquote(g) for g in edge.groups()))
+            continue
+        node = re.fullmatch(rf'  {_QUOTED} \[label={_QUOTED}\];', line)
+        assert node, line
+        nodes.append(tuple(unquote(g) for g in node.groups()))
+    return nodes, edges
+
+
+def as_strings(nodes, edges):
+    return [(str(n), label) for n, label in nodes], [(str(s), str(d), label) for s, d, label in edges]
+
+
+@pytest.mark.parametrize('suffix', ['.dot', '.gv'])
+def test_export_dot_round_trip(tmp_path, suffix):
+    path = tmp_path / f'graphe{suffix}'
+    export_graph(NODES, EDGES, path)
+    assert read_dot(path) == as_strings(NODES, EDGES)
+
+
+def test_export_graphml_round_trip(tmp_path):
+    path = tmp_path / 'graphe.graphml'
+    export_graph(NODES, EDGES, path)
+    graph = nx.read_graphml(path)
+    assert graph.is_directed()
+    nodes, edges = as_strings(NODES, EDGES)
+    assert [(n, data['label']) for n, data in graph.nodes(data=True)] == nodes
+    assert sorted((s, d, data['transition']) for s, d, data in graph.edges(data=True)) == sorted(edges)
+
+
+def test_export_explored_state_space(tmp_path):
+    net, initial = philosophers(3)
+    space = explore(net, net.pack(initial))
+    nodes, edges = space.nodes(), space.edges()
+    export_graph(nodes, edges, tmp_path / 'espace.dot')
+    export_graph(nodes, edges, tmp_path / 'espace.graphml')
+    assert read_dot(tmp_path / 'espace.dot') == as_strings(nodes, edges)
+    graph = nx.read_graphml(tmp_path / 'espace.graphml')
+    assert graph.number_of_nodes() == len(nodes) and graph.number_of_edges() == len(edges)
+
+
+def test_export_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_graph(NODES, EDGES, tmp_path / 'graphe.png')
+    assert not (tmp_path / 'graphe.png').exists()
+
+
+def levels(positions):
+    return {nid: -y for nid, (_, y) in positions.items()}
+
+
+def test_layered_positions_levels():
+    # 0 -> 1 -> 2 -> 3, raccourci 0 -> 2, et 4 inaccessible depuis la racine
+    nodes = [(i, str(i)) for i in range(5)]
+    edges = [(0, 1, 'a'), (1, 2, 'b'), (2, 3, 'c'), (0, 2, 'd'), (3, 0, 'e'), (4, 0, 'f')]
+    positions = layered_positions(nodes, edges)
+    assert levels(positions) == {0: 0, 1: 1, 2: 1, 3: 2, 4: 2}
+    # Les nœuds d'un même niveau sont répartis autour de x = 0, dans l'ordre de la liste
+    assert positions[1][0] == -1 and positions[2][0] == 0
+    assert positions[3][0] == -1 and positions[4][0] == 0
+    assert positions[0] == (-0.5, 0)
+
+
+def test_layered_positions_match_bfs_depth():
+    net, initial = philosophers(4)
+    space = explore(net, net.pack(initial))
+    positions = layered_positions(space.nodes(), space.edges())
+    # La trace de l'exploration est un plus court chemin : sa longueur est le niveau BFS
+    assert levels(positions) == {state: len(space.trace(state)) for state in range(len(space))}
+    assert layered_positions([], []) == {}
+
+
+@pytest.mark.parametrize('arrows_limit', [100, 2])
+def test_draw_graph_without_display(arrows_limit):
+    ax = draw_graph(NODES, EDGES, layered_positions(NODES, EDGES), "graphe", arrows_limit=arrows_limit,
+                    show=False)
+    assert ax.get_title() == "graphe"
+    assert len(ax.texts) == len(NODES) + (len(EDGES) if arrows_limit > len(EDGES) else 0)
+    plt.close(ax.figure)
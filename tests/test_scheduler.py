@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from nets import random_pre_post
+from scheduler import IncrementalScheduler, dependency_lists, transition_deltas
+from simulation import PetriNet
+
+
+def full_recomputation(net):
+    return [t for t in net.arcs.transition_ids if net.is_transition_enabled(t)]
+
+
+def shared_forks(n: int) -> PetriNet:
+    """Philosophes en anneau : chaque fourchette est partagée par deux transitions take"""
+    places, transitions, pre, post = [], [], {}, {}
+    for i in range(n):
+        places += [f'think{i}', f'eat{i}', f'fork{i}']
+        left, right = f'fork{i}', f'fork{(i + 1) % n}'
+        transitions += [f'take{i}', f'release{i}']
+        pre[f'take{i}'], post[f'take{i}'] = {f'think{i}': 1, left: 1, right: 1}, {f'eat{i}': 1}
+        pre[f'release{i}'], post[f'release{i}'] = {f'eat{i}': 1}, {f'think{i}': 1, left: 1, right: 1}
+    initial = {f'think{i}': 1 for i in range(n)}
+    initial.update({f'fork{i}': 1 for i in range(n)})
+    return PetriNet.from_pre_post(places, transitions, pre, post, initial)
+
+
+def check_firing_sequence(net, rng, steps):
+    scheduler = IncrementalScheduler(net)
+    for _ in range(steps):
+        assert scheduler.enabled_transitions() == full_recomputation(net)
+        # Y compris des transitions non franchissables, qui ne doivent rien modifier
+        transition = rng.choice(net.arcs.transition_ids)
+        enabled = net.is_transition_enabled(transition)
+        assert scheduler.is_enabled(transition) == enabled
+        assert scheduler.fire(transition) == enabled
+    assert scheduler.enabled_transitions() == full_recomputation(net)
+
+
+@pytest.mark.parametrize('seed', range(100))
+def test_incremental_enabled_set_matches_full_recomputation(seed):
+    rng = random.Random(seed)
+    net = PetriNet.from_pre_post(*random_pre_post(rng, max_places=6, max_transitions=6, max_weight=3))
+    check_firing_sequence(net, rng, 50)
+
+
+@pytest.mark.parametrize('n', [2, 3, 5])
+def test_transitions_sharing_places(n):
+    net = shared_forks(n)
+    check_firing_sequence(net, random.Random(n), 200)
+    # take0 prend la fourchette 1 : take1, qui la partage, doit être retirée
+    net = shared_forks(n)
+    scheduler = IncrementalScheduler(net)
+    assert scheduler.fire('take0')
+    assert not scheduler.is_enabled('take1') and not scheduler.is_enabled(f'take{n - 1}')
+    assert scheduler.fire('release0')
+    assert scheduler.is_enabled('take1') and scheduler.is_enabled(f'take{n - 1}')
+
+
+def test_refresh_after_external_marking_change():
+    net = shared_forks(3)
+    scheduler = IncrementalScheduler(net)
+    net.places['think0'] = 0
+    scheduler.refresh()
+    assert scheduler.enabled_transitions() == full_recomputation(net)
+    assert not scheduler.is_enabled('take0')
+
+
+def test_self_loops_have_no_dependents():
+    net = PetriNet.from_pre_post(['p', 'q'], ['loop', 'move'], {'loop': {'p': 1}, 'move': {'p': 1}},
+                                 {'loop': {'p': 1}, 'move': {'q': 1}}, {'p': 1})
+    loop, move = net.arcs.transition_index['loop'], net.arcs.transition_index['move']
+    assert transition_deltas(net.arcs)[loop] == {}
+    dependents = dependency_lists(net.arcs)
+    assert dependents[loop] == []
+    assert dependents[move] == sorted([loop, move])
@@ -0,0 +1,111 @@
+import random
+
+import numpy as np
+import pytest
+
+from nets import random_pre_post
+from simulation import PetriNet
+from snapshot import (MarkingWriter, attach_net, load_markings, load_net, open_container, save_markings,
+                      save_net, share_net, write_container)
+
+
+def random_petri_net(seed: int) -> PetriNet:
+    return PetriNet.from_pre_post(*random_pre_post(random.Random(seed), max_places=6, max_transitions=6,
+                                                   max_weight=300))
+
+
+def unicode_net() -> PetriNet:
+    return PetriNet.from_pre_post(['file d’attente', 'servi', 'é'], ['arrivée', 'départ'],
+                                  {'départ': {'file d’attente': 2}},
+                                  {'arrivée': {'file d’attente': 1}, 'départ': {'servi': 1, 'é': 70000}},
+                                  {'file d’attente': 3})
+
+
+def assert_same_net(net, other):
+    assert other.places == net.places
+    assert other.arcs.place_ids == net.arcs.place_ids
+    assert other.arcs.transition_ids == net.arcs.transition_ids
+    assert other.input_arcs == net.input_arcs
+    assert other.output_arcs == net.output_arcs
+
+
+NETS = [random_petri_net(seed) for seed in range(30)] + [unicode_net(), PetriNet(headless=True)]
+
+
+@pytest.mark.parametrize('net', NETS)
+def test_save_load_round_trip(tmp_path, net):
+    path = tmp_path / 'net.pnsnap'
+    save_net(net, path)
+    snapshot = load_net(path)
+    assert snapshot.meta['places'] == len(net.places)
+    assert snapshot.place_ids == list(net.places)
+    assert snapshot.transition_ids == net.arcs.transition_ids
+    assert snapshot.initial_marking.tolist() == list(net.places.values())
+    assert_same_net(net, snapshot.to_petri_net())
+
+
+@pytest.mark.parametrize('net', NETS[:5] + NETS[-2:])
+def test_share_attach_round_trip(net):
+    shm = share_net(net)
+    try:
+        snapshot, attached = attach_net(shm.name)
+        assert_same_net(net, snapshot.to_petri_net())
+        del snapshot
+        attached.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_load_rejects_other_containers(tmp_path):
+    save_markings(tmp_path / 'markings', np.zeros((2, 3)), ['a', 'b', 'c'])
+    with pytest.raises(ValueError):
+        load_net(tmp_path / 'markings')
+    save_net(unicode_net(), tmp_path / 'net')
+    with pytest.raises(ValueError):
+        load_markings(tmp_path / 'net')
+    (tmp_path / 'other').write_bytes(b'\0' * 128)
+    with pytest.raises(ValueError):
+        load_net(tmp_path / 'other')
+
+
+@pytest.mark.parametrize('dtype', [np.int32, np.uint16, np.int64])
+def test_save_load_markings(tmp_path, dtype):
+    markings = np.random.default_rng(0).integers(0, 1000, size=(50, 4))
+    save_markings(tmp_path / 'markings', markings, ['a', 'b', 'c', 'd'], dtype=dtype)
+    loaded, places = load_markings(tmp_path / 'markings')
+    assert places == ['a', 'b', 'c', 'd']
+    assert loaded.dtype == dtype and np.array_equal(loaded, markings)
+
+
+@pytest.mark.parametrize('batches', [[], [0], [3, 0, 5], [1] * 20])
+def test_marking_writer(tmp_path, batches):
+    rng = np.random.default_rng(len(batches))
+    rows = [rng.integers(0, 100, size=(n, 3)) for n in batches]
+    with MarkingWriter(tmp_path / 'markings', ['a', 'b', 'c']) as writer:
+        for batch in rows:
+            writer.append(batch)
+    assert writer.count == sum(batches)
+    loaded, places = load_markings(tmp_path / 'markings')
+    assert places == ['a', 'b', 'c']
+    assert loaded.shape == (sum(batches), 3)
+    assert np.array_equal(loaded, np.concatenate(rows) if rows else np.zeros((0, 3)))
+
+
+def test_marking_writer_with_many_places(tmp_path):
+    # Noms de places plus longs que la réserve d'en-tête par défaut
+    places = [f'place_{i}' for i in range(2000)]
+    with MarkingWriter(tmp_path / 'markings', places) as writer:
+        writer.append(np.arange(2000))
+    loaded, loaded_places = load_markings(tmp_path / 'markings')
+    assert loaded_places == places and loaded.tolist() == [list(range(2000))]
+
+
+def test_container_offsets_are_aligned(tmp_path):
+    arrays = {'bytes': np.arange(3, dtype=np.uint8), 'words': np.arange(5, dtype=np.int64)}
+    write_container(tmp_path / 'c', arrays, {'kind': 'test'})
+    meta, loaded = open_container(tmp_path / 'c')
+    assert meta == {'kind': 'test'}
+    for name, array in arrays.items():
+        assert np.array_equal(loaded[name], array)
+        assert loaded[name].ctypes.data % 64 == 0
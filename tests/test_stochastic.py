@@ -0,0 +1,69 @@
+import pytest
+
+from stochastic import NextReactionSimulator, StochasticPetriNet, TauLeapingSimulator
+
+
+def mm_infinity(arrival: float, service: float) -> StochasticPetriNet:
+    """File M/M/∞ : arrivées de taux λ, chaque client servi au taux μ (serveurs infinis)"""
+    return StochasticPetriNet.from_pre_post(['clients'], ['arrive', 'leave'], {'leave': {'clients': 1}},
+                                            {'arrive': {'clients': 1}}, {},
+                                            rates={'arrive': arrival, 'leave': service}, semantics='infinite')
+
+
+def exchange(tokens: int, rate: float) -> StochasticPetriNet:
+    """Deux places qui s'échangent `tokens` jetons très vite : sauts agressifs près de zéro"""
+    return StochasticPetriNet.from_pre_post(['x', 'y'], ['xy', 'yx'], {'xy': {'x': 1}, 'yx': {'y': 1}},
+                                            {'xy': {'y': 1}, 'yx': {'x': 1}}, {'x': tokens},
+                                            rates={'xy': rate, 'yx': rate / 4}, semantics='infinite')
+
+
+@pytest.mark.parametrize('arrival, service', [(5.0, 1.0), (2.0, 0.5)])
+def test_next_reaction_mean_matches_mm_infinity(arrival, service):
+    # Nombre moyen de clients : loi de Poisson de moyenne λ/μ
+    result = NextReactionSimulator(mm_infinity(arrival, service), seed=7).run(horizon=4000.0)
+    assert result.time == 4000.0
+    assert result.time_averaged_marking['clients'] == pytest.approx(arrival / service, rel=0.05)
+    assert result.throughput['leave'] == pytest.approx(arrival, rel=0.05)
+
+
+def test_next_reaction_is_reproducible():
+    net = mm_infinity(5.0, 1.0)
+    first = NextReactionSimulator(net, seed=3).run(max_events=2000)
+    second = NextReactionSimulator(net, seed=3).run(max_events=2000)
+    assert first.events == second.events == 2000
+    assert first.time == second.time
+    assert first.final_marking == second.final_marking
+
+
+@pytest.mark.parametrize('arrival, service', [(5.0, 1.0), (2000.0, 1.0)])
+def test_tau_leaping_mean_matches_mm_infinity(arrival, service):
+    # Petite population : blocs de pas exacts ; grande population : vrais sauts
+    result = TauLeapingSimulator(mm_infinity(arrival, service), seed=11).run(horizon=1000.0)
+    assert result.time == 1000.0
+    assert result.time_averaged_marking['clients'] == pytest.approx(arrival / service, rel=0.05)
+
+
+def test_tau_leaping_leaps_on_large_populations():
+    result = TauLeapingSimulator(mm_infinity(2000.0, 1.0), seed=11).run(horizon=100.0, max_leaps=5000)
+    # Environ 4000 événements par unité de temps : bien moins d'un saut par événement
+    assert result.time == 100.0
+    assert result.events > 50 * 5000
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_tau_leaping_never_drives_a_place_negative(seed):
+    net = exchange(60, 500.0)
+    simulator = TauLeapingSimulator(net, epsilon=0.5, critical_threshold=2, seed=seed)
+    for horizon in (0.01, 0.1, 1.0):
+        result = simulator.run(horizon=horizon)
+        assert min(result.final_marking.values()) >= 0
+        assert sum(result.final_marking.values()) == 60
+        assert min(result.time_averaged_marking.values()) >= 0
+
+
+def test_tau_leaping_stops_on_deadlock():
+    net = StochasticPetriNet.from_pre_post(['x', 'y'], ['xy'], {'xy': {'x': 1}}, {'xy': {'y': 1}}, {'x': 500},
+                                           rates={'xy': 10.0}, semantics='infinite')
+    result = TauLeapingSimulator(net, seed=0).run(horizon=100.0)
+    assert result.final_marking == {'x': 0, 'y': 500}
+    assert result.time == 100.0
@@ -0,0 +1,136 @@
+import itertools
+import random
+from fractions import Fraction
+from functools import reduce
+from math import gcd
+
+import pytest
+
+from coverability import OMEGA, karp_miller, omega_marking
+from exo2 import PetriNet as UnboundedPetriNet
+from nets import greedy_philosophers, naive_bfs, philosophers, producer_consumer, random_net
+from structural import StructuralAnalysis, _farkas, _simplex, _transpose, incidence_matrix
+
+SEEDS = range(150)
+
+
+def product(rows, y, j):
+    return sum(w * rows[i].get(j, 0) for i, w in y.items())
+
+
+def support(rows, columns, y, inequality):
+    """Support étendu : variables non nulles et contraintes lâches (yᵀA_j < 0)"""
+    s = set(y)
+    if inequality:
+        s |= {('column', j) for j in range(columns) if product(rows, y, j) < 0}
+    return frozenset(s)
+
+
+def check_generators(rows, columns, inequality):
+    generators = _farkas(rows, columns, inequality)
+    for y in generators:
+        assert y and all(w > 0 for w in y.values())
+        assert reduce(gcd, y.values()) == 1
+        for j in range(columns):
+            value = product(rows, y, j)
+            assert value <= 0 if inequality else value == 0
+    supports = [support(rows, columns, y, inequality) for y in generators]
+    for a, b in itertools.combinations(supports, 2):
+        assert not a <= b and not b <= a
+    # Tout élément du cône (coefficients 0..2) a un support qui contient celui d'un générateur
+    for vector in itertools.product(range(3), repeat=len(rows)):
+        y = {i: w for i, w in enumerate(vector) if w}
+        if y and all((product(rows, y, j) <= 0) if inequality else product(rows, y, j) == 0
+                     for j in range(columns)):
+            s = support(rows, columns, y, inequality)
+            assert any(g <= s for g in supports)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_farkas_generators_are_minimal_semiflows(seed):
+    net, _ = random_net(random.Random(seed))
+    incidence = incidence_matrix(net)
+    columns = len(net.transitions)
+    check_generators(incidence, columns, inequality=False)
+    check_generators(incidence, columns, inequality=True)
+    check_generators(_transpose(incidence, columns), len(net.places), inequality=False)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_structural_bounds_are_sound(seed):
+    net, initial = random_net(random.Random(seed))
+    bounds = StructuralAnalysis(net).bounds(initial)
+    tree = karp_miller(net, omega_marking(net, initial))
+    for i, p in enumerate(net.places):
+        highest = max(m[i] for m in tree.markings)
+        if highest == OMEGA:
+            assert bounds[p] is None
+        elif bounds[p] is not None:
+            assert highest <= bounds[p]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_linear_programs_match_farkas(seed):
+    net, initial = random_net(random.Random(seed), max_weight=3)
+    structure = StructuralAnalysis(net)
+    covered = {p for y in structure.p_subsemiflows for p in y}
+    assert structure.unbounded_places() == [p for p in net.places if p not in covered]
+    # Meilleure borne donnée par les P-sous-semiflots minimaux (rayons extrêmes du cône)
+    expected = {p: None for p in net.places}
+    for y in structure.p_subsemiflows:
+        total = sum(w * initial.get(p, 0) for p, w in y.items())
+        for p, w in y.items():
+            if expected[p] is None or total // w < expected[p]:
+                expected[p] = total // w
+    assert structure.bounds(initial) == expected
+
+
+def test_simplex():
+    # max 3x + 2y sous x + y ≤ 4, x + 3y ≤ 6, x ≤ 3 : optimum (3, 1)
+    value, solution = _simplex([({0: 1, 1: 1}, 4), ({0: 1, 1: 3}, 6), ({0: 1}, 3)], {0: 3, 1: 2}, 2)
+    assert value == 11 and solution == {0: 3, 1: 1}
+    # Optimum fractionnaire, exact : max x + y sous 2x + y ≤ 1, x + 2y ≤ 1
+    value, solution = _simplex([({0: 2, 1: 1}, 1), ({0: 1, 1: 2}, 1)], {0: 1, 1: 1}, 2)
+    assert value == Fraction(2, 3) and solution == {0: Fraction(1, 3), 1: Fraction(1, 3)}
+    assert _simplex([({0: 1, 1: -1}, 1)], {0: 1}, 2) is None
+    assert _simplex([], {}, 0) == (0, {})
+
+
+def test_structural_boundedness_without_semiflows():
+    # Les P-sous-semiflots des philosophes gloutons sont nombreux : le bornage n'en a pas besoin
+    net, initial = greedy_philosophers(40)
+    structure = StructuralAnalysis(net)
+    assert structure.is_structurally_bounded()
+    assert set(structure.bounds(initial).values()) == {1}
+    assert structure._sub is None
+    net, initial = producer_consumer()
+    structure = StructuralAnalysis(net)
+    assert structure.unbounded_places() == ['buffer']
+    assert structure.bounds(initial) == {'ready': 1, 'buffer': None, 'idle': 1, 'busy': 1}
+
+
+@pytest.mark.parametrize('n', [2, 3, 5])
+def test_philosophers_conservation_laws(n):
+    net, initial = philosophers(n)
+    structure = StructuralAnalysis(net)
+    assert structure.is_conservative() and structure.is_consistent()
+    assert structure.is_structurally_bounded()
+    assert all(bound == 1 for bound in structure.bounds(initial).values())
+    states, _ = naive_bfs(net, initial)
+    for y in structure.p_semiflows:
+        total = sum(w * initial.get(p, 0) for p, w in y.items())
+        for key in states:
+            m = net.to_dict(key)
+            assert sum(w * m[p] for p, w in y.items()) == total
+    # Une loi par philosophe (penser ou manger) et une par fourchette
+    assert len(structure.p_semiflows) == 2 * n
+    assert len(structure.t_semiflows) == n
+
+
+def test_exo2_structural_analysis_returns_results(capsys):
+    net = UnboundedPetriNet(['p1', 'p2'], ['t1', 't2'], {'t1': {'p1': 1}, 't2': {'p2': 1}},
+                            {'t1': {'p1': 1, 'p2': 1}, 't2': {}}, {'p1': 1, 'p2': 0})
+    result = net.structural_analysis()
+    assert result == {'bounds': {'p1': 1, 'p2': None}, 'conservation_laws': ['p1 = 1'],
+                      'conservative': False, 'consistent': True}
+    assert capsys.readouterr().out == ''
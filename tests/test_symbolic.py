@@ -0,0 +1,32 @@
+import pytest
+
+from nets import cycles, naive_bfs, philosophers
+from symbolic import symbolic_reachability
+
+
+@pytest.mark.parametrize('n', [2, 3, 4, 5])
+def test_counts_match_explicit_exploration(n):
+    net, initial = philosophers(n)
+    states, edges = naive_bfs(net, initial)
+    space = symbolic_reachability(net, initial)
+    assert space.count() == len(states)
+    explicit_deadlocks = len(states) - len({s for s, _, _ in edges})
+    assert space.deadlock_count() == explicit_deadlocks
+    for key in states:
+        assert space.contains(net.to_dict(key))
+
+
+def test_more_than_a_thousand_places():
+    # BDD de plus de 1000 niveaux : les parcours ne doivent pas dépendre de la pile d'appels
+    net, initial = cycles(8, idle=1200)
+    assert len(net.places) > 1000
+    space = symbolic_reachability(net, initial)
+    assert space.count() == 2 ** 8
+    assert space.deadlock_count() == 0
+    assert not space.contains({**initial, 'idle0': 0})
+
+
+def test_unsafe_net_is_rejected():
+    net, initial = cycles(1)
+    with pytest.raises(ValueError):
+        symbolic_reachability(net, {**initial, 'b0': 1})